@@ -1,7 +1,13 @@
 import asyncio
 from src.run import execute
 from src.config import config
+from src.utils.tracing import tracer
+from src.loader.whisper_pool import whisper_pool
 
 
 if __name__ == "__main__":
+    if config.TRACING_ENABLED and config.METRICS_PORT:
+        tracer.serve_metrics(config.METRICS_PORT)
+    if config.WHISPER_WARMUP:
+        whisper_pool.warm_up(config.WHISPER_WARMUP)
     asyncio.run(execute("Chat With Youtube Videos"))
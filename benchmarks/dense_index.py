@@ -0,0 +1,105 @@
+"""
+Query latency and recall of one video searched in Chroma vs the in-process dense index.
+
+Each video gets random unit vectors and every query is a noisy copy of one of
+its chunks. Chroma is searched with the metadata filter of the video in a
+collection holding `--other-videos` more, the dense indexes are searched as
+float16 and int8 matrices loaded from their memory-mapped files. Recall is
+measured against an exact float32 search. Query embedding time is excluded.
+
+Usage:
+    python -m benchmarks.dense_index --chunks 200 1000 --dimensions 1536 --other-videos 20
+"""
+import time
+import argparse
+import tempfile
+
+import numpy as np
+
+from src.constants import CHUNK_TYPE
+from src.llm.fakes import FakeEmbeddings
+from src.vectorDB.chroma import ChromaDBManager, video_filter
+from src.vectorDB.dense import DenseIndex, DenseStore
+from benchmarks.pipeline import percentile
+
+VIDEO_ID = "benchmark-video"
+
+
+def unit_vectors(rng, count: int, dimensions: int) -> np.ndarray:
+    vectors = rng.standard_normal((count, dimensions)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def time_search(search, queries):
+    latencies, results = [], []
+    for query in queries:
+        started = time.perf_counter()
+        results.append(search(query))
+        latencies.append(time.perf_counter() - started)
+    return latencies, results
+
+
+def recall(results, exact) -> float:
+    return sum(len(set(found) & set(truth)) / len(truth)
+               for found, truth in zip(results, exact)) / len(exact)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunks", type=int, nargs="+", default=[200, 1000])
+    parser.add_argument("--dimensions", type=int, default=1536)
+    parser.add_argument("--other-videos", type=int, default=20)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'chunks':>7} {'search':>8} {'mean ms':>8} {'p95 ms':>8} {'recall':>7} {'MB':>7}")
+    for chunk_count in args.chunks:
+        rng = np.random.default_rng(chunk_count)
+        vectors = unit_vectors(rng, chunk_count, args.dimensions)
+        documents = [f"chunk {index}" for index in range(chunk_count)]
+        metadatas = [{"id": VIDEO_ID, "title": VIDEO_ID, "type": CHUNK_TYPE, "chunk_index": index}
+                     for index in range(chunk_count)]
+        targets = rng.integers(0, chunk_count, args.queries)
+        queries = vectors[targets] + 0.5 * unit_vectors(rng, args.queries, args.dimensions)
+        exact = [list(np.argsort(-(vectors @ query))[:args.k]) for query in queries]
+
+        with tempfile.TemporaryDirectory() as directory:
+            manager = ChromaDBManager(
+                "benchmark-dense", persist_directory=directory,
+                embeddings=FakeEmbeddings(size=args.dimensions))
+            collection = manager.db._collection
+            for video in range(args.other_videos):
+                other = unit_vectors(rng, chunk_count, args.dimensions)
+                collection.upsert(
+                    ids=[f"other-{video}-{index}" for index in range(chunk_count)],
+                    embeddings=other, documents=documents,
+                    metadatas=[dict(metadata, id=f"other-{video}") for metadata in metadatas])
+            collection.upsert(
+                ids=[f"{VIDEO_ID}-{index}" for index in range(chunk_count)],
+                embeddings=vectors, documents=documents, metadatas=metadatas)
+
+            def chroma_search(query):
+                hits = manager.db.similarity_search_by_vector(
+                    query.tolist(), k=args.k, filter=video_filter(VIDEO_ID))
+                return [hit.metadata["chunk_index"] for hit in hits]
+
+            rows = [("chroma", *time_search(chroma_search, queries), None)]
+            for dtype in ("float16", "int8"):
+                DenseStore(f"{directory}/dense-{dtype}", dtype=dtype).build(
+                    VIDEO_ID, vectors, documents, metadatas)
+                # A fresh store opens the index from disk, as after a restart.
+                index: DenseIndex = DenseStore(f"{directory}/dense-{dtype}", dtype=dtype).get(VIDEO_ID)
+                latencies, results = time_search(
+                    lambda query: [position for position, _ in index.search(query, k=args.k)],
+                    queries)
+                rows.append((dtype, latencies, results, index.nbytes))
+
+        for name, latencies, results, nbytes in rows:
+            size = f"{nbytes / 2 ** 20:>7.2f}" if nbytes is not None else f"{'-':>7}"
+            print(f"{chunk_count:>7} {name:>8} {sum(latencies) / len(latencies) * 1000:>8.3f} "
+                  f"{percentile(latencies, 0.95) * 1000:>8.3f} {recall(results, exact):>7.3f} {size}")
+
+
+if __name__ == "__main__":
+    main()
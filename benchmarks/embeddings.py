@@ -0,0 +1,130 @@
+"""
+Compare the throughput of the embedding providers in chunks per second.
+
+Retrieval chunks of a fixture transcript are embedded in batches by every
+requested provider, without the embedding cache, and the local provider is run
+once per `--threads` count. Model loading is timed apart from the throughput.
+Providers whose package, weights or API key are missing are reported as
+skipped with the error.
+
+Usage:
+    python -m benchmarks.embeddings --providers fake local openai --chunks 1000 --threads 1 4
+"""
+import os
+import sys
+import json
+import math
+import time
+import argparse
+import platform
+
+from benchmarks.pipeline import git_revision, percentile
+
+QUESTIONS = 20
+
+
+def build_chunks(count: int):
+    from src.config import config
+    from src.llm.chunker import chunk_transcript
+    from benchmarks.fixtures import FixtureTranscripts, fixture_video_id, WORDS_PER_MINUTE
+
+    minutes = math.ceil(count * config.RETRIEVAL_CHUNK_TOKENS / WORDS_PER_MINUTE) + 1
+    segments = FixtureTranscripts()(fixture_video_id(minutes))
+    _, retrieval_chunks = chunk_transcript(
+        segments, fine_tokens=config.RETRIEVAL_CHUNK_TOKENS,
+        coarse_tokens=config.SUMMARY_CHUNK_TOKENS)
+    return retrieval_chunks.contents()[:count]
+
+
+def measure(model, chunks, batch_size: int) -> dict:
+    started = time.perf_counter()
+    model.embed_documents(chunks[:1])
+    result = {"load_seconds": time.perf_counter() - started}
+
+    started = time.perf_counter()
+    for start in range(0, len(chunks), batch_size):
+        vectors = model.embed_documents(chunks[start:start + batch_size])
+    seconds = time.perf_counter() - started
+    result.update(dimensions=len(vectors[0]), seconds=seconds,
+                  chunks_per_second=len(chunks) / seconds)
+
+    latencies = []
+    for chunk in chunks[:QUESTIONS]:
+        started = time.perf_counter()
+        model.embed_query(" ".join(chunk.split()[:12]))
+        latencies.append(time.perf_counter() - started)
+    result["query_mean_ms"] = sum(latencies) / len(latencies) * 1000
+    result["query_p95_ms"] = percentile(latencies, 0.95) * 1000
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--providers", nargs="+", default=["fake", "local", "openai"])
+    parser.add_argument("--chunks", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=256,
+                        help="Chunks per embedding call.")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, os.cpu_count() or 1],
+                        help="torch thread counts of the local provider.")
+    parser.add_argument("--embedding-latency", type=float, default=0.05,
+                        help="Seconds the fake embedding model waits per call.")
+    parser.add_argument("--output", default="embeddings-benchmark.json")
+    args = parser.parse_args()
+
+    # The configuration is read when `src` is first imported, so it is set up before.
+    os.environ.update({
+        "LLM_BACKEND": "fake",
+        "FAKE_EMBEDDING_LATENCY": str(args.embedding_latency),
+        "EMBEDDING_CACHE_PATH": "",
+        "ANONYMIZED_TELEMETRY": "False",
+    })
+    os.environ.setdefault("OPENAI_API_KEY", "offline")
+
+    from src.config import config
+    from src.llm.model import get_embedding_provider
+    from src.llm.local_embeddings import LocalEmbeddings
+
+    chunks = build_chunks(args.chunks)
+    runs = []
+    for name in args.providers:
+        provider = get_embedding_provider(name)
+        if name == "local":
+            runs += [(name, provider, threads, LocalEmbeddings(
+                provider.model_name, provider.dimensions,
+                batch_size=config.LOCAL_EMBEDDING_BATCH_SIZE, threads=threads))
+                for threads in sorted(set(args.threads))]
+        else:
+            runs.append((name, provider, None, None))
+
+    results = []
+    print(f"{'provider':>9} {'threads':>7} {'model':>40} {'load s':>7} {'chunks/s':>9} {'query ms':>9}")
+    for name, provider, threads, model in runs:
+        result = {"provider": name, "model": provider.model_name, "threads": threads,
+                  "declared_dimensions": provider.dimensions, "chunks": len(chunks)}
+        try:
+            result.update(measure(model or provider.create(), chunks, args.batch_size))
+        except Exception as e:
+            result["skipped"] = f"{type(e).__name__}: {e}"
+            print(f"{name:>9} {threads or '-':>7} {provider.model_name[-40:]:>40} skipped: {result['skipped'][:80]}")
+        else:
+            print(f"{name:>9} {threads or '-':>7} {provider.model_name[-40:]:>40} "
+                  f"{result['load_seconds']:>7.2f} {result['chunks_per_second']:>9.1f} "
+                  f"{result['query_mean_ms']:>9.1f}")
+        results.append(result)
+
+    report = {
+        "revision": git_revision(),
+        "created_at": time.time(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "settings": vars(args),
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Synthetic caption fixtures standing in for the YouTube Transcript API.
+"""
+import random
+import hashlib
+from typing import List
+
+WORDS_PER_MINUTE = 150
+SEGMENT_SECONDS = 5.0
+
+
+def fixture_video_id(minutes: float) -> str:
+    return f"fixture-{minutes:g}m"
+
+
+class FixtureTranscripts:
+    def __init__(self, vocabulary_size: int = 3000, words_per_minute: int = WORDS_PER_MINUTE,
+                 segment_seconds: float = SEGMENT_SECONDS):
+        """
+        Transcript provider returning deterministic captions for fixture video IDs.
+
+        The length of the transcript is read from the ID built by
+        `fixture_video_id`, and its words are drawn from a Zipf-like vocabulary
+        seeded by the ID, so every run sees the same text. Instances are set as
+        `YoutubeLoader.transcript_provider`.
+
+        Args:
+            vocabulary_size (int): Number of distinct words.
+            words_per_minute (int): Speaking rate of the transcript.
+            segment_seconds (float): Duration of each caption segment.
+        """
+        self.vocabulary = [f"word{index}" for index in range(vocabulary_size)]
+        self.weights = [1 / (rank + 1) for rank in range(vocabulary_size)]
+        self.words_per_segment = max(1, round(words_per_minute * segment_seconds / 60))
+        self.segment_seconds = segment_seconds
+
+    def __call__(self, video_id: str) -> List[dict]:
+        minutes = float(video_id.removeprefix("fixture-").removesuffix("m"))
+        seed = int(hashlib.sha256(video_id.encode("utf-8")).hexdigest()[:8], 16)
+        rng = random.Random(seed)
+        segments = []
+        for index in range(int(minutes * 60 / self.segment_seconds)):
+            words = rng.choices(self.vocabulary, weights=self.weights, k=self.words_per_segment)
+            segments.append({
+                "text": " ".join(words),
+                "start": index * self.segment_seconds,
+                "duration": self.segment_seconds,
+            })
+        return segments
@@ -0,0 +1,61 @@
+"""
+Query latency of one video against corpus size, shared collection vs per-video partitions.
+
+Usage:
+    python -m benchmarks.partitioning --videos 1 10 50 100 --chunks-per-video 200
+"""
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+
+from src.constants import CHUNK_TYPE
+from src.vectorDB.chroma import ChromaDBManager
+from src.llm.fakes import FakeEmbeddings
+
+
+def make_chunks(video: int, count: int, rng: random.Random):
+    words = [f"word{index}" for index in range(3000)]
+    return [" ".join(rng.choices(words, k=80)) + f" video{video}" for _ in range(count)]
+
+
+def time_queries(manager: ChromaDBManager, video_ids, queries: int, rng: random.Random) -> float:
+    latencies = []
+    for _ in range(queries):
+        video_id = rng.choice(video_ids)
+        started = time.perf_counter()
+        manager.search_video(f"word{rng.randrange(3000)} word{rng.randrange(3000)}", video_id)
+        latencies.append(time.perf_counter() - started)
+    return sum(latencies) / len(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--videos", type=int, nargs="+", default=[1, 10, 50, 100])
+    parser.add_argument("--chunks-per-video", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"{'videos':>7} {'chunks':>8} {'shared ms':>10} {'partitioned ms':>15}")
+    for video_count in args.videos:
+        rng = random.Random(video_count)
+        corpus = {f"video-{video}": make_chunks(video, args.chunks_per_video, rng)
+                  for video in range(video_count)}
+        results = []
+        for partitioned in (False, True):
+            with tempfile.TemporaryDirectory() as directory:
+                manager = ChromaDBManager(
+                    "benchmark-partitioning", persist_directory=directory,
+                    embeddings=FakeEmbeddings(), partitioned=partitioned)
+                for video_id, chunks in corpus.items():
+                    asyncio.run(manager.add_documents(
+                        chunks, {"id": video_id, "title": video_id, "type": CHUNK_TYPE}))
+                results.append(time_queries(
+                    manager, list(corpus), args.queries, random.Random(0)))
+        print(f"{video_count:>7} {video_count * args.chunks_per_video:>8} "
+              f"{results[0] * 1000:>10.2f} {results[1] * 1000:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
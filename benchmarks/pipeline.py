@@ -0,0 +1,173 @@
+"""
+Time the ingestion, summary, retrieval and answer stages offline across transcript lengths.
+
+The chat and embedding models are replaced by the deterministic stand-ins of
+`src.llm.fakes` (`LLM_BACKEND=fake`) and captions come from
+`benchmarks.fixtures`, so runs need no network access and are comparable
+between commits. The summary, embedding and metadata caches and the
+transcript store are disabled so every run measures cold work.
+
+Usage:
+    python -m benchmarks.pipeline --minutes 5 30 60 180 --output pipeline.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import asyncio
+import argparse
+import platform
+import tempfile
+import subprocess
+
+
+def percentile(values, fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+async def measure(minutes: float, questions: int):
+    from src import run
+    from src.ingestion.jobs import IngestionJob
+    from src.llm.chunker import chunk_transcript
+    from src.llm.invoke import astream_response_message
+    from src.loader.youtube import YoutubeLoader
+    from src.vectorDB.context import context_reports
+    from benchmarks.fixtures import fixture_video_id
+
+    video_id = fixture_video_id(minutes)
+    loader = YoutubeLoader(f"https://www.youtube.com/watch?v={video_id}", video_id, video_id)
+    result = {"minutes": minutes}
+
+    started = time.perf_counter()
+    await run.ingest(loader, IngestionJob(video_id, title=video_id))
+    result["ingest_seconds"] = time.perf_counter() - started
+
+    summary_chunks, retrieval_chunks = chunk_transcript(
+        loader.segments,
+        fine_tokens=run.config.RETRIEVAL_CHUNK_TOKENS,
+        coarse_tokens=run.config.SUMMARY_CHUNK_TOKENS)
+    result.update(segments=len(loader.segments), summary_chunks=len(summary_chunks),
+                  retrieval_chunks=len(retrieval_chunks))
+
+    started = time.perf_counter()
+    await run.generate_summary(summary_chunks.contents())
+    result["summarize_seconds"] = time.perf_counter() - started
+
+    rng = random.Random(0)
+    words = loader.sub_title.split()
+    context_latencies, first_token_latencies, answer_latencies = [], [], []
+    context_tokens, baseline_tokens = [], []
+    for _ in range(questions):
+        question = "what do they say about " + " ".join(rng.sample(words, 3))
+        started = time.perf_counter()
+        context = run.get_context(question, video_id, video_id)
+        context_latencies.append(time.perf_counter() - started)
+        context_tokens.append(context_reports[-1]["context_tokens"])
+        baseline_tokens.append(context_reports[-1]["baseline_tokens"])
+
+        started = time.perf_counter()
+        first_token = None
+        async for _ in astream_response_message(context, question):
+            if first_token is None:
+                first_token = time.perf_counter() - started
+        answer_latencies.append(time.perf_counter() - started)
+        first_token_latencies.append(first_token or answer_latencies[-1])
+
+    for name, latencies in (("get_context", context_latencies),
+                            ("answer_first_token", first_token_latencies),
+                            ("answer", answer_latencies)):
+        result[f"{name}_mean_ms"] = sum(latencies) / len(latencies) * 1000
+        result[f"{name}_p95_ms"] = percentile(latencies, 0.95) * 1000
+    result["context_tokens_mean"] = sum(context_tokens) / len(context_tokens)
+    result["baseline_context_tokens_mean"] = sum(baseline_tokens) / len(baseline_tokens)
+    result["prompt_token_reduction"] = 1 - sum(context_tokens) / max(sum(baseline_tokens), 1)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--minutes", type=float, nargs="+", default=[5, 30, 60, 180],
+                        help="Transcript lengths to benchmark.")
+    parser.add_argument("--questions", type=int, default=20)
+    parser.add_argument("--llm-latency", type=float, default=0.5,
+                        help="Seconds the fake chat model waits before answering.")
+    parser.add_argument("--llm-seconds-per-token", type=float, default=0.01)
+    parser.add_argument("--llm-output-tokens", type=int, default=64)
+    parser.add_argument("--embedding-latency", type=float, default=0.05,
+                        help="Seconds the fake embedding model waits per call.")
+    parser.add_argument("--output", default="pipeline-benchmark.json")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="pipeline-benchmark-")
+    # The configuration is read when `src` is first imported, so it is set up before.
+    os.environ.update({
+        "LLM_BACKEND": "fake",
+        "FAKE_LLM_LATENCY": str(args.llm_latency),
+        "FAKE_LLM_SECONDS_PER_TOKEN": str(args.llm_seconds_per_token),
+        "FAKE_LLM_OUTPUT_TOKENS": str(args.llm_output_tokens),
+        "FAKE_EMBEDDING_LATENCY": str(args.embedding_latency),
+        "CHROMA_PERSIST_DIRECTORY": directory,
+        "EMBEDDING_CACHE_PATH": "",
+        "SUMMARY_CACHE_PATH": "",
+        "TRANSCRIPT_STORE_PATH": "",
+        "METADATA_CACHE_PATH": "",
+        "ANONYMIZED_TELEMETRY": "False",
+    })
+    os.environ.setdefault("OPENAI_API_KEY", "offline")
+
+    from src.config import config
+    from src.loader.youtube import YoutubeLoader
+    from benchmarks.fixtures import FixtureTranscripts
+
+    YoutubeLoader.transcript_provider = FixtureTranscripts()
+
+    results = []
+    print(f"{'minutes':>8} {'chunks':>7} {'ingest s':>9} {'summary s':>10} "
+          f"{'context ms':>11} {'context tokens':>15} {'first token ms':>15} {'answer ms':>10}")
+    try:
+        for minutes in args.minutes:
+            result = asyncio.run(measure(minutes, args.questions))
+            results.append(result)
+            print(f"{minutes:>8g} {result['retrieval_chunks']:>7} {result['ingest_seconds']:>9.2f} "
+                  f"{result['summarize_seconds']:>10.2f} {result['get_context_mean_ms']:>11.1f} "
+                  f"{result['context_tokens_mean']:>6.0f} ({-result['prompt_token_reduction']:>+6.1%}) "
+                  f"{result['answer_first_token_mean_ms']:>15.1f} {result['answer_mean_ms']:>10.1f}")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    report = {
+        "revision": git_revision(),
+        "created_at": time.time(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "settings": {
+            **vars(args),
+            "summary_chunk_tokens": config.SUMMARY_CHUNK_TOKENS,
+            "retrieval_chunk_tokens": config.RETRIEVAL_CHUNK_TOKENS,
+            "summary_token_max": config.SUMMARY_TOKEN_MAX,
+            "llm_max_concurrency": config.LLM_MAX_CONCURRENCY,
+            "vector_store_partitioned": config.VECTOR_STORE_PARTITIONED,
+            "context_token_budget": config.CONTEXT_TOKEN_BUDGET,
+            "context_candidates": config.CONTEXT_CANDIDATES,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Compare retrieval quality and latency of vector-only, hybrid and lexical fast path search.
+
+A synthetic transcript is indexed with a bag-of-words embedding that sleeps to
+stand in for the remote embedding call. Half of the questions are keyword
+lookups of a rare term from one chunk, the other half reuse common words of
+the chunk.
+
+Usage:
+    python -m benchmarks.retrieval --chunks 400 --queries 200 --embedding-latency 0.15
+"""
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+
+from src.llm.fakes import FakeEmbeddings
+from src.vectorDB.chroma import ChromaDBManager, video_filter
+
+VIDEO_ID = "benchmark-video"
+
+
+def build_corpus(chunks: int, seed: int = 0):
+    rng = random.Random(seed)
+    common = [f"word{index}" for index in range(2000)]
+    documents, rare_terms = [], []
+    for index in range(chunks):
+        rare = [f"name{index}x{extra}" for extra in range(2)]
+        words = rng.choices(common, weights=[1 / (rank + 1) for rank in range(len(common))], k=80)
+        words[rng.randrange(len(words))] = rare[0]
+        words[rng.randrange(len(words))] = rare[1]
+        documents.append(" ".join(words))
+        rare_terms.append(rare)
+    return documents, rare_terms
+
+
+def build_queries(documents, rare_terms, count: int, seed: int = 1):
+    rng = random.Random(seed)
+    queries = []
+    for number in range(count):
+        target = rng.randrange(len(documents))
+        if number % 2 == 0:
+            queries.append((f"what did they say about {rare_terms[target][0]}", target))
+        else:
+            words = [word for word in documents[target].split() if not word.startswith("name")]
+            queries.append((" ".join(rng.sample(words, 6)), target))
+    return queries
+
+
+def evaluate(name: str, search, queries, documents):
+    content_to_index = {content: index for index, content in enumerate(documents)}
+    recall, reciprocal_ranks, latencies = 0, 0.0, []
+    for query, target in queries:
+        started = time.perf_counter()
+        results = search(query)
+        latencies.append(time.perf_counter() - started)
+        ranked = [content_to_index.get(document.page_content) for document in results]
+        if target in ranked:
+            recall += 1
+            reciprocal_ranks += 1 / (ranked.index(target) + 1)
+    latencies.sort()
+    print(
+        f"{name:<14} recall@5 {recall / len(queries):.3f}  MRR {reciprocal_ranks / len(queries):.3f}  "
+        f"mean {sum(latencies) / len(latencies) * 1000:7.1f} ms  "
+        f"p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:7.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunks", type=int, default=400)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--embedding-latency", type=float, default=0.15,
+                        help="Seconds slept per query embedding.")
+    parser.add_argument("--threshold", type=float, default=0.6,
+                        help="BM25 confidence of the lexical fast path.")
+    args = parser.parse_args()
+
+    documents, rare_terms = build_corpus(args.chunks)
+    queries = build_queries(documents, rare_terms, args.queries)
+    with tempfile.TemporaryDirectory() as directory:
+        manager = ChromaDBManager(
+            "benchmark-retrieval", persist_directory=directory,
+            embeddings=FakeEmbeddings(latency=args.embedding_latency))
+        asyncio.run(manager.add_documents(
+            documents, {"id": VIDEO_ID, "title": VIDEO_ID, "type": "chunk"}))
+
+        evaluate("vector", lambda query: manager.query(
+            query, filter_query=video_filter(VIDEO_ID)), queries, documents)
+        evaluate("hybrid", lambda query: manager.search_video(
+            query, VIDEO_ID), queries, documents)
+        evaluate("hybrid+fast", lambda query: manager.search_video(
+            query, VIDEO_ID, fast_path_threshold=args.threshold), queries, documents)
+
+
+if __name__ == "__main__":
+    main()
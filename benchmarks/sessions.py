@@ -0,0 +1,211 @@
+"""
+Load test of concurrent chat sessions running the Streamlit app in one process.
+
+Every session is an `AppTest` of `app.py` driven from its own thread. It sends
+the URL of a fixture video, then asks `--questions` questions, and all sessions
+start together so their turns interleave. Sessions are spread over `--videos`
+videos, so some share an ingestion job. Each reply must name the video of its
+own session, and any reply naming another video is counted as cross-talk. The
+report shows the latency of the chat turns and how many times each shared
+resource was built, which should be once per process. Models are the offline
+stand-ins of `LLM_BACKEND=fake`, and titles are served by a local stand-in of
+the watch page.
+
+Usage:
+    python -m benchmarks.sessions --sessions 1 8 32 --questions 5 --videos 4
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from benchmarks.pipeline import git_revision, percentile
+from benchmarks.startup import APP_PATH
+
+
+def video_title(video_id: str) -> str:
+    return f"Video {video_id}"
+
+
+class WatchPageHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        video_id = parse_qs(urlparse(self.path).query)["v"][0]
+        body = f"<html><title>{video_title(video_id)}</title></html>".encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def share_test_runtime():
+    """
+    Keep a Streamlit runtime installed between the `AppTest` runs of all sessions.
+
+    `AppTest` installs a mock runtime for the length of each run and removes it
+    when done, so with sessions running at once one session would remove it
+    from under the script of another. The last runtime installed is returned
+    instead of failing.
+    """
+    from streamlit.runtime import Runtime
+
+    latest = []
+
+    def instance(cls):
+        if cls._instance is not None:
+            latest[:] = [cls._instance]
+        if not latest:
+            raise RuntimeError("Runtime hasn't been created!")
+        return latest[0]
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(lambda cls: cls._instance is not None or bool(latest))
+
+
+def run_session(video_id: str, questions: int, start: threading.Barrier, timeout: float) -> dict:
+    from streamlit.testing.v1 import AppTest
+    from src.constants import URL_KEY_TERM
+    from benchmarks.fixtures import FixtureTranscripts
+
+    rng = random.Random(video_id)
+    vocabulary = FixtureTranscripts().vocabulary[:200]
+    expected = f"**{video_title(video_id)}**"
+    app = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    app.run()
+    start.wait()
+
+    result = {"video_id": video_id, "crosstalk": 0, "errors": 0, "latencies": []}
+    messages = [f"{URL_KEY_TERM} https://www.youtube.com/watch?v={video_id}"] + [
+        "what do they say about " + " ".join(rng.sample(vocabulary, 3)) for _ in range(questions)]
+    for turn, message in enumerate(messages):
+        started = time.perf_counter()
+        app.chat_input[0].set_value(message).run()
+        elapsed = time.perf_counter() - started
+        if app.exception:
+            result["errors"] += 1
+            continue
+        reply = app.session_state["messages"][-1]["content"]
+        if not reply.startswith(expected):
+            result["crosstalk"] += 1
+        if turn == 0:
+            result["url_seconds"] = elapsed
+        else:
+            result["latencies"].append(elapsed)
+    return result
+
+
+def run_level(sessions: int, videos: list, questions: int, timeout: float) -> dict:
+    start = threading.Barrier(sessions)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as executor:
+        futures = [executor.submit(run_session, videos[index % len(videos)], questions, start, timeout)
+                   for index in range(sessions)]
+        results = [future.result() for future in futures]
+    seconds = time.perf_counter() - started
+
+    latencies = [latency for result in results for latency in result["latencies"]]
+    return {
+        "sessions": sessions,
+        "seconds": seconds,
+        "turns": len(latencies),
+        "turns_per_second": len(latencies) / seconds,
+        "url_mean_seconds": sum(result.get("url_seconds", 0) for result in results) / sessions,
+        "turn_p50_ms": percentile(latencies, 0.5) * 1000 if latencies else None,
+        "turn_p95_ms": percentile(latencies, 0.95) * 1000 if latencies else None,
+        "crosstalk": sum(result["crosstalk"] for result in results),
+        "errors": sum(result["errors"] for result in results),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 8, 32],
+                        help="Concurrent sessions of each run.")
+    parser.add_argument("--questions", type=int, default=5, help="Questions per session.")
+    parser.add_argument("--videos", type=int, default=4, help="Distinct videos the sessions open.")
+    parser.add_argument("--minutes", type=int, default=5,
+                        help="Length of the shortest fixture video, the others are a minute longer each.")
+    parser.add_argument("--llm-latency", type=float, default=0.2,
+                        help="Seconds the fake chat model waits before answering.")
+    parser.add_argument("--embedding-latency", type=float, default=0.02,
+                        help="Seconds the fake embedding model waits per call.")
+    parser.add_argument("--timeout", type=float, default=300, help="Seconds allowed per turn.")
+    parser.add_argument("--output", default="sessions-benchmark.json")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), WatchPageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    directory = tempfile.mkdtemp(prefix="sessions-benchmark-")
+    # The configuration is read when `src` is first imported, so it is set up before.
+    os.environ.update({
+        "LLM_BACKEND": "fake",
+        "FAKE_LLM_LATENCY": str(args.llm_latency),
+        "FAKE_EMBEDDING_LATENCY": str(args.embedding_latency),
+        "CHROMA_PERSIST_DIRECTORY": directory,
+        "EMBEDDING_CACHE_PATH": "",
+        "SUMMARY_CACHE_PATH": "",
+        "TRANSCRIPT_STORE_PATH": "",
+        "METADATA_CACHE_PATH": "",
+        "ANONYMIZED_TELEMETRY": "False",
+        "WHISPER_WARMUP": "",
+        "INGESTION_MAX_PENDING": str(max(args.videos, 8)),
+    })
+    os.environ.setdefault("OPENAI_API_KEY", "offline")
+
+    from src.loader.youtube import YoutubeLoader
+    from src.loader.metadata import metadata_resolver
+    from src.utils.resources import resources
+    from benchmarks.fixtures import FixtureTranscripts, fixture_video_id
+
+    YoutubeLoader.transcript_provider = FixtureTranscripts()
+    share_test_runtime()
+    metadata_resolver.watch_url = f"http://127.0.0.1:{server.server_port}/watch?v={{video_id}}"
+
+    results = []
+    print(f"{'sessions':>8} {'turns':>6} {'turns/s':>8} {'url s':>7} {'p50 ms':>8} "
+          f"{'p95 ms':>8} {'crosstalk':>9} {'errors':>6}")
+    try:
+        for run, sessions in enumerate(args.sessions):
+            # New videos per run, so every run ingests what it opens.
+            videos = [fixture_video_id(args.minutes + run * args.videos + index)
+                      for index in range(args.videos)]
+            result = run_level(sessions, videos, args.questions, args.timeout)
+            results.append(result)
+            print(f"{sessions:>8} {result['turns']:>6} {result['turns_per_second']:>8.2f} "
+                  f"{result['url_mean_seconds']:>7.2f} {result['turn_p50_ms'] or 0:>8.1f} "
+                  f"{result['turn_p95_ms'] or 0:>8.1f} {result['crosstalk']:>9} {result['errors']:>6}")
+    finally:
+        server.shutdown()
+        shutil.rmtree(directory, ignore_errors=True)
+
+    print("Builds per shared resource: " + ", ".join(
+        f"{name}={stats['builds']}" for name, stats in resources.stats.items() if stats["builds"]))
+
+    report = {
+        "revision": git_revision(),
+        "created_at": time.time(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "settings": vars(args),
+        "results": results,
+        "resources": resources.stats,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Time the cold import of the app, its Streamlit script reruns and its first retrieval.
+
+Every repeat runs in a fresh interpreter, which imports `src.run`, runs
+`app.py` once and then `--reruns` more times with Streamlit's `AppTest`, and
+finally retrieves context for a question, which opens the vector store and the
+embedding model. The heavy dependencies loaded after each step are listed, so
+runs on two revisions show what moved off the startup path. Models are the
+offline stand-ins of `LLM_BACKEND=fake`.
+
+Usage:
+    python -m benchmarks.startup --repeats 5 --reruns 20 --output startup.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+
+from benchmarks.pipeline import git_revision, percentile
+
+HEAVY_MODULES = ("torch", "whisper", "yt_dlp", "bs4", "youtube_transcript_api", "langgraph",
+                 "langchain", "langchain_core", "langchain_openai", "openai",
+                 "langchain_chroma", "chromadb")
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+
+def loaded_modules():
+    return [name for name in HEAVY_MODULES if name in sys.modules]
+
+
+def measure(reruns: int) -> dict:
+    """Run one repeat in the current, fresh interpreter."""
+    result = {}
+    started = time.perf_counter()
+    from src import run
+    result["import_seconds"] = time.perf_counter() - started
+    result["modules_after_import"] = loaded_modules()
+
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(APP_PATH, default_timeout=120)
+    started = time.perf_counter()
+    app.run()
+    result["first_run_seconds"] = time.perf_counter() - started
+    latencies = []
+    for _ in range(reruns):
+        started = time.perf_counter()
+        app.run()
+        latencies.append(time.perf_counter() - started)
+    result["rerun_mean_ms"] = sum(latencies) / len(latencies) * 1000
+    result["rerun_p95_ms"] = percentile(latencies, 0.95) * 1000
+    result["modules_after_reruns"] = loaded_modules()
+
+    started = time.perf_counter()
+    run.get_context("what is this video about", "startup-benchmark")
+    result["first_retrieval_seconds"] = time.perf_counter() - started
+    result["modules_after_retrieval"] = loaded_modules()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeats", type=int, default=5,
+                        help="Fresh interpreters to measure.")
+    parser.add_argument("--reruns", type=int, default=20,
+                        help="Script reruns timed after the first run.")
+    parser.add_argument("--output", default="startup-benchmark.json")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.reruns)))
+        return
+
+    directory = tempfile.mkdtemp(prefix="startup-benchmark-")
+    environment = dict(
+        os.environ,
+        LLM_BACKEND="fake",
+        FAKE_EMBEDDING_LATENCY="0",
+        CHROMA_PERSIST_DIRECTORY=directory,
+        EMBEDDING_CACHE_PATH="",
+        SUMMARY_CACHE_PATH="",
+        TRANSCRIPT_STORE_PATH="",
+        METADATA_CACHE_PATH="",
+        ANONYMIZED_TELEMETRY="False",
+        WHISPER_WARMUP="",
+    )
+    environment.setdefault("OPENAI_API_KEY", "offline")
+
+    results = []
+    print(f"{'repeat':>6} {'import s':>9} {'first run s':>12} {'rerun ms':>9} {'retrieval s':>12}")
+    try:
+        for repeat in range(args.repeats):
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.startup", "--child", "--reruns", str(args.reruns)],
+                env=environment, capture_output=True, text=True, check=True).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            results.append(result)
+            print(f"{repeat:>6} {result['import_seconds']:>9.2f} {result['first_run_seconds']:>12.2f} "
+                  f"{result['rerun_mean_ms']:>9.1f} {result['first_retrieval_seconds']:>12.2f}")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    for step in ("import", "reruns", "retrieval"):
+        print(f"Loaded after {step}: {', '.join(results[-1][f'modules_after_{step}']) or '-'}")
+
+    report = {
+        "revision": git_revision(),
+        "created_at": time.time(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "settings": vars(args),
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Compare wall-clock time of the single-call and segmented Whisper paths.
+
+Usage:
+    python -m benchmarks.transcription path/to/audio.mp3 --model base --workers 4
+"""
+import time
+import argparse
+
+from src.loader.whisper_pool import whisper_pool
+from src.loader.segmented import transcribe_segmented
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("audio_path")
+    parser.add_argument("--model", default="base")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--segment-seconds", type=float, default=300)
+    args = parser.parse_args()
+
+    # Load outside the timed region so both paths are compared on transcription only.
+    whisper_pool.warm_up([args.model])
+
+    started = time.perf_counter()
+    single = whisper_pool.transcribe(args.audio_path, size=args.model)
+    single_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    segmented = transcribe_segmented(
+        args.audio_path,
+        size=args.model,
+        workers=args.workers,
+        segment_seconds=args.segment_seconds,
+    )
+    segmented_seconds = time.perf_counter() - started
+
+    print(f"single:    {single_seconds:.2f}s, {len(single['segments'])} segments")
+    print(f"segmented: {segmented_seconds:.2f}s, {len(segmented['segments'])} segments")
+    print(f"speedup:   {single_seconds / segmented_seconds:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
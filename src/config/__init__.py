@@ -22,6 +22,126 @@ def load_config():
 
     config.OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
+    # "openai", or "fake" for the deterministic offline stand-ins used by the benchmarks
+    config.LLM_BACKEND = os.getenv("LLM_BACKEND", "openai")
+    config.FAKE_LLM_LATENCY = float(os.getenv("FAKE_LLM_LATENCY", "0.5"))
+    config.FAKE_LLM_SECONDS_PER_TOKEN = float(
+        os.getenv("FAKE_LLM_SECONDS_PER_TOKEN", "0.01"))
+    config.FAKE_LLM_OUTPUT_TOKENS = int(os.getenv("FAKE_LLM_OUTPUT_TOKENS", "64"))
+    config.FAKE_EMBEDDING_LATENCY = float(
+        os.getenv("FAKE_EMBEDDING_LATENCY", "0.05"))
+
+    # Per-stage spans written as JSON lines (standard output when the path is
+    # empty) and metrics in the Prometheus text format, to a file or over HTTP
+    config.TRACING_ENABLED = os.getenv(
+        "TRACING_ENABLED", "false").lower() in ("1", "true", "yes")
+    config.TRACE_LOG_PATH = os.getenv("TRACE_LOG_PATH", "")
+    config.METRICS_PATH = os.getenv("METRICS_PATH", "")
+    config.METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+
+    # Embedding provider: "openai", "local" (sentence-transformers on the CPU)
+    # or "fake", following LLM_BACKEND when empty
+    config.EMBEDDING_PROVIDER = os.getenv("EMBEDDING_PROVIDER") or (
+        "fake" if config.LLM_BACKEND == "fake" else "openai")
+    config.LOCAL_EMBEDDING_MODEL = os.getenv(
+        "LOCAL_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+    config.LOCAL_EMBEDDING_DIMENSIONS = int(
+        os.getenv("LOCAL_EMBEDDING_DIMENSIONS", "384"))
+    config.LOCAL_EMBEDDING_BATCH_SIZE = int(
+        os.getenv("LOCAL_EMBEDDING_BATCH_SIZE", "64"))
+    config.LOCAL_EMBEDDING_THREADS = int(os.getenv("LOCAL_EMBEDDING_THREADS", "0"))
+
+    # Embedding cache, disabled when the path is empty
+    config.EMBEDDING_CACHE_PATH = os.getenv(
+        "EMBEDDING_CACHE_PATH", "./cache/embeddings.sqlite")
+    config.EMBEDDING_CACHE_MAX_ENTRIES = int(
+        os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "500000"))
+    config.EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "256"))
+    config.EMBEDDING_MAX_CONCURRENCY = int(
+        os.getenv("EMBEDDING_MAX_CONCURRENCY", "4"))
+
+    # LLM call limits and the summary cache, disabled when the path is empty
+    config.LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+    config.LLM_REQUESTS_PER_MINUTE = int(
+        os.getenv("LLM_REQUESTS_PER_MINUTE", "500"))
+    config.LLM_TOKENS_PER_MINUTE = int(
+        os.getenv("LLM_TOKENS_PER_MINUTE", "200000"))
+    # Connection pool of the OpenAI chat and embedding clients, shared by every session
+    config.HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "32"))
+    config.HTTP_MAX_KEEPALIVE_CONNECTIONS = int(
+        os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "16"))
+    config.HTTP_TIMEOUT_SECONDS = float(os.getenv("HTTP_TIMEOUT_SECONDS", "60"))
+    config.SUMMARY_CACHE_PATH = os.getenv(
+        "SUMMARY_CACHE_PATH", "./cache/summaries.sqlite")
+    # Token sizes of the transcript chunks summarized and indexed for retrieval
+    config.SUMMARY_CHUNK_TOKENS = int(os.getenv("SUMMARY_CHUNK_TOKENS", "1250"))
+    config.RETRIEVAL_CHUNK_TOKENS = int(
+        os.getenv("RETRIEVAL_CHUNK_TOKENS", "125"))
+    # Token size of the summary groups reduced together at each collapse level
+    config.SUMMARY_TOKEN_MAX = int(os.getenv("SUMMARY_TOKEN_MAX", "1000"))
+
+    # Raw transcripts kept for re-chunking without refetching, disabled when the path is empty
+    config.TRANSCRIPT_STORE_PATH = os.getenv(
+        "TRANSCRIPT_STORE_PATH", "./cache/transcripts.sqlite")
+
+    # Video metadata cache, kept in memory only when the path is empty
+    config.METADATA_CACHE_PATH = os.getenv(
+        "METADATA_CACHE_PATH", "./cache/metadata.sqlite")
+    config.METADATA_CACHE_TTL_SECONDS = float(
+        os.getenv("METADATA_CACHE_TTL_SECONDS", "86400"))
+
+    config.CHROMA_PERSIST_DIRECTORY = os.getenv(
+        "CHROMA_PERSIST_DIRECTORY", "./chroma_db")
+    # Store each video in its own Chroma collection
+    config.VECTOR_STORE_PARTITIONED = os.getenv(
+        "VECTOR_STORE_PARTITIONED", "false").lower() in ("1", "true", "yes")
+
+    # Per-video in-process vector indexes: "float16", "int8", or empty to search Chroma
+    config.DENSE_INDEX_DTYPE = os.getenv("DENSE_INDEX_DTYPE", "float16")
+    config.DENSE_INDEX_MAX_LOADED = int(os.getenv("DENSE_INDEX_MAX_LOADED", "32"))
+
+    # Hybrid retrieval: BM25 confidence above which the vector search is skipped
+    config.LEXICAL_FAST_PATH_THRESHOLD = float(
+        os.getenv("LEXICAL_FAST_PATH_THRESHOLD", "0.6"))
+
+    # Context packing: retrieved candidates, MMR weight and prompt token budget
+    config.CONTEXT_CANDIDATES = int(os.getenv("CONTEXT_CANDIDATES", "20"))
+    config.CONTEXT_MMR_LAMBDA = float(os.getenv("CONTEXT_MMR_LAMBDA", "0.7"))
+    config.CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "500"))
+
+    # Per-video answer cache
+    config.ANSWER_CACHE_SIMILARITY = float(
+        os.getenv("ANSWER_CACHE_SIMILARITY", "0.95"))
+    config.ANSWER_CACHE_TTL_SECONDS = float(
+        os.getenv("ANSWER_CACHE_TTL_SECONDS", "86400"))
+    config.ANSWER_CACHE_MAX_ENTRIES = int(
+        os.getenv("ANSWER_CACHE_MAX_ENTRIES", "5000"))
+
+    # Background ingestion queue
+    config.INGESTION_WORKERS = int(os.getenv("INGESTION_WORKERS", "2"))
+    config.INGESTION_MAX_PENDING = int(os.getenv("INGESTION_MAX_PENDING", "8"))
+
+    # Whisper fallback transcription
+    config.WHISPER_MODEL = os.getenv("WHISPER_MODEL", "base")
+    config.WHISPER_MEMORY_BUDGET_MB = int(
+        os.getenv("WHISPER_MEMORY_BUDGET_MB", "2048"))
+    config.WHISPER_WARMUP = [
+        size.strip() for size in os.getenv("WHISPER_WARMUP", "").split(",")
+        if size.strip()
+    ]
+    # "single" sends the whole file to one Whisper call, "segmented" splits it
+    # at silence and transcribes the segments on a process pool, "streaming"
+    # transcribes fixed-length windows while the audio is downloaded.
+    config.TRANSCRIPTION_MODE = os.getenv("TRANSCRIPTION_MODE", "single")
+    config.TRANSCRIPTION_WORKERS = int(
+        os.getenv("TRANSCRIPTION_WORKERS") or os.cpu_count() or 1)
+    config.TRANSCRIPTION_SEGMENT_SECONDS = float(
+        os.getenv("TRANSCRIPTION_SEGMENT_SECONDS", "300"))
+    config.TRANSCRIPTION_WINDOW_SECONDS = float(
+        os.getenv("TRANSCRIPTION_WINDOW_SECONDS", "30"))
+    config.TRANSCRIPTION_MAX_PENDING_WINDOWS = int(
+        os.getenv("TRANSCRIPTION_MAX_PENDING_WINDOWS", "4"))
+
     return config
 
 
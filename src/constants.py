@@ -1,9 +1,12 @@
 COLLECTION_NAME = "test-1"
 CHUNK_TYPE = "chunk"
 SUMMARY_TYPE = "summary"
+# Bump when chunking, summarizing or embedding changes the stored data.
+PIPELINE_VERSION = "1"
 
 WRONG_URL_RESPONSE = "URL from youtube are only accepted."
 EXTRACTION_FAILED_RESPONSE = "Text Couldn't be extracted from the video provided."
+INGESTION_BUSY_RESPONSE = "Too many videos are being processed right now. Please try again in a moment."
 
 URL_KEY_TERM = "SET_NEW_URL"
 NO_URL_RESPONSE = f"Use `{URL_KEY_TERM}` to set youtube URL to start chatting."
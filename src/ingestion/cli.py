@@ -0,0 +1,185 @@
+"""
+Ingest YouTube videos in bulk without the Streamlit app.
+
+Sources can be video URLs, playlist or channel URLs, or files with one URL per
+line. Progress is written to a manifest file so an interrupted run continues
+where it stopped when started again with the same manifest.
+
+Usage:
+    python -m src.ingestion.cli urls.txt "https://www.youtube.com/playlist?list=..." \\
+        --manifest ingest-manifest.json --network 8 --whisper 1 --llm 4
+"""
+import os
+import json
+import time
+import asyncio
+import argparse
+from typing import List
+
+from ..config import config
+from ..llm.graph import MapCacheWarmer
+from ..loader.youtube import YoutubeLoader
+from ..run import get_db_manager, get_response
+from ..utils.tracing import tracer
+
+DONE_STATUS = "done"
+SKIPPED_STATUS = "skipped"
+FAILED_STATUS = "failed"
+COLLECTION_MARKERS = ("list=", "/playlist", "/channel/", "/c/", "/user/", "/@")
+WATCH_URL = "https://www.youtube.com/watch?v={video_id}"
+
+
+def expand_collection(url: str) -> List[str]:
+    """Return the video URLs of a playlist or channel."""
+    import yt_dlp as youtube_dl
+
+    options = {"extract_flat": True, "quiet": True, "no_warnings": True}
+    with youtube_dl.YoutubeDL(options) as ydl:
+        info = ydl.extract_info(url, download=False)
+    urls = []
+    for entry in info.get("entries") or []:
+        if entry.get("_type") == "playlist" or "entries" in entry:
+            # Channel pages list their tabs (videos, shorts, ...) as nested playlists.
+            urls.extend(expand_collection(entry["url"]))
+        elif entry.get("id"):
+            urls.append(WATCH_URL.format(video_id=entry["id"]))
+    return urls
+
+
+def read_sources(sources: List[str]) -> List[str]:
+    """Resolve files, playlists and channels into a de-duplicated list of video URLs."""
+    urls = []
+    for source in sources:
+        if os.path.isfile(source):
+            with open(source) as f:
+                lines = [line.strip() for line in f]
+            urls.extend(read_sources(
+                [line for line in lines if line and not line.startswith("#")]))
+        elif any(marker in source for marker in COLLECTION_MARKERS) and "watch?v=" not in source:
+            urls.extend(expand_collection(source))
+        else:
+            urls.append(source)
+    return list(dict.fromkeys(urls))
+
+
+class RunManifest:
+    def __init__(self, path: str):
+        """
+        Per-URL status of a batch run, rewritten atomically after every video.
+
+        Args:
+            path (str): Path of the JSON manifest file.
+        """
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.entries = json.load(f)
+
+    def is_finished(self, url: str) -> bool:
+        return self.entries.get(url, {}).get("status") in (DONE_STATUS, SKIPPED_STATUS)
+
+    def record(self, url: str, **entry):
+        self.entries[url] = entry
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, "w") as f:
+            json.dump(self.entries, f, indent=2)
+        os.replace(temporary_path, self.path)
+
+
+class BatchIngestor:
+    def __init__(self, manifest: RunManifest, network: int = 8, whisper: int = 1, llm: int = 4):
+        """
+        Ingests videos concurrently with a separate limit per pipeline stage.
+
+        Args:
+            manifest (RunManifest): Where the status of every URL is recorded.
+            network (int): Concurrent metadata, caption and audio downloads.
+            whisper (int): Concurrent Whisper transcriptions.
+            llm (int): Videos summarized and embedded at the same time.
+        """
+        self.manifest = manifest
+        self.network = asyncio.Semaphore(network)
+        self.whisper = asyncio.Semaphore(whisper)
+        self.llm = asyncio.Semaphore(llm)
+        self.videos = 0
+        self.chunks = 0
+
+    async def ingest(self, url: str):
+        try:
+            async with self.network:
+                loader = await asyncio.to_thread(YoutubeLoader.from_youtube_url, url)
+            if get_db_manager().get_ingested(loader.video_id):
+                self.manifest.record(url, status=SKIPPED_STATUS, video_id=loader.video_id)
+                print(f"Skipping {url}, already ingested.")
+                return
+
+            with tracer.span("ingest", video_id=loader.video_id):
+                audio_path = None
+                if not loader.load_stored():
+                    async with self.network:
+                        await asyncio.to_thread(loader.fetch_captions)
+                        if not loader.sub_title and config.TRANSCRIPTION_MODE != "streaming":
+                            audio_path = await asyncio.to_thread(loader.download_audio)
+                if not loader.sub_title and config.TRANSCRIPTION_MODE == "streaming":
+                    # Downloads while transcribing, so it only takes a Whisper slot.
+                    warmer = MapCacheWarmer(
+                        fine_tokens=config.RETRIEVAL_CHUNK_TOKENS,
+                        coarse_tokens=config.SUMMARY_CHUNK_TOKENS)
+                    async with self.whisper:
+                        await asyncio.to_thread(loader.stream_audio, warmer)
+                    await asyncio.to_thread(warmer.close)
+                elif audio_path:
+                    async with self.whisper:
+                        await asyncio.to_thread(loader.transcribe_audio, audio_path)
+                if not loader.sub_title:
+                    raise ValueError("No transcript could be extracted.")
+
+                async with self.llm:
+                    await get_response(loader)
+            entry = get_db_manager().get_ingested(loader.video_id) or {}
+            chunk_count = entry.get("chunk_count", 0)
+            self.videos += 1
+            self.chunks += chunk_count
+            self.manifest.record(
+                url, status=DONE_STATUS, video_id=loader.video_id, chunks=chunk_count)
+            print(f"Ingested {url} ({chunk_count} chunks).")
+        except Exception as e:
+            self.manifest.record(url, status=FAILED_STATUS, error=str(e))
+            print(f"Failed to ingest {url}: {e}")
+
+    async def run(self, urls: List[str]):
+        pending = [url for url in urls if not self.manifest.is_finished(url)]
+        print(f"{len(urls) - len(pending)} of {len(urls)} videos already finished.")
+        started = time.perf_counter()
+        await asyncio.gather(*[self.ingest(url) for url in pending])
+        elapsed = time.perf_counter() - started
+        print(
+            f"Ingested {self.videos} videos and {self.chunks} chunks in {elapsed:.1f}s: "
+            f"{self.videos / elapsed * 60 if elapsed else 0:.2f} videos/min, "
+            f"{self.chunks / elapsed if elapsed else 0:.2f} chunks/sec.")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("sources", nargs="+",
+                        help="Video, playlist or channel URLs, or files of URLs.")
+    parser.add_argument("--manifest", default="ingest-manifest.json",
+                        help="Run manifest used to resume an interrupted run.")
+    parser.add_argument("--network", type=int, default=8,
+                        help="Concurrent metadata, caption and audio downloads.")
+    parser.add_argument("--whisper", type=int, default=1,
+                        help="Concurrent Whisper transcriptions.")
+    parser.add_argument("--llm", type=int, default=4,
+                        help="Videos summarized and embedded at the same time.")
+    args = parser.parse_args()
+
+    urls = read_sources(args.sources)
+    ingestor = BatchIngestor(
+        RunManifest(args.manifest), network=args.network, whisper=args.whisper, llm=args.llm)
+    asyncio.run(ingestor.run(urls))
+
+
+if __name__ == "__main__":
+    main()
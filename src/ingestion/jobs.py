@@ -0,0 +1,142 @@
+import time
+import asyncio
+import threading
+from typing import Any, Callable, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+
+PENDING_STATUS = "pending"
+RUNNING_STATUS = "running"
+DONE_STATUS = "done"
+FAILED_STATUS = "failed"
+
+
+class QueueFullError(Exception):
+    """Raised when the ingestion queue cannot accept another job."""
+
+
+class IngestionJob:
+    def __init__(self, video_id: str, title: str = ""):
+        """
+        Status of the ingestion of one video, shared by every request for it.
+
+        Args:
+            video_id (str): The video being ingested.
+            title (str): The video title.
+        """
+        self.video_id = video_id
+        self.title = title
+        self.status = PENDING_STATUS
+        self.stage = "queued"
+        self.progress = 0.0
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self._done = threading.Event()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def update(self, stage: str, progress: float):
+        """Report the current stage and the overall progress between 0 and 1."""
+        self.stage = stage
+        self.progress = min(max(progress, 0.0), 1.0)
+
+    def _finish(self, status: str, result: Any = None, error: Optional[BaseException] = None):
+        self.status = status
+        self.result = result
+        self.error = error
+        self.finished_at = time.time()
+        if status == DONE_STATUS:
+            self.update("done", 1.0)
+        self._done.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+    def snapshot(self) -> dict:
+        return {
+            "video_id": self.video_id,
+            "title": self.title,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": self.progress,
+            "error": str(self.error) if self.error else None,
+        }
+
+
+class IngestionQueue:
+    def __init__(self, max_workers: int = 2, max_pending: int = 8):
+        """
+        Bounded worker pool running ingestion jobs in the background.
+
+        Jobs are keyed by video ID: submitting a video that is already queued
+        or running returns the existing job instead of starting a new one.
+        Once `max_workers` jobs are running and `max_pending` more are waiting,
+        new submissions are rejected with `QueueFullError`.
+
+        Args:
+            max_workers (int): Number of jobs run at the same time.
+            max_pending (int): Number of jobs allowed to wait for a worker.
+        """
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="ingestion")
+        self._jobs: Dict[str, IngestionJob] = {}
+        self._lock = threading.Lock()
+
+    def _in_flight(self) -> int:
+        return sum(1 for job in self._jobs.values() if not job.done)
+
+    def submit(self, video_id: str, task: Callable[[IngestionJob], Any],
+               title: str = "") -> IngestionJob:
+        """
+        Queue the ingestion of a video, or attach to the job already running for it.
+
+        Args:
+            video_id (str): The video to ingest.
+            task (Callable): Function or coroutine function called with the job.
+                Its return value becomes `job.result`.
+            title (str): The video title.
+
+        Returns:
+            IngestionJob: The job tracking the ingestion.
+
+        Raises:
+            QueueFullError: If every worker is busy and the waiting list is full.
+        """
+        with self._lock:
+            existing = self._jobs.get(video_id)
+            if existing and not existing.done:
+                return existing
+            if self._in_flight() >= self.max_workers + self.max_pending:
+                raise QueueFullError(
+                    f"{self._in_flight()} videos are already being ingested.")
+            job = IngestionJob(video_id, title)
+            self._jobs[video_id] = job
+        self._executor.submit(self._run, job, task)
+        return job
+
+    def get(self, video_id: str) -> Optional[IngestionJob]:
+        with self._lock:
+            return self._jobs.get(video_id)
+
+    @staticmethod
+    def _run(job: IngestionJob, task: Callable[[IngestionJob], Any]):
+        job.status = RUNNING_STATUS
+        job.update("starting", 0.0)
+        try:
+            if asyncio.iscoroutinefunction(task):
+                result = asyncio.run(task(job))
+            else:
+                result = task(job)
+        except Exception as e:
+            print(f"Ingestion of {job.video_id} failed: {e}")
+            job._finish(FAILED_STATUS, error=e)
+        else:
+            job._finish(DONE_STATUS, result=result)
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,88 @@
+"""
+Re-chunk and re-index videos from the local transcript store.
+
+Transcripts are read from `TRANSCRIPT_STORE_PATH`, so no captions are fetched
+and nothing is transcribed again. Use it after changing the chunk sizes, the
+summary prompt or the embedding model. The previous chunks, summary and BM25
+index of each video are replaced, and only chunks whose text changed are
+embedded again.
+
+Usage:
+    python -m src.ingestion.rebuild [VIDEO_ID ...] [--keep-summary] [--concurrency 4]
+"""
+import time
+import asyncio
+import argparse
+
+from ..loader.youtube import YoutubeLoader
+from ..loader.transcript_store import transcript_store
+from ..run import get_db_manager, get_response
+
+
+async def rebuild_video(video_id: str, title: str, keep_summary: bool) -> int:
+    """
+    Re-index one stored transcript.
+
+    Args:
+        video_id (str): The video ID.
+        title (str): Title stored with the transcript.
+        keep_summary (bool): Reuse the summary of the manifest instead of summarizing again.
+
+    Returns:
+        int: Number of chunks indexed.
+    """
+    db_manager = get_db_manager()
+    entry = db_manager.manifest.get(video_id) or {}
+    loader = YoutubeLoader("", video_id, entry.get("title") or title or video_id)
+    if not loader.load_stored():
+        raise ValueError("No stored transcript.")
+    summary = entry.get("summary") if keep_summary else None
+    # Stale chunks are deleted by the upsert, unchanged ones keep their vectors.
+    await get_response(loader, summary=summary)
+    return (db_manager.get_ingested(video_id) or {}).get("chunk_count", 0)
+
+
+async def rebuild(video_ids, keep_summary: bool, concurrency: int):
+    stored = {entry["video_id"]: entry["title"] for entry in transcript_store.list()}
+    video_ids = video_ids or list(stored)
+    semaphore = asyncio.Semaphore(concurrency)
+    started = time.perf_counter()
+    chunks, rebuilt, failed = 0, 0, []
+
+    async def run(video_id: str):
+        nonlocal chunks, rebuilt
+        async with semaphore:
+            try:
+                count = await rebuild_video(video_id, stored.get(video_id, ""), keep_summary)
+                chunks += count
+                rebuilt += 1
+                print(f"Rebuilt {video_id} ({count} chunks).")
+            except Exception as e:
+                failed.append(video_id)
+                print(f"Failed to rebuild {video_id}: {e}")
+
+    await asyncio.gather(*[run(video_id) for video_id in video_ids])
+    print(f"Rebuilt {rebuilt} videos and {chunks} chunks "
+          f"in {time.perf_counter() - started:.1f}s.")
+    if failed:
+        print(f"Failed to rebuild {len(failed)} videos: {', '.join(sorted(failed))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("video_ids", nargs="*",
+                        help="Videos to rebuild, every stored transcript when empty.")
+    parser.add_argument("--keep-summary", action="store_true",
+                        help="Keep the stored summaries, only re-chunk and re-embed.")
+    parser.add_argument("--concurrency", type=int, default=4,
+                        help="Videos rebuilt at the same time.")
+    args = parser.parse_args()
+
+    if transcript_store is None:
+        parser.error("TRANSCRIPT_STORE_PATH is empty, there are no stored transcripts.")
+    asyncio.run(rebuild(args.video_ids, args.keep_summary, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
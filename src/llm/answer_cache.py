@@ -0,0 +1,149 @@
+import re
+import math
+import time
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from langchain_core.embeddings import Embeddings
+from ..utils.tracing import tracer
+
+NON_WORD_PATTERN = re.compile(r"[^\w\s]")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def normalize_question(question: str) -> str:
+    """Lowercase the question and drop punctuation and repeated whitespace."""
+    question = NON_WORD_PATTERN.sub(" ", question.lower())
+    return WHITESPACE_PATTERN.sub(" ", question).strip()
+
+
+def _unit(vector: List[float]) -> List[float]:
+    norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+    return [value / norm for value in vector]
+
+
+class AnswerCache:
+    def __init__(self, embeddings: Embeddings, similarity_threshold: float = 0.95,
+                 ttl_seconds: float = 86400, max_entries: int = 5000):
+        """
+        In-memory cache of answers, scoped to a video.
+
+        A question is matched first on its normalized text and then on the
+        cosine similarity of its embedding with the cached questions of the
+        same video. Entries expire after `ttl_seconds` and the least recently
+        used ones are evicted above `max_entries`.
+
+        Args:
+            embeddings (Embeddings): Model used to embed the questions.
+            similarity_threshold (float): Minimum cosine similarity of a semantic hit.
+            ttl_seconds (float): Time to live of an answer.
+            max_entries (int): Maximum number of answers kept across all videos.
+        """
+        self.embeddings = embeddings
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {
+            "exact_hits": 0,
+            "semantic_hits": 0,
+            "misses": 0,
+            "seconds_saved": 0.0,
+        }
+
+    @property
+    def hit_rate(self) -> float:
+        hits = self.stats["exact_hits"] + self.stats["semantic_hits"]
+        total = hits + self.stats["misses"]
+        return hits / total if total else 0.0
+
+    def _hit(self, key, entry: dict, kind: str) -> str:
+        self._entries.move_to_end(key)
+        self.stats[kind] += 1
+        tracer.increment("answer_cache_lookups_total", result=kind)
+        self.stats["seconds_saved"] += entry["seconds"]
+        tracer.event(
+            "answer_cache_hit", kind=kind, hit_rate=round(self.hit_rate, 4),
+            seconds_saved=round(self.stats["seconds_saved"], 3))
+        return entry["answer"]
+
+    def _expire(self, now: float):
+        expired = [key for key, entry in self._entries.items()
+                   if now - entry["created_at"] > self.ttl_seconds]
+        for key in expired:
+            del self._entries[key]
+
+    def lookup(self, video_id: str, question: str) -> Tuple[Optional[str], Optional[List[float]]]:
+        """
+        Return a cached answer to the question about the video, if any.
+
+        Args:
+            video_id (str): The video the question is about.
+            question (str): The user question.
+
+        Returns:
+            Tuple[Optional[str], Optional[List[float]]]: The cached answer, and
+                the embedding of the normalized question when it was computed,
+                to be passed to `store` on a miss so it is not embedded again.
+        """
+        normalized = normalize_question(question)
+        with self._lock:
+            self._expire(time.time())
+            entry = self._entries.get((video_id, normalized))
+            if entry:
+                return self._hit((video_id, normalized), entry, "exact_hits"), None
+            candidates = [(key, entry) for key, entry in self._entries.items()
+                          if key[0] == video_id]
+        if not candidates:
+            with self._lock:
+                self.stats["misses"] += 1
+                tracer.increment("answer_cache_lookups_total", result="misses")
+            return None, None
+
+        vector = _unit(self.embeddings.embed_query(normalized))
+        best_key, best_entry, best_score = None, None, -1.0
+        for key, entry in candidates:
+            score = sum(a * b for a, b in zip(vector, entry["vector"]))
+            if score > best_score:
+                best_key, best_entry, best_score = key, entry, score
+        with self._lock:
+            if best_score >= self.similarity_threshold and best_key in self._entries:
+                return self._hit(best_key, best_entry, "semantic_hits"), vector
+            self.stats["misses"] += 1
+            tracer.increment("answer_cache_lookups_total", result="misses")
+        return None, vector
+
+    def store(self, video_id: str, question: str, answer: str, seconds: float = 0.0,
+              vector: Optional[List[float]] = None):
+        """
+        Cache the answer to a question about a video.
+
+        Args:
+            video_id (str): The video the question is about.
+            question (str): The user question.
+            answer (str): The generated answer.
+            seconds (float): Time it took to produce the answer, reported as saved on hits.
+            vector (List[float], optional): Embedding of the question returned by
+                `lookup`, the question is embedded when omitted.
+        """
+        normalized = normalize_question(question)
+        if vector is None:
+            vector = _unit(self.embeddings.embed_query(normalized))
+        with self._lock:
+            self._entries[(video_id, normalized)] = {
+                "answer": answer,
+                "vector": vector,
+                "seconds": seconds,
+                "created_at": time.time(),
+            }
+            self._entries.move_to_end((video_id, normalized))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, video_id: str):
+        """Drop every cached answer about the video, e.g. after it is re-ingested."""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == video_id]:
+                del self._entries[key]
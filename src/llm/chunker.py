@@ -0,0 +1,246 @@
+import re
+from array import array
+from functools import lru_cache
+from typing import TYPE_CHECKING, Iterable, List, Tuple
+
+from ..config import config
+from .model import get_llm
+
+if TYPE_CHECKING:
+    from langchain_core.documents import Document
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=\.)\s+")
+
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    import tiktoken
+
+    return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text: str) -> int:
+    return len(_get_encoding().encode_ordinary(text))
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """Return the longest prefix of `text` holding at most `max_tokens` tokens."""
+    if max_tokens <= 0:
+        return ""
+    tokens = _get_encoding().encode_ordinary(text)
+    if len(tokens) <= max_tokens:
+        return text
+    return _get_encoding().decode(tokens[:max_tokens])
+
+
+def _strip_span(text: str, start: int, end: int) -> Tuple[int, int]:
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+def split_tokens(text: str, max_tokens: int) -> List[Tuple[int, int, int]]:
+    """
+    Split `text` at token boundaries into pieces of at most `max_tokens` tokens.
+
+    Returns:
+        List[Tuple[int, int, int]]: The character start, character end and
+            token count of each piece, in order and without surrounding spaces.
+    """
+    tokens = _get_encoding().encode_ordinary(text)
+    if len(tokens) <= max_tokens:
+        return [(0, len(text), len(tokens))]
+    _, offsets = _get_encoding().decode_with_offsets(tokens)
+    pieces = []
+    for first in range(0, len(tokens), max_tokens):
+        last = min(first + max_tokens, len(tokens))
+        end = offsets[last] if last < len(tokens) else len(text)
+        pieces.append((*_strip_span(text, offsets[first], end), last - first))
+    return pieces
+
+
+if config.LLM_BACKEND == "fake":
+    def count_tokens(text: str) -> int:
+        # Count tokens like the offline chat model, which needs no tokenizer download.
+        return get_llm().get_num_tokens(text)
+
+    def truncate_tokens(text: str, max_tokens: int) -> str:
+        words = text.split()
+        return text if len(words) <= max_tokens else " ".join(words[:max(max_tokens, 0)])
+
+    def split_tokens(text: str, max_tokens: int) -> List[Tuple[int, int, int]]:
+        words = [match.span() for match in re.finditer(r"\S+", text)]
+        return [(words[first][0], words[min(first + max_tokens, len(words)) - 1][1],
+                 min(max_tokens, len(words) - first))
+                for first in range(0, len(words), max_tokens)] or [(0, len(text), 0)]
+
+
+def segments_from_text(text: str) -> List[dict]:
+    """
+    Build untimed segments from plain text, one per sentence, each keeping its
+    closing period.
+
+    Sentences longer than a chunk are split by `chunk_transcript`.
+    """
+    sentences = [sentence for sentence in SENTENCE_BOUNDARY.split(text) if sentence]
+    return [{"text": sentence, "start": 0.0, "duration": 0.0} for sentence in sentences]
+
+
+class TranscriptChunks:
+    def __init__(self, text: str):
+        """
+        Chunks of a transcript stored as offsets into the transcript text.
+
+        Each chunk is described by its character range, its start and end time
+        and the index of its parent chunk (-1 for top-level chunks), kept in
+        flat arrays instead of one string and dict per chunk.
+
+        Args:
+            text (str): The full transcript the offsets point into.
+        """
+        self.text = text
+        self.offsets = array("l")
+        self.times = array("d")
+        self.parents = array("l")
+        self.tokens = array("l")
+
+    def append(self, char_start: int, char_end: int, time_start: float,
+               time_end: float, tokens: int, parent: int = -1):
+        self.offsets.extend((char_start, char_end))
+        self.times.extend((time_start, time_end))
+        self.tokens.append(tokens)
+        self.parents.append(parent)
+
+    def __len__(self) -> int:
+        return len(self.parents)
+
+    def content(self, index: int) -> str:
+        return self.text[self.offsets[2 * index]:self.offsets[2 * index + 1]]
+
+    def span(self, index: int) -> Tuple[float, float]:
+        return self.times[2 * index], self.times[2 * index + 1]
+
+    def contents(self) -> List[str]:
+        return [self.content(index) for index in range(len(self))]
+
+    def to_documents(self) -> List["Document"]:
+        """Materialize the chunks as documents with position and timing metadata."""
+        from langchain_core.documents import Document
+
+        documents = []
+        for index in range(len(self)):
+            start, end = self.span(index)
+            documents.append(Document(
+                page_content=self.content(index),
+                metadata={
+                    "chunk_index": index,
+                    "parent_index": self.parents[index],
+                    "start": start,
+                    "end": end,
+                }))
+        return documents
+
+
+def chunk_transcript(segments: Iterable[dict], fine_tokens: int = 125,
+                     coarse_tokens: int = 1250) -> Tuple[TranscriptChunks, TranscriptChunks]:
+    """
+    Split transcript segments into coarse summary chunks and fine retrieval chunks.
+
+    The segments are read once. Each segment is tokenized a single time and
+    added to the current fine chunk; a fine chunk is closed once it reaches
+    `fine_tokens`, and fine chunks are grouped into a coarse chunk until it
+    reaches `coarse_tokens`. A segment longer than `fine_tokens` is first split
+    at token boundaries into pieces of at most `fine_tokens`, with its time
+    span interpolated over the pieces by character position, so no fine chunk
+    holds more than `2 * fine_tokens - 1` tokens. Other chunk boundaries fall
+    between segments, so their start and end times are exact.
+
+    Args:
+        segments (Iterable[dict]): Segments with `text`, `start` and `duration`.
+        fine_tokens (int): Target size of the retrieval chunks.
+        coarse_tokens (int): Target size of the summary chunks.
+
+    Returns:
+        Tuple[TranscriptChunks, TranscriptChunks]: The coarse and fine chunks.
+            Each fine chunk's parent is the coarse chunk containing it.
+
+    Raises:
+        ValueError: If `fine_tokens` is not positive.
+        RuntimeError: If a fine chunk exceeds its bound, which splitting prevents.
+    """
+    if fine_tokens < 1:
+        raise ValueError(f"fine_tokens must be positive, got {fine_tokens}.")
+    parts = []
+    length = 0
+    # (char start, char end, time start, time end, tokens) of the open chunks
+    fine_open = None
+    coarse_open = None
+    fine_spans = []
+    coarse_spans = []
+
+    def close_fine():
+        nonlocal fine_open, coarse_open
+        fine_spans.append((*fine_open, len(coarse_spans)))
+        char_start, char_end, time_start, time_end, tokens = fine_open
+        if coarse_open is None:
+            coarse_open = [char_start, char_end, time_start, time_end, tokens]
+        else:
+            coarse_open[1], coarse_open[3] = char_end, time_end
+            coarse_open[4] += tokens
+        fine_open = None
+        if coarse_open[4] >= coarse_tokens:
+            close_coarse()
+
+    def close_coarse():
+        nonlocal coarse_open
+        coarse_spans.append(tuple(coarse_open))
+        coarse_open = None
+
+    for segment in segments:
+        text = segment["text"].strip()
+        if not text:
+            continue
+        if parts:
+            parts.append(" ")
+            length += 1
+        start = float(segment.get("start", 0.0))
+        duration = float(segment.get("duration", 0.0))
+        offset = length
+        parts.append(text)
+        length += len(text)
+        tokens = count_tokens(text)
+        if tokens <= fine_tokens:
+            pieces = [(0, len(text), tokens)]
+        else:
+            pieces = split_tokens(text, fine_tokens)
+
+        for piece_start, piece_end, piece_tokens in pieces:
+            char_start, char_end = offset + piece_start, offset + piece_end
+            time_start = start + duration * piece_start / len(text)
+            time_end = start + duration * piece_end / len(text)
+            if fine_open is None:
+                fine_open = [char_start, char_end, time_start, time_end, piece_tokens]
+            else:
+                fine_open[1], fine_open[3] = char_end, time_end
+                fine_open[4] += piece_tokens
+            if fine_open[4] >= fine_tokens:
+                close_fine()
+
+    if fine_open is not None:
+        close_fine()
+    if coarse_open is not None:
+        close_coarse()
+    largest = max((span[4] for span in fine_spans), default=0)
+    if largest >= 2 * fine_tokens:
+        raise RuntimeError(
+            f"A fine chunk holds {largest} tokens, more than {2 * fine_tokens - 1}.")
+
+    text = "".join(parts)
+    coarse, fine = TranscriptChunks(text), TranscriptChunks(text)
+    for char_start, char_end, time_start, time_end, tokens in coarse_spans:
+        coarse.append(char_start, char_end, time_start, time_end, tokens)
+    for char_start, char_end, time_start, time_end, tokens, parent in fine_spans:
+        fine.append(char_start, char_end, time_start, time_end, tokens, parent)
+    return coarse, fine
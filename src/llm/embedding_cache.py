@@ -0,0 +1,117 @@
+import asyncio
+import hashlib
+import threading
+from array import array
+from typing import Dict, List
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_core.embeddings import Embeddings
+from ..utils.sqlite_cache import SQLiteCache
+
+
+def _encode(vector: List[float]) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def _decode(value: bytes) -> List[float]:
+    vector = array("f")
+    vector.frombytes(value)
+    return vector.tolist()
+
+
+class CachedEmbeddings(Embeddings):
+    def __init__(self, embeddings: Embeddings, model_name: str, cache: SQLiteCache,
+                 batch_size: int = 256, max_concurrency: int = 4):
+        """
+        Content-addressed embedding cache in front of another embedding model.
+
+        Vectors are stored on disk keyed by the model name and a hash of the
+        text, so a text is only sent to the provider once per model. Cache
+        misses are de-duplicated and embedded in batches of `batch_size`, with
+        at most `max_concurrency` batches in flight.
+
+        Args:
+            embeddings (Embeddings): The embedding model to call on cache misses.
+            model_name (str): Name of the embedding model, part of the cache key.
+            cache (SQLiteCache): Persistent store of the vectors.
+            batch_size (int): Number of texts sent per provider call.
+            max_concurrency (int): Maximum number of provider calls in flight.
+        """
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.cache = cache
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "batches": 0}
+
+    def _key(self, text: str) -> str:
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{self.model_name}:{digest}"
+
+    def _lookup(self, texts: List[str]):
+        keys = [self._key(text) for text in texts]
+        cached = self.cache.get_many(keys)
+        missing = {}
+        for text, key in zip(texts, keys):
+            if key not in cached:
+                missing.setdefault(key, text)
+        miss_count = sum(1 for key in keys if key not in cached)
+        with self._lock:
+            self.stats["hits"] += len(keys) - miss_count
+            self.stats["misses"] += miss_count
+        return keys, cached, missing
+
+    def _batches(self, missing: Dict[str, str]):
+        items = list(missing.items())
+        return [items[start:start + self.batch_size]
+                for start in range(0, len(items), self.batch_size)]
+
+    def _store(self, batch, vectors: List[List[float]]) -> Dict[str, bytes]:
+        encoded = {key: _encode(vector)
+                   for (key, _), vector in zip(batch, vectors)}
+        self.cache.set_many(encoded)
+        with self._lock:
+            self.stats["batches"] += 1
+        return encoded
+
+    @staticmethod
+    def _collect(keys: List[str], cached: Dict[str, bytes]) -> List[List[float]]:
+        return [_decode(cached[key]) for key in keys]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys, cached, missing = self._lookup(texts)
+        batches = self._batches(missing)
+
+        def embed_batch(batch):
+            vectors = self.embeddings.embed_documents([text for _, text in batch])
+            return self._store(batch, vectors)
+
+        if len(batches) == 1:
+            cached.update(embed_batch(batches[0]))
+        elif batches:
+            with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+                for encoded in executor.map(embed_batch, batches):
+                    cached.update(encoded)
+        return self._collect(keys, cached)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys, cached, missing = self._lookup(texts)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def embed_batch(batch):
+            async with semaphore:
+                vectors = await self.embeddings.aembed_documents(
+                    [text for _, text in batch])
+            return self._store(batch, vectors)
+
+        for encoded in await asyncio.gather(
+                *[embed_batch(batch) for batch in self._batches(missing)]):
+            cached.update(encoded)
+        return self._collect(keys, cached)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return (await self.aembed_documents([text]))[0]
@@ -0,0 +1,115 @@
+import time
+import asyncio
+import hashlib
+from typing import Any, AsyncIterator, Iterator, List, Optional
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+
+def _words(seed: str, count: int) -> List[str]:
+    digest = hashlib.sha256(seed.encode("utf-8")).hexdigest()
+    return [f"w{digest[index % 60:index % 60 + 4]}" for index in range(count)]
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Deterministic offline stand-in for the chat model.
+
+    The answer is derived from a hash of the prompt, so the same prompt always
+    gets the same answer, and every call waits `latency` seconds plus
+    `seconds_per_token` for each generated token.
+    """
+
+    model_name: str = "fake-chat"
+    latency: float = 0.5
+    seconds_per_token: float = 0.0
+    output_tokens: int = 64
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def get_num_tokens(self, text: str) -> int:
+        return len(text.split())
+
+    def _answer(self, messages: List[BaseMessage]) -> List[str]:
+        prompt = "\n".join(str(message.content) for message in messages)
+        return _words(prompt, self.output_tokens)
+
+    def _message(self, messages: List[BaseMessage], words: List[str]) -> AIMessage:
+        prompt_tokens = sum(self.get_num_tokens(str(message.content)) for message in messages)
+        return AIMessage(content=" ".join(words), usage_metadata={
+            "input_tokens": prompt_tokens,
+            "output_tokens": len(words),
+            "total_tokens": prompt_tokens + len(words),
+        })
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        words = self._answer(messages)
+        time.sleep(self.latency + self.seconds_per_token * len(words))
+        return ChatResult(generations=[ChatGeneration(message=self._message(messages, words))])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        words = self._answer(messages)
+        await asyncio.sleep(self.latency + self.seconds_per_token * len(words))
+        return ChatResult(generations=[ChatGeneration(message=self._message(messages, words))])
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager: Any = None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self.latency)
+        for index, word in enumerate(self._answer(messages)):
+            time.sleep(self.seconds_per_token)
+            yield ChatGenerationChunk(message=AIMessageChunk(
+                content=word if index == 0 else f" {word}"))
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                       run_manager: Any = None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self.latency)
+        for index, word in enumerate(self._answer(messages)):
+            await asyncio.sleep(self.seconds_per_token)
+            yield ChatGenerationChunk(message=AIMessageChunk(
+                content=word if index == 0 else f" {word}"))
+
+
+class FakeEmbeddings(Embeddings):
+    def __init__(self, size: int = 256, latency: float = 0.0):
+        """
+        Deterministic offline stand-in for the embedding model.
+
+        Texts are embedded as hashed bags of words, so texts sharing words are
+        close to each other, and every call waits `latency` seconds.
+
+        Args:
+            size (int): Number of dimensions.
+            latency (float): Seconds slept per call.
+        """
+        self.size = size
+        self.latency = latency
+
+    def _embed(self, text: str) -> List[float]:
+        vector = [0.0] * self.size
+        for word in text.lower().split():
+            vector[int(hashlib.md5(word.encode("utf-8")).hexdigest(), 16) % self.size] += 1.0
+        norm = sum(value * value for value in vector) ** 0.5 or 1.0
+        return [value / norm for value in vector]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        time.sleep(self.latency)
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        time.sleep(self.latency)
+        return self._embed(text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        await asyncio.sleep(self.latency)
+        return [self._embed(text) for text in texts]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        await asyncio.sleep(self.latency)
+        return self._embed(text)
@@ -1,6 +1,16 @@
+import asyncio
+import hashlib
 import operator
-from .model import llm
-from .prompts import map_prompt, reduce_prompt
+import contextvars
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from ..config import config
+from .model import get_llm, llm_rate_limiter
+from ..utils.sqlite_cache import SQLiteCache
+from ..utils.tracing import tracer
+from ..utils.resources import resources
+from .chunker import chunk_transcript
+from .prompts import map_prompt, reduce_prompt, MAP_PROMPT_VERSION
 from typing import Annotated, List, Literal, TypedDict
 
 from langchain.chains.combine_documents.reduce import (
@@ -11,12 +21,46 @@ from langchain_core.documents import Document
 from langgraph.constants import Send
 from langgraph.graph import END, START, StateGraph
 
-token_max = 1000
+token_max = config.SUMMARY_TOKEN_MAX
+# Rough allowance for the completion when budgeting tokens per minute.
+completion_tokens_estimate = 256
+
+map_cache = SQLiteCache(
+    config.SUMMARY_CACHE_PATH, table="map_summaries"
+) if config.SUMMARY_CACHE_PATH else None
+
+
+@lru_cache(maxsize=4096)
+def count_tokens(text: str) -> int:
+    """Get number of tokens for a text, tokenizing each distinct text once."""
+    return get_llm().get_num_tokens(text)
 
 
 def length_function(documents: List[Document]) -> int:
     """Get number of tokens for input contents."""
-    return sum(llm.get_num_tokens(doc.page_content) for doc in documents)
+    return sum(count_tokens(doc.page_content) for doc in documents)
+
+
+def map_cache_key(content: str) -> str:
+    """Cache key of a chunk summary: map prompt version, model and chunk hash."""
+    digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+    return f"{MAP_PROMPT_VERSION}:{get_llm().model_name}:{digest}"
+
+
+async def _ainvoke(prompt):
+    """
+    Invoke the LLM within the concurrency, request and token limits.
+
+    The token usage reported by the model is added to the current span.
+    """
+    llm = get_llm()
+    tokens = llm.get_num_tokens(prompt.to_string()) + completion_tokens_estimate
+    async with llm_rate_limiter.limit(tokens):
+        response = await llm.ainvoke(prompt)
+    usage = getattr(response, "usage_metadata", None)
+    if usage:
+        tracer.current().add_tokens(usage["input_tokens"], usage["output_tokens"])
+    return response
 
 
 class OverallState(TypedDict):
@@ -31,9 +75,19 @@ class SummaryState(TypedDict):
 
 
 async def generate_summary(state: SummaryState):
-    prompt = map_prompt.invoke(state["content"])
-    response = await llm.ainvoke(prompt)
-    return {"summaries": [response.content]}
+    with tracer.span("summary_map") as span:
+        key = map_cache_key(state["content"])
+        if map_cache is not None:
+            cached = map_cache.get(key)
+            if cached is not None:
+                span.set(cached=True)
+                return {"summaries": [cached.decode("utf-8")]}
+
+        prompt = map_prompt.invoke(state["content"])
+        response = await _ainvoke(prompt)
+        if map_cache is not None:
+            map_cache.set(key, response.content.encode("utf-8"))
+        return {"summaries": [response.content]}
 
 
 def map_summaries(state: OverallState):
@@ -49,20 +103,30 @@ def collect_summaries(state: OverallState):
 
 
 async def _reduce(input: dict) -> str:
-    prompt = reduce_prompt.invoke(input)
-    response = await llm.ainvoke(prompt)
-    return response.content
+    with tracer.span("summary_reduce"):
+        prompt = reduce_prompt.invoke(input)
+        response = await _ainvoke(prompt)
+        return response.content
 
 
 async def collapse_summaries(state: OverallState):
+    """
+    Collapse one level of the reduction tree.
+
+    The summaries are grouped into lists of at most `token_max` tokens and
+    every group is reduced concurrently, so each level costs a single round
+    of LLM latency and the number of levels grows with the log of the
+    number of chunks.
+    """
     doc_lists = split_list_of_docs(
         state["collapsed_summaries"], length_function, token_max
     )
-    results = []
-    for doc_list in doc_lists:
-        results.append(await acollapse_docs(doc_list, _reduce))
+    with tracer.span("summary_collapse", groups=len(doc_lists)):
+        results = await asyncio.gather(
+            *[acollapse_docs(doc_list, _reduce) for doc_list in doc_lists]
+        )
 
-    return {"collapsed_summaries": results}
+    return {"collapsed_summaries": list(results)}
 
 
 def should_collapse(
@@ -80,16 +144,78 @@ async def generate_final_summary(state: OverallState):
     return {"final_summary": response}
 
 
-graph = StateGraph(OverallState)
-graph.add_node("generate_summary", generate_summary)  # same as before
-graph.add_node("collect_summaries", collect_summaries)
-graph.add_node("collapse_summaries", collapse_summaries)
-graph.add_node("generate_final_summary", generate_final_summary)
-
-graph.add_conditional_edges(START, map_summaries, ["generate_summary"])
-graph.add_edge("generate_summary", "collect_summaries")
-graph.add_conditional_edges("collect_summaries", should_collapse)
-graph.add_conditional_edges("collapse_summaries", should_collapse)
-graph.add_edge("generate_final_summary", END)
-
-app = graph.compile()
+async def warm_map_cache(contents: List[str]):
+    """Summarize chunks into the map cache ahead of the summary graph."""
+    await asyncio.gather(*[generate_summary({"content": content}) for content in contents])
+
+
+class MapCacheWarmer:
+    def __init__(self, fine_tokens: int, coarse_tokens: int):
+        """
+        Summarize the chunks of a transcript that is still being produced.
+
+        Called with the segments transcribed so far, it chunks the segments
+        that follow the last closed summary chunk and sends every newly closed
+        chunk to the map step on a background thread. Closed chunks are the same
+        as when chunking the full transcript, so the summary graph later finds
+        their summaries in the map cache. Does nothing without a map cache.
+
+        Args:
+            fine_tokens (int): Target size of the retrieval chunks.
+            coarse_tokens (int): Target size of the summary chunks.
+        """
+        self.fine_tokens = fine_tokens
+        self.coarse_tokens = coarse_tokens
+        self.warmed = 0
+        self._next_segment = 0
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._futures = []
+
+    def __call__(self, segments: List[dict]):
+        if map_cache is None:
+            return
+        pending = segments[self._next_segment:]
+        summary_chunks, _ = chunk_transcript(
+            pending, fine_tokens=self.fine_tokens, coarse_tokens=self.coarse_tokens)
+        # The last chunk may still grow with the next segments.
+        closed = len(summary_chunks) - 1
+        if closed < 1:
+            return
+        contents = [summary_chunks.content(index) for index in range(closed)]
+        char_end = summary_chunks.offsets[2 * closed - 1]
+        length = -1
+        for consumed, segment in enumerate(pending, start=1):
+            text = segment["text"].strip()
+            if text:
+                length += len(text) + 1
+            if length >= char_end:
+                break
+        self._next_segment += consumed
+        self.warmed += len(contents)
+        # Run in a copy of the caller's context so the summary spans stay under its trace.
+        self._futures.append(self._executor.submit(
+            contextvars.copy_context().run, asyncio.run, warm_map_cache(contents)))
+
+    def close(self):
+        """Wait for the chunks sent so far to be summarized."""
+        for future in self._futures:
+            future.result()
+        self._executor.shutdown()
+
+
+@resources.shared("summary_graph")
+def get_app():
+    """Return the compiled summary graph, built on first use and kept for the process."""
+    graph = StateGraph(OverallState)
+    graph.add_node("generate_summary", generate_summary)  # same as before
+    graph.add_node("collect_summaries", collect_summaries)
+    graph.add_node("collapse_summaries", collapse_summaries)
+    graph.add_node("generate_final_summary", generate_final_summary)
+
+    graph.add_conditional_edges(START, map_summaries, ["generate_summary"])
+    graph.add_edge("generate_summary", "collect_summaries")
+    graph.add_conditional_edges("collect_summaries", should_collapse)
+    graph.add_conditional_edges("collapse_summaries", should_collapse)
+    graph.add_edge("generate_final_summary", END)
+
+    return graph.compile()
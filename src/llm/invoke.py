@@ -1,17 +1,67 @@
-from .model import llm
+import time
+from collections import deque
+from typing import AsyncIterator
+from .model import get_llm
 from .prompts import RAG_PROMPT
+from ..utils.tracing import tracer
+from ..utils.resources import resources
 from langchain_core.runnables import RunnablePassthrough
 from langchain_core.output_parsers import StrOutputParser
+# Time to first token and total latency of the most recent answers, in seconds.
+answer_timings = deque(maxlen=1000)
 
 
-def get_response_message(context, question):
-    qa_lcel = (
+@resources.shared("qa_chain")
+def get_qa_chain():
+    """Return the question answering chain, built on first use."""
+    return (
         RunnablePassthrough()
         | RAG_PROMPT
-        | llm
+        | get_llm()
         | StrOutputParser()
     )
-    result = qa_lcel.invoke({
+
+
+def get_response_message(context, question):
+    result = get_qa_chain().invoke({
         "context": context, "question": question
     })
     return result
+
+
+async def astream_response_message(context, question) -> AsyncIterator[str]:
+    """
+    Stream the answer to a question token by token.
+
+    The time to first token and the total latency of each answer are appended
+    to `answer_timings` and recorded on an `answer` span with the prompt and
+    answer token counts.
+
+    Args:
+        context (str): Retrieved transcript context.
+        question (str): The user question.
+
+    Yields:
+        str: Chunks of the answer as the model produces them.
+    """
+    with tracer.span("answer") as span:
+        started = time.perf_counter()
+        first_token_seconds = None
+        output_tokens = 0
+        async for token in get_qa_chain().astream({
+            "context": context, "question": question
+        }):
+            if first_token_seconds is None:
+                first_token_seconds = time.perf_counter() - started
+            output_tokens += 1
+            yield token
+        total_seconds = time.perf_counter() - started
+        answer_timings.append({
+            "time_to_first_token": first_token_seconds,
+            "total": total_seconds,
+        })
+        if tracer.enabled:
+            # Streamed chunks carry one token each; the prompt is only counted when traced.
+            prompt = RAG_PROMPT.invoke({"context": context, "question": question})
+            span.add_tokens(get_llm().get_num_tokens(prompt.to_string()), output_tokens)
+            span.set(time_to_first_token_ms=round((first_token_seconds or 0) * 1000, 3))
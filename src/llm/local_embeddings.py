@@ -0,0 +1,76 @@
+import asyncio
+import threading
+from typing import List
+
+from langchain_core.embeddings import Embeddings
+
+
+class LocalEmbeddings(Embeddings):
+    def __init__(self, model_name: str, dimensions: int, batch_size: int = 64,
+                 threads: int = 0, device: str = "cpu"):
+        """
+        Sentence-transformers embedding model run in process, on the CPU by default.
+
+        `sentence_transformers` and the weights are loaded on the first call.
+        Texts are encoded `batch_size` at a time as one tensor and returned
+        normalized. Calls are serialized so concurrent batches share the
+        `threads` of torch instead of oversubscribing the CPU. The torch thread
+        count is process-wide, so it is set only while a batch is encoded and
+        the previous count is restored afterwards.
+
+        Args:
+            model_name (str): Hugging Face model name, or the directory of a downloaded
+                model on hosts without network access.
+            dimensions (int): Declared size of the vectors, checked when the model loads.
+            batch_size (int): Texts encoded per forward pass.
+            threads (int): torch intra-op threads, the torch default when 0.
+            device (str): torch device the model runs on.
+        """
+        self.model_name = model_name
+        self.dimensions = dimensions
+        self.batch_size = batch_size
+        self.threads = threads
+        self.device = device
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        from sentence_transformers import SentenceTransformer
+
+        model = SentenceTransformer(self.model_name, device=self.device)
+        # Renamed in sentence-transformers 6.
+        get_dimension = getattr(model, "get_embedding_dimension", None) or \
+            model.get_sentence_embedding_dimension
+        size = get_dimension()
+        if size != self.dimensions:
+            raise ValueError(
+                f"{self.model_name} returns {size} dimensions, {self.dimensions} were declared.")
+        return model
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        import torch
+
+        if not texts:
+            return []
+        with self._lock:
+            if self._model is None:
+                self._model = self._load()
+            previous_threads = torch.get_num_threads()
+            if self.threads:
+                torch.set_num_threads(self.threads)
+            try:
+                vectors = self._model.encode(
+                    texts, batch_size=self.batch_size, normalize_embeddings=True,
+                    convert_to_numpy=True, show_progress_bar=False)
+            finally:
+                torch.set_num_threads(previous_threads)
+        return vectors.tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await asyncio.to_thread(self.embed_documents, texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return await asyncio.to_thread(self.embed_query, text)
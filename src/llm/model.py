@@ -1,7 +1,145 @@
+import re
+import hashlib
+from typing import Callable, Dict, Optional
+
 from ..config import config
-from langchain_openai import ChatOpenAI
-from langchain_openai import OpenAIEmbeddings
+from .rate_limit import RateLimiter
+from ..utils.resources import resources
+
+
+class EmbeddingProvider:
+    def __init__(self, name: str, model_name: str, dimensions: int,
+                 factory: Callable[["EmbeddingProvider"], object],
+                 collection_suffix: Optional[str] = None):
+        """
+        An embedding backend of the provider registry.
+
+        Args:
+            name (str): Name selecting the provider in `EMBEDDING_PROVIDER`.
+            model_name (str): Name of the model, part of the embedding cache keys.
+            dimensions (int): Size of the vectors the model returns.
+            factory (Callable): Builds the `Embeddings` of the provider, importing
+                its dependencies.
+            collection_suffix (str): Suffix of the Chroma collections holding its
+                vectors, derived from the model name and dimensions when None.
+        """
+        self.name = name
+        self.model_name = model_name
+        self.dimensions = dimensions
+        self.factory = factory
+        if collection_suffix is None:
+            slug = re.sub(r"[^a-z0-9]+", "-", model_name.lower().rsplit("/", 1)[-1])
+            digest = hashlib.sha256(model_name.encode("utf-8")).hexdigest()[:6]
+            collection_suffix = f"{slug.strip('-')[:12].strip('-')}-{dimensions}-{digest}"
+        self.collection_suffix = collection_suffix
+
+    def collection_name(self, base: str) -> str:
+        """Name of the collection holding the vectors of this model."""
+        return f"{base}-{self.collection_suffix}" if self.collection_suffix else base
+
+    def create(self):
+        return self.factory(self)
+
+
+embedding_providers: Dict[str, EmbeddingProvider] = {}
+
+
+def register_embedding_provider(provider: EmbeddingProvider) -> EmbeddingProvider:
+    embedding_providers[provider.name] = provider
+    return provider
+
+
+def get_embedding_provider(name: Optional[str] = None) -> EmbeddingProvider:
+    """Return a registered provider, the configured one by default."""
+    name = name or config.EMBEDDING_PROVIDER
+    if name not in embedding_providers:
+        raise ValueError(
+            f"Unknown embedding provider {name!r}, expected one of {sorted(embedding_providers)}.")
+    return embedding_providers[name]
+
+
+def _openai_embeddings(provider: EmbeddingProvider):
+    from langchain_openai import OpenAIEmbeddings
+    from ..utils.http import get_http_client, get_async_http_client
+
+    return OpenAIEmbeddings(
+        model=provider.model_name,
+        api_key=config.OPENAI_API_KEY,
+        http_client=get_http_client(),
+        http_async_client=get_async_http_client())
+
+
+def _local_embeddings(provider: EmbeddingProvider):
+    from .local_embeddings import LocalEmbeddings
+
+    return LocalEmbeddings(
+        provider.model_name,
+        dimensions=provider.dimensions,
+        batch_size=config.LOCAL_EMBEDDING_BATCH_SIZE,
+        threads=config.LOCAL_EMBEDDING_THREADS)
+
+
+def _fake_embeddings(provider: EmbeddingProvider):
+    from .fakes import FakeEmbeddings
+
+    return FakeEmbeddings(size=provider.dimensions, latency=config.FAKE_EMBEDDING_LATENCY)
+
+
+# Collections created before the registry hold ada-002 vectors under the base name.
+register_embedding_provider(EmbeddingProvider(
+    "openai", "text-embedding-ada-002", 1536, _openai_embeddings, collection_suffix=""))
+register_embedding_provider(EmbeddingProvider(
+    "local", config.LOCAL_EMBEDDING_MODEL, config.LOCAL_EMBEDDING_DIMENSIONS, _local_embeddings))
+register_embedding_provider(EmbeddingProvider(
+    "fake", "fake-embedding", 256, _fake_embeddings))
+
+llm_rate_limiter = RateLimiter(
+    max_concurrency=config.LLM_MAX_CONCURRENCY,
+    requests_per_minute=config.LLM_REQUESTS_PER_MINUTE,
+    tokens_per_minute=config.LLM_TOKENS_PER_MINUTE)
+
+# The model clients are built on first use, so importing this module stays
+# cheap for processes that never call a model, and are shared by every session.
+# OpenAI clients send their requests through the pooled HTTP clients of
+# `utils.http`, so concurrent sessions reuse the same connections.
+
+
+@resources.shared("llm")
+def get_llm():
+    """Return the chat model of the configured backend, created once per process."""
+    if config.LLM_BACKEND == "fake":
+        from .fakes import FakeChatModel
+
+        return FakeChatModel(
+            latency=config.FAKE_LLM_LATENCY,
+            seconds_per_token=config.FAKE_LLM_SECONDS_PER_TOKEN,
+            output_tokens=config.FAKE_LLM_OUTPUT_TOKENS)
+    from langchain_openai import ChatOpenAI
+    from ..utils.http import get_http_client, get_async_http_client
+
+    return ChatOpenAI(
+        model="gpt-4o-mini",
+        api_key=config.OPENAI_API_KEY,
+        http_client=get_http_client(),
+        http_async_client=get_async_http_client())
+
+
+@resources.shared("embedding_model")
+def get_embedding_model():
+    """Return the embedding model of the configured provider, created once per process."""
+    provider = get_embedding_provider()
+    embedding_model = provider.create()
+    if config.EMBEDDING_CACHE_PATH:
+        from .embedding_cache import CachedEmbeddings
+        from ..utils.sqlite_cache import SQLiteCache
 
-llm = ChatOpenAI(model="gpt-4o-mini", api_key=config.OPENAI_API_KEY)
-embedding_model = OpenAIEmbeddings(
-    model="text-embedding-ada-002", api_key=config.OPENAI_API_KEY)
+        embedding_model = CachedEmbeddings(
+            embedding_model,
+            model_name=provider.model_name,
+            cache=SQLiteCache(
+                config.EMBEDDING_CACHE_PATH,
+                table="embeddings",
+                max_entries=config.EMBEDDING_CACHE_MAX_ENTRIES),
+            batch_size=config.EMBEDDING_BATCH_SIZE,
+            max_concurrency=config.EMBEDDING_MAX_CONCURRENCY)
+    return embedding_model
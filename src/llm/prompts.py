@@ -1,5 +1,7 @@
-from langchain.prompts import PromptTemplate
-from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.prompts import ChatPromptTemplate, PromptTemplate
+
+# Bump when map_prompt changes so cached map summaries are not reused.
+MAP_PROMPT_VERSION = "1"
 
 map_prompt = ChatPromptTemplate.from_messages(
     [("system", "Write a concise summary of the following:\\n\\n{context}")]
@@ -0,0 +1,88 @@
+import time
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from typing import Optional
+
+POLL_SECONDS = 0.05
+
+
+class TokenBucket:
+    def __init__(self, capacity_per_minute: float):
+        """
+        Token bucket refilled continuously at `capacity_per_minute` per minute.
+
+        The state is guarded by a thread lock rather than an asyncio primitive so
+        one bucket can be shared by event loops running in different threads.
+
+        Args:
+            capacity_per_minute (float): Size of the bucket and refill rate per minute.
+        """
+        self.capacity = float(capacity_per_minute)
+        self.rate = self.capacity / 60
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def try_acquire(self, amount: float) -> float:
+        """
+        Take `amount` tokens if available.
+
+        Returns:
+            float: 0 when the tokens were taken, otherwise the seconds to wait before retrying.
+        """
+        # A request larger than the bucket is let through once the bucket is full.
+        amount = min(amount, self.capacity)
+        with self._lock:
+            self._refill(time.monotonic())
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return 0
+            return (amount - self.tokens) / self.rate
+
+    async def acquire(self, amount: float):
+        while (wait := self.try_acquire(amount)) > 0:
+            await asyncio.sleep(wait)
+
+
+class RateLimiter:
+    def __init__(self, max_concurrency: int, requests_per_minute: Optional[float] = None,
+                 tokens_per_minute: Optional[float] = None):
+        """
+        Limits concurrent LLM calls and their request and token throughput.
+
+        Args:
+            max_concurrency (int): Maximum number of calls in flight.
+            requests_per_minute (float): Request budget per minute. Unlimited when None.
+            tokens_per_minute (float): Token budget per minute. Unlimited when None.
+        """
+        self.max_concurrency = max_concurrency
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+
+    async def _acquire_slot(self):
+        while not self._slots.acquire(blocking=False):
+            await asyncio.sleep(POLL_SECONDS)
+
+    @asynccontextmanager
+    async def limit(self, tokens: int = 0):
+        """
+        Wait for a concurrency slot and for the request and token budgets.
+
+        Args:
+            tokens (int): Estimated number of tokens the call will consume.
+        """
+        await self._acquire_slot()
+        try:
+            if self.requests:
+                await self.requests.acquire(1)
+            if self.tokens and tokens:
+                await self.tokens.acquire(tokens)
+            yield
+        finally:
+            self._slots.release()
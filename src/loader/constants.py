@@ -2,3 +2,5 @@ import os
 
 OUTPUT_PATH = os.path.join(os.path.normpath(
     os.getcwd() + os.sep + os.pardir), "output")
+# Size of the blocks uploaded files are copied and hashed in.
+UPLOAD_CHUNK_SIZE = 1024 * 1024
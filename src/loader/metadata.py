@@ -0,0 +1,141 @@
+import re
+import html
+import json
+import time
+import threading
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from ..config import config
+from ..utils.sqlite_cache import SQLiteCache
+
+WATCH_URL = "https://www.youtube.com/watch?v={video_id}"
+# Stop reading the page once this much has been received without finding every field.
+MAX_PAGE_BYTES = 2 * 1024 * 1024
+
+TITLE_PATTERN = re.compile(r"<title>(.*?)</title>", re.S)
+DURATION_PATTERN = re.compile(r'<meta itemprop="duration" content="([^"]+)"')
+CHANNEL_PATTERN = re.compile(r'<link itemprop="name" content="([^"]+)"')
+ISO_DURATION_PATTERN = re.compile(
+    r"P(?:(\d+)D)?T?(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?")
+
+
+def parse_iso_duration(value: str) -> Optional[int]:
+    """Convert an ISO 8601 duration such as `PT1H2M3S` to seconds."""
+    match = ISO_DURATION_PATTERN.fullmatch(value)
+    if not match:
+        return None
+    days, hours, minutes, seconds = (int(part or 0) for part in match.groups())
+    return ((days * 24 + hours) * 60 + minutes) * 60 + seconds
+
+
+def _normalize_title(raw: str) -> str:
+    # Titles were historically stored as BeautifulSoup rendered them, which
+    # keeps &, < and > escaped. Keep that form so title lookups still match.
+    return html.unescape(raw).replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+class VideoMetadataResolver:
+    def __init__(self, watch_url: str = WATCH_URL, ttl_seconds: float = 86400,
+                 cache: Optional[SQLiteCache] = None, pool_size: int = 10,
+                 timeout: float = 10):
+        """
+        Resolves the title, duration and channel of a YouTube video.
+
+        Pages are fetched through a pooled HTTP session and streamed only until
+        the needed fields are found, then matched with regular expressions
+        instead of building a full HTML tree. Results are cached per video ID
+        in memory and, when a cache is given, on disk, for `ttl_seconds`.
+
+        Args:
+            watch_url (str): Watch page URL template with a `{video_id}` placeholder.
+                Point it at a local server to test without network access.
+            ttl_seconds (float): How long resolved metadata is reused.
+            cache (SQLiteCache): Optional persistent cache shared between processes.
+            pool_size (int): Number of pooled HTTP connections.
+            timeout (float): HTTP timeout in seconds.
+        """
+        self.watch_url = watch_url
+        self.ttl_seconds = ttl_seconds
+        self.cache = cache
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._memory = {}
+        self._lock = threading.Lock()
+
+    def _fetch(self, video_id: str) -> dict:
+        metadata = {"video_id": video_id, "title": None, "duration": None, "channel": None}
+        page = ""
+        with self.session.get(self.watch_url.format(video_id=video_id),
+                              stream=True, timeout=self.timeout) as response:
+            response.raise_for_status()
+            response.encoding = response.encoding or "utf-8"
+            for chunk in response.iter_content(chunk_size=64 * 1024, decode_unicode=True):
+                page += chunk
+                if metadata["title"] is None and (match := TITLE_PATTERN.search(page)):
+                    metadata["title"] = _normalize_title(match.group(1))
+                if metadata["duration"] is None and (match := DURATION_PATTERN.search(page)):
+                    metadata["duration"] = parse_iso_duration(match.group(1))
+                if metadata["channel"] is None and (match := CHANNEL_PATTERN.search(page)):
+                    metadata["channel"] = html.unescape(match.group(1))
+                if all(value is not None for value in metadata.values()):
+                    break
+                if len(page) > MAX_PAGE_BYTES:
+                    break
+        return metadata
+
+    def resolve(self, video_id: str) -> dict:
+        """
+        Return the metadata of a video, from cache when still fresh.
+
+        Args:
+            video_id (str): The YouTube video ID.
+
+        Returns:
+            dict: `video_id`, `title`, `duration` in seconds and `channel`. Fields
+                missing from the page are None.
+        """
+        now = time.time()
+        with self._lock:
+            cached = self._memory.get(video_id)
+        if cached and cached[0] > now:
+            return dict(cached[1])
+
+        metadata = None
+        expires_at = now + self.ttl_seconds
+        if self.cache is not None:
+            stored = self.cache.get_entry(video_id)
+            if stored is not None:
+                # Keep the age of the stored entry, so it is not served past its TTL.
+                metadata, expires_at = json.loads(stored[0]), stored[1] + self.ttl_seconds
+        if metadata is None:
+            metadata = self._fetch(video_id)
+            if metadata["title"] is None:
+                # Likely a consent or error page, do not cache it.
+                return metadata
+            if self.cache is not None:
+                self.cache.set(video_id, json.dumps(metadata).encode("utf-8"))
+
+        with self._lock:
+            self._memory[video_id] = (expires_at, metadata)
+        return dict(metadata)
+
+    def invalidate(self, video_id: str):
+        with self._lock:
+            self._memory.pop(video_id, None)
+        if self.cache is not None:
+            self.cache.delete(video_id)
+
+
+metadata_resolver = VideoMetadataResolver(
+    ttl_seconds=config.METADATA_CACHE_TTL_SECONDS,
+    cache=SQLiteCache(
+        config.METADATA_CACHE_PATH,
+        table="video_metadata",
+        ttl_seconds=config.METADATA_CACHE_TTL_SECONDS,
+    ) if config.METADATA_CACHE_PATH else None,
+)
@@ -0,0 +1,159 @@
+import os
+import multiprocessing
+from typing import List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from ..utils.tracing import tracer
+
+SAMPLE_RATE = 16000
+FRAME_SECONDS = 0.02
+
+
+def frame_energy(audio):
+    """RMS energy of consecutive `FRAME_SECONDS` frames of a 16 kHz waveform."""
+    import numpy as np
+
+    frame_size = int(SAMPLE_RATE * FRAME_SECONDS)
+    frame_count = len(audio) // frame_size
+    frames = audio[:frame_count * frame_size].reshape(frame_count, frame_size)
+    return np.sqrt(np.mean(np.square(frames, dtype=np.float32), axis=1))
+
+
+def find_split_points(audio, segment_seconds: float, search_seconds: float = 15.0) -> List[int]:
+    """
+    Find sample offsets close to every `segment_seconds` that fall on silence.
+
+    The audio is cut into short frames and, around each target boundary, the
+    frame with the lowest RMS energy within `search_seconds` is chosen so that
+    words are not split between two segments. The search never reaches back
+    to the previous split point and is narrowed to half of `segment_seconds`
+    when it is wider, so segments are at least half their target length.
+
+    Args:
+        audio (numpy.ndarray): Mono 16 kHz waveform.
+        segment_seconds (float): Target length of each segment.
+        search_seconds (float): How far before and after a target boundary to look for silence.
+
+    Returns:
+        List[int]: Sample offsets to split the audio at, excluding 0 and the end.
+
+    Raises:
+        ValueError: If `segment_seconds` is shorter than a frame.
+    """
+    import numpy as np
+
+    frames_per_segment = int(segment_seconds / FRAME_SECONDS)
+    if frames_per_segment < 1:
+        raise ValueError(
+            f"segment_seconds must be at least {FRAME_SECONDS}, got {segment_seconds}.")
+
+    frame_size = int(SAMPLE_RATE * FRAME_SECONDS)
+    frame_count = len(audio) // frame_size
+    if frame_count == 0:
+        return []
+    energy = frame_energy(audio)
+
+    search_frames = min(int(search_seconds / FRAME_SECONDS), frames_per_segment // 2)
+    split_points = []
+    previous = 0
+    target = frames_per_segment
+    while target < frame_count - search_frames:
+        low = max(target - search_frames, previous + 1)
+        high = max(min(target + search_frames, frame_count - 1), low + 1)
+        quietest = low + int(np.argmin(energy[low:high]))
+        split_points.append(quietest * frame_size)
+        previous = quietest
+        target = quietest + frames_per_segment
+    return split_points
+
+
+def split_audio(audio, segment_seconds: float) -> List[Tuple[int, int]]:
+    """Return `(start, end)` sample ranges covering the audio, split at silence."""
+    bounds = [0] + find_split_points(audio, segment_seconds) + [len(audio)]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _init_worker(size: str, language: Optional[str], threads: int):
+    import torch
+    from .whisper_pool import whisper_pool
+
+    # The parent records the whole transcription, spans of the workers would
+    # go to separate logs and their metrics overwrite the file at exit.
+    tracer.enabled = False
+    torch.set_num_threads(threads)
+    whisper_pool.warm_up([size], language)
+
+
+def _transcribe_segment(audio, offset: float, size: str, language: Optional[str]) -> dict:
+    from .whisper_pool import whisper_pool
+
+    result = whisper_pool.transcribe(
+        audio, size=size, language=language, fp16=False)
+    segments = []
+    for segment in result.get("segments", []):
+        segment = dict(segment)
+        segment["start"] += offset
+        segment["end"] += offset
+        segments.append(segment)
+    return {
+        "text": result.get("text", "").strip(),
+        "segments": segments,
+        "language": result.get("language"),
+    }
+
+
+def transcribe_segmented(
+    audio_path: str,
+    size: str = "base",
+    language: Optional[str] = None,
+    workers: Optional[int] = None,
+    segment_seconds: float = 300,
+) -> dict:
+    """
+    Transcribe long audio by splitting it at silence and running the segments
+    on a pool of worker processes.
+
+    Each worker keeps its own Whisper model in the process-wide pool, so the
+    weights are loaded once per worker rather than once per segment. Segment
+    timestamps are shifted back to the position of the segment in the full
+    audio and the results are stitched together in order.
+
+    Args:
+        audio_path (str): Path to the audio file.
+        size (str): Whisper model size.
+        language (str): Optional language code.
+        workers (int): Number of worker processes. Defaults to the CPU count.
+        segment_seconds (float): Target length of each segment.
+
+    Returns:
+        dict: A result shaped like `model.transcribe`, with `text`, `segments` and `language`.
+    """
+    import whisper
+
+    with tracer.span("whisper_segmented", model=size) as span:
+        audio = whisper.load_audio(audio_path)
+        ranges = split_audio(audio, segment_seconds)
+        workers = max(1, min(workers or os.cpu_count() or 1, len(ranges)))
+        threads = max(1, (os.cpu_count() or 1) // workers)
+
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(size, language, threads),
+        ) as executor:
+            futures = [
+                executor.submit(
+                    _transcribe_segment, audio[start:end], start / SAMPLE_RATE, size, language)
+                for start, end in ranges
+            ]
+            results = [future.result() for future in futures]
+        span.set(segments=len(ranges), workers=workers)
+    segments = [segment for result in results for segment in result["segments"]]
+    for index, segment in enumerate(segments):
+        segment["id"] = index
+    return {
+        "text": " ".join(result["text"] for result in results if result["text"]),
+        "segments": segments,
+        "language": results[0]["language"] if results else language,
+    }
@@ -0,0 +1,236 @@
+import queue
+import threading
+import subprocess
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .whisper_pool import whisper_pool
+from ..utils.tracing import tracer
+from .segmented import SAMPLE_RATE, FRAME_SECONDS, frame_energy
+
+# ffmpeg writes signed 16-bit mono samples.
+BYTES_PER_SAMPLE = 2
+# Shorter leftovers at the end of the audio are dropped rather than transcribed alone.
+MIN_TAIL_SECONDS = 0.5
+_END = object()
+
+
+def resolve_audio_stream(url: str) -> Tuple[str, Dict[str, str]]:
+    """
+    Resolve the direct URL of the best audio stream of a video without downloading it.
+
+    Args:
+        url (str): The video URL.
+
+    Returns:
+        Tuple[str, Dict[str, str]]: The stream URL and the HTTP headers it must be requested with.
+    """
+    import yt_dlp as youtube_dl
+
+    options = {
+        'format': 'bestaudio/best',
+        'noplaylist': True,
+        'nocheckcertificate': True,
+        'quiet': True,
+        'no_warnings': True,
+    }
+    with youtube_dl.YoutubeDL(options) as ydl:
+        info = ydl.extract_info(url, download=False)
+    return info["url"], info.get("http_headers") or {}
+
+
+def decode_windows(source: str, window_seconds: float,
+                   headers: Optional[Dict[str, str]] = None) -> Iterator:
+    """
+    Decode audio with ffmpeg into fixed-length 16 kHz mono windows as it arrives.
+
+    ffmpeg reads the source progressively, so the first window is available
+    after `window_seconds` of audio have been fetched, and only one window is
+    held in memory at a time.
+
+    Args:
+        source (str): URL or path of the audio.
+        window_seconds (float): Length of each window. The last one may be shorter.
+        headers (Dict[str, str]): HTTP headers sent with a URL source.
+
+    Yields:
+        numpy.ndarray: float32 waveforms in [-1, 1].
+    """
+    import numpy as np
+
+    command = ["ffmpeg", "-nostdin", "-loglevel", "error"]
+    if headers:
+        command += ["-headers", "".join(f"{key}: {value}\r\n" for key, value in headers.items())]
+    command += ["-i", source, "-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE), "-"]
+    window_bytes = int(window_seconds * SAMPLE_RATE) * BYTES_PER_SAMPLE
+
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    try:
+        while True:
+            data = process.stdout.read(window_bytes)
+            if not data:
+                break
+            data = data[:len(data) - len(data) % BYTES_PER_SAMPLE]
+            yield np.frombuffer(data, np.int16).astype(np.float32) / 32768.0
+        if process.wait() != 0:
+            raise RuntimeError(f"ffmpeg exited with status {process.returncode}.")
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+
+
+def _prefetch(windows: Iterator, max_pending: int) -> Iterator:
+    """
+    Iterate over `windows` produced on a background thread, at most `max_pending` ahead.
+
+    When transcription falls behind, the full queue blocks the producer, which
+    stops reading ffmpeg's output, which in turn stops the download. Closing
+    the returned iterator stops the producer and closes `windows`.
+    """
+    pending = queue.Queue(maxsize=max_pending)
+    stopped = threading.Event()
+
+    def put(item) -> bool:
+        while not stopped.is_set():
+            try:
+                pending.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for window in windows:
+                if not put(window):
+                    return
+            put(_END)
+        except Exception as e:
+            put(e)
+        finally:
+            windows.close()
+
+    threading.Thread(target=produce, daemon=True).start()
+    try:
+        while True:
+            item = pending.get()
+            if item is _END:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stopped.set()
+
+
+def _quietest_cut(audio, search_seconds: float) -> int:
+    """Sample offset of the quietest frame within the last `search_seconds` of the audio."""
+    import numpy as np
+
+    energy = frame_energy(audio)
+    search_frames = min(len(energy), int(search_seconds / FRAME_SECONDS))
+    if search_frames == 0:
+        return len(audio)
+    low = len(energy) - search_frames
+    quietest = low + int(np.argmin(energy[low:]))
+    return max(quietest, 1) * int(SAMPLE_RATE * FRAME_SECONDS)
+
+
+def transcribe_windows(
+    windows: Iterable,
+    size: str = "base",
+    language: Optional[str] = None,
+    search_seconds: float = 5.0,
+    on_segments: Optional[Callable[[List[dict]], None]] = None,
+) -> dict:
+    """
+    Transcribe consecutive audio windows as they are produced.
+
+    Each window is cut at the quietest frame of its last `search_seconds` and
+    the remainder is carried into the next window, or transcribed on its own
+    after the last one, so words are not split between two Whisper calls.
+    Segment timestamps are shifted to their position in the full audio.
+
+    Args:
+        windows (Iterable): float32 16 kHz waveforms, in order.
+        size (str): Whisper model size.
+        language (str): Optional language code.
+        search_seconds (float): How far back from the end of a window to look for silence.
+        on_segments (Callable): Called with all the segments transcribed so far
+            after every window, e.g. to start summarizing before the end of the audio.
+
+    Returns:
+        dict: A result shaped like `model.transcribe`, with `text`, `segments` and `language`.
+    """
+    import numpy as np
+
+    segments, texts = [], []
+    detected_language = language
+    offset = 0
+
+    def transcribe(piece):
+        nonlocal detected_language
+        result = whisper_pool.transcribe(piece, size=size, language=language)
+        detected_language = detected_language or result.get("language")
+        for segment in result.get("segments", []):
+            segment = dict(segment)
+            segment["id"] = len(segments)
+            segment["start"] += offset / SAMPLE_RATE
+            segment["end"] += offset / SAMPLE_RATE
+            segments.append(segment)
+        if result.get("text", "").strip():
+            texts.append(result["text"].strip())
+        if on_segments is not None:
+            on_segments(segments)
+
+    carry = np.zeros(0, dtype=np.float32)
+    for window in windows:
+        audio = np.concatenate((carry, window)) if len(carry) else window
+        cut = _quietest_cut(audio, search_seconds)
+        transcribe(audio[:cut])
+        offset += cut
+        carry = audio[cut:]
+    if len(carry) >= MIN_TAIL_SECONDS * SAMPLE_RATE:
+        transcribe(carry)
+    return {"text": " ".join(texts), "segments": segments, "language": detected_language}
+
+
+def transcribe_stream(
+    source: str,
+    size: str = "base",
+    language: Optional[str] = None,
+    window_seconds: float = 30.0,
+    max_pending: int = 4,
+    headers: Optional[Dict[str, str]] = None,
+    on_segments: Optional[Callable[[List[dict]], None]] = None,
+) -> dict:
+    """
+    Download, decode and transcribe audio concurrently.
+
+    ffmpeg decodes the source into windows on a background thread while the
+    previous windows are transcribed, so downloading overlaps with Whisper.
+    At most `max_pending` decoded windows wait for transcription, which
+    bounds memory whatever the length of the audio.
+
+    Args:
+        source (str): URL or path of the audio.
+        size (str): Whisper model size.
+        language (str): Optional language code.
+        window_seconds (float): Length of the decoded windows.
+        max_pending (int): Decoded windows buffered ahead of transcription.
+        headers (Dict[str, str]): HTTP headers sent with a URL source.
+        on_segments (Callable): Called with the segments transcribed so far after every window.
+
+    Returns:
+        dict: A result shaped like `model.transcribe`, with `text`, `segments` and `language`.
+    """
+    with tracer.span("whisper_streaming", model=size) as span:
+        windows = _prefetch(decode_windows(source, window_seconds, headers), max_pending)
+        try:
+            result = transcribe_windows(
+                windows, size=size, language=language, on_segments=on_segments)
+        finally:
+            windows.close()
+        span.set(segments=len(result["segments"]))
+    return result
@@ -0,0 +1,112 @@
+import os
+import json
+import time
+import zlib
+import sqlite3
+import threading
+from typing import List, Optional
+
+from ..config import config
+
+CAPTIONS_SOURCE = "captions"
+
+
+def whisper_source(model: str) -> str:
+    """Source name of a transcript produced by a Whisper model size."""
+    return f"whisper:{model}"
+
+
+class TranscriptStore:
+    def __init__(self, path: str, compression_level: int = 6):
+        """
+        Local store of raw timed transcripts, compressed with zlib in SQLite.
+
+        Transcripts are keyed by video ID, language and source, the source being
+        `captions` or `whisper:<model>`, so a video can be re-chunked and
+        re-indexed without fetching its captions or transcribing it again.
+
+        Args:
+            path (str): Path of the SQLite file. Parent directories are created.
+            compression_level (int): zlib compression level.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.compression_level = compression_level
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS transcripts ("
+                "video_id TEXT, language TEXT, source TEXT, title TEXT, "
+                "data BLOB, segment_count INTEGER, created_at REAL, "
+                "PRIMARY KEY (video_id, language, source))")
+
+    def save(self, video_id: str, language: str, source: str, text: str,
+             segments: List[dict], title: str = ""):
+        """
+        Store the transcript of a video, replacing the one from the same source.
+
+        Args:
+            video_id (str): The video ID.
+            language (str): Language code of the transcript.
+            source (str): `captions`, or `whisper:<model>` as built by `whisper_source`.
+            text (str): The full transcript text.
+            segments (List[dict]): Timed segments with `text`, `start` and `duration`.
+            title (str): The video title.
+        """
+        data = zlib.compress(
+            json.dumps({"text": text, "segments": segments}).encode("utf-8"),
+            self.compression_level)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO transcripts (video_id, language, source, title, "
+                "data, segment_count, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (video_id, language or "", source, title, data, len(segments), time.time()))
+
+    def find(self, video_id: str, language: Optional[str] = None,
+             preferred_source: Optional[str] = None) -> Optional[dict]:
+        """
+        Return the best stored transcript of a video.
+
+        Transcripts in the requested language come first, then captions, then
+        `preferred_source`, then the most recent.
+
+        Args:
+            video_id (str): The video ID.
+            language (str): Preferred language code.
+            preferred_source (str): Preferred Whisper source when there are no captions.
+
+        Returns:
+            dict or None: The entry with `language`, `source`, `title`, `text` and `segments`.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT * FROM transcripts WHERE video_id = ? "
+                "ORDER BY language = ? DESC, source = ? DESC, source = ? DESC, "
+                "created_at DESC LIMIT 1",
+                (video_id, language or "", CAPTIONS_SOURCE, preferred_source or "")).fetchone()
+        if row is None:
+            return None
+        entry = {key: row[key] for key in ("video_id", "language", "source", "title", "created_at")}
+        entry.update(json.loads(zlib.decompress(row["data"])))
+        return entry
+
+    def list(self) -> List[dict]:
+        """Return the video ID, language, source and title of every stored transcript."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT video_id, language, source, title, segment_count, created_at "
+                "FROM transcripts ORDER BY created_at").fetchall()
+        return [dict(row) for row in rows]
+
+    def delete(self, video_id: str):
+        with self._lock, self._connection:
+            self._connection.execute(
+                "DELETE FROM transcripts WHERE video_id = ?", (video_id,))
+
+
+transcript_store = TranscriptStore(
+    config.TRANSCRIPT_STORE_PATH) if config.TRANSCRIPT_STORE_PATH else None
@@ -0,0 +1,165 @@
+import time
+import threading
+from collections import OrderedDict
+from typing import Iterable, Optional
+from ..config import config
+from ..utils.tracing import tracer
+
+# Approximate in-memory footprint (fp32 weights) of each Whisper model, used to
+# make room in the pool before a model is loaded.
+WHISPER_MODEL_SIZES_MB = {
+    "tiny": 150,
+    "base": 290,
+    "small": 970,
+    "medium": 3000,
+    "large": 6200,
+    "turbo": 3200,
+}
+ENGLISH_ONLY_SIZES = {"tiny", "base", "small", "medium"}
+
+
+def resolve_model_name(size: str, language: Optional[str] = None) -> str:
+    """Return the Whisper checkpoint name for a model size and language."""
+    if language == "en" and size in ENGLISH_ONLY_SIZES:
+        return f"{size}.en"
+    return size
+
+
+class WhisperModelPool:
+    def __init__(self, memory_budget_mb: int = 2048, device: Optional[str] = None):
+        """
+        Process-wide registry of loaded Whisper models with LRU eviction.
+
+        Models are loaded once per process and kept in memory until the
+        combined footprint exceeds the memory budget, at which point the least
+        recently used models are dropped.
+
+        A Whisper model keeps per-call decoder state on itself (its kv-cache
+        hooks), so transcriptions with the same model are serialized by a lock
+        per model name. Different models still run in parallel.
+
+        Args:
+            memory_budget_mb (int): Maximum combined size of loaded models in MB.
+            device (str): Torch device to load the models on. Whisper picks one when None.
+        """
+        self.memory_budget_mb = memory_budget_mb
+        self.device = device
+        self._models = OrderedDict()
+        self._sizes_mb = {}
+        self._lock = threading.RLock()
+        self._transcribe_locks = {}
+        self.stats = {
+            "loads": 0,
+            "hits": 0,
+            "evictions": 0,
+            "load_seconds": 0.0,
+            "transcriptions": 0,
+            "transcribe_seconds": 0.0,
+        }
+
+    @staticmethod
+    def _estimate_size_mb(name: str) -> int:
+        return WHISPER_MODEL_SIZES_MB.get(name.split(".")[0].split("-")[0], 0)
+
+    @staticmethod
+    def _measure_size_mb(model) -> int:
+        return int(sum(
+            parameter.numel() * parameter.element_size()
+            for parameter in model.parameters()
+        ) / (1024 * 1024))
+
+    def _used_mb(self) -> int:
+        return sum(self._sizes_mb.values())
+
+    def _evict_for(self, required_mb: int):
+        while self._models and self._used_mb() + required_mb > self.memory_budget_mb:
+            name, _ = self._models.popitem(last=False)
+            self._sizes_mb.pop(name, None)
+            self.stats["evictions"] += 1
+            tracer.event("whisper_evict", model=name)
+
+    def get(self, size: str = "base", language: Optional[str] = None):
+        """
+        Return a loaded Whisper model, loading it on first use.
+
+        Args:
+            size (str): Whisper model size, e.g. "base" or "small".
+            language (str): Optional language code. English selects the `.en` checkpoint.
+
+        Returns:
+            whisper.Whisper: The loaded model.
+        """
+        name = resolve_model_name(size, language)
+        with self._lock:
+            if name in self._models:
+                self._models.move_to_end(name)
+                self.stats["hits"] += 1
+                return self._models[name]
+
+            import whisper
+
+            self._evict_for(self._estimate_size_mb(name))
+            started = time.perf_counter()
+            with tracer.span("whisper_load", model=name):
+                model = whisper.load_model(name, device=self.device)
+            elapsed = time.perf_counter() - started
+
+            self._models[name] = model
+            self._sizes_mb[name] = self._measure_size_mb(model)
+            self.stats["loads"] += 1
+            self.stats["load_seconds"] += elapsed
+            # The estimate may have been off, re-check the budget with the real size.
+            self._models.move_to_end(name)
+            while len(self._models) > 1 and self._used_mb() > self.memory_budget_mb:
+                evicted, _ = self._models.popitem(last=False)
+                self._sizes_mb.pop(evicted, None)
+                self.stats["evictions"] += 1
+            return model
+
+    def transcribe(self, audio, size: str = "base", language: Optional[str] = None, **kwargs):
+        """
+        Transcribe audio with a pooled model.
+
+        Calls using the same model wait for each other, see the class docstring.
+
+        Args:
+            audio (str or numpy.ndarray): Path to an audio file or a 16 kHz waveform.
+            size (str): Whisper model size.
+            language (str): Optional language code, forwarded to Whisper.
+            **kwargs: Additional arguments passed to `model.transcribe`.
+
+        Returns:
+            dict: The Whisper transcription result.
+        """
+        model = self.get(size, language)
+        with self._lock:
+            model_lock = self._transcribe_locks.setdefault(
+                resolve_model_name(size, language), threading.Lock())
+        if language:
+            kwargs.setdefault("language", language)
+        started = time.perf_counter()
+        with tracer.span("whisper", model=size) as span, model_lock:
+            result = model.transcribe(audio, **kwargs)
+            span.set(segments=len(result.get("segments", [])))
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.stats["transcriptions"] += 1
+            self.stats["transcribe_seconds"] += elapsed
+        return result
+
+    def warm_up(self, sizes: Iterable[str], language: Optional[str] = None):
+        """Load the given model sizes ahead of the first transcription."""
+        for size in sizes:
+            self.get(size, language)
+
+    def loaded_models(self) -> list:
+        with self._lock:
+            return list(self._models.keys())
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+            self._sizes_mb.clear()
+
+
+whisper_pool = WhisperModelPool(memory_budget_mb=config.WHISPER_MEMORY_BUDGET_MB)
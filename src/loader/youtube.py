@@ -1,15 +1,27 @@
 import os
-import shutil
-import whisper
-import requests
-import yt_dlp as youtube_dl
-from bs4 import BeautifulSoup
-from .constants import OUTPUT_PATH
-from langchain_text_splitters import CharacterTextSplitter
-from youtube_transcript_api import YouTubeTranscriptApi, TranscriptsDisabled
+import hashlib
+from ..config import config
+from .constants import OUTPUT_PATH, UPLOAD_CHUNK_SIZE
+from .metadata import metadata_resolver
+from .whisper_pool import whisper_pool
+from .segmented import transcribe_segmented
+from .streaming import resolve_audio_stream, transcribe_stream
+from .transcript_store import transcript_store, whisper_source, CAPTIONS_SOURCE
+from ..utils.tracing import tracer
+
+
+def get_transcript(video_id: str) -> list:
+    """Caption segments of a video from the YouTube Transcript API, imported on first use."""
+    from youtube_transcript_api import YouTubeTranscriptApi
+
+    return YouTubeTranscriptApi.get_transcript(video_id)
 
 
 class YoutubeLoader:
+    # Callable returning the caption segments of a video ID, replaceable with
+    # recorded fixtures to run the pipeline offline.
+    transcript_provider = staticmethod(get_transcript)
+
     def __init__(self, url, video_id, title, local=False, language=["en"], translation=["en"]):
         self.url = url
         self.video_id = video_id
@@ -18,6 +30,7 @@ class YoutubeLoader:
         self.local = local
         self.title = title
         self.sub_title = ""
+        self.segments = []
 
     @staticmethod
     def extract_video_id(youtube_url: str) -> str:
@@ -29,16 +42,11 @@ class YoutubeLoader:
             )
         return video_id
 
-    @staticmethod
-    def get_title(video_url: str):
-        """Extract title of the YouTube video"""
-        r = requests.get(video_url)
-        soup = BeautifulSoup(r.text, "html.parser")
-
-        title = soup.find_all(name="title")[0]
-        title = str(title)
-        title = title.replace("<title>", "").replace("</title>", "")
-        return title
+    @classmethod
+    def get_title(cls, video_url: str):
+        """Extract title of the YouTube video, cached per video ID."""
+        video_id = cls.extract_video_id(video_url)
+        return metadata_resolver.resolve(video_id)["title"]
 
     @classmethod
     def from_youtube_url(cls, youtube_url: str, **kwargs: dict):
@@ -79,55 +87,39 @@ class YoutubeLoader:
     @classmethod
     def from_local_file_path(cls, uploaded_file, **kwargs: dict):
         """
-        Creates an instance of the class from a YouTube URL.
+        Creates an instance of the class from an uploaded audio file.
 
-        Validates the URL to ensure it is from a supported YouTube domain and 
-        extracts the video ID and title. The extracted information is passed 
-        as arguments to initialize the class instance.
+        The upload is copied to `OUTPUT_PATH` in blocks of `UPLOAD_CHUNK_SIZE`
+        while its SHA-256 is computed, and the hash is used as the video ID.
+        Uploading the same audio again, under any name, therefore maps to the
+        video already ingested and reuses its summary and chunks.
 
         Args:
-            youtube_url (str): The YouTube video URL.
+            uploaded_file (UploadedFile): The file received from `st.file_uploader`.
             **kwargs (dict): Additional keyword arguments to be passed to the class constructor.
 
         Returns:
-            cls: An instance of the class initialized with the YouTube URL, video ID, and additional data.
-
-        Raises:
-            ValueError: If the URL is not from a supported YouTube domain.
+            cls: An instance of the class initialized with the stored file path, content hash, and file name.
         """
-        file_id = uploaded_file.file_id
-        audio_output_path = f"{OUTPUT_PATH}/{file_id}.mp3"
-        with open(audio_output_path, "wb") as f:
-            f.write(uploaded_file.getbuffer())
+        os.makedirs(OUTPUT_PATH, exist_ok=True)
+        digest = hashlib.sha256()
+        partial_path = os.path.join(OUTPUT_PATH, f"{uploaded_file.file_id}.part")
+        uploaded_file.seek(0)
+        with open(partial_path, "wb") as f:
+            while block := uploaded_file.read(UPLOAD_CHUNK_SIZE):
+                digest.update(block)
+                f.write(block)
+        video_id = digest.hexdigest()
+        audio_output_path = os.path.join(OUTPUT_PATH, f"{video_id}.mp3")
+        os.replace(partial_path, audio_output_path)
         kwargs.update({
             "url": audio_output_path,
-            "video_id": file_id,
+            "video_id": video_id,
             "title": uploaded_file.name,
             "local": True
         })
         return cls(**kwargs)
 
-    def __create_or_empty_directory(self, directory_path):
-        """
-        Creates a new directory if it doesn't exist, or empties the existing directory.
-
-        If the specified directory exists, it removes all files and subdirectories inside it. 
-        If the directory doesn't exist, it creates the directory.
-
-        Args:
-            directory_path (str): The path to the directory to create or empty.
-
-        """
-        if os.path.exists(directory_path):
-            for filename in os.listdir(directory_path):
-                file_path = os.path.join(directory_path, filename)
-                if os.path.isdir(file_path):
-                    shutil.rmtree(file_path)
-                else:
-                    os.remove(file_path)
-        else:
-            os.makedirs(directory_path)
-
     def __download_audio_from_video(self):
         """
         Downloads the audio from a YouTube video and saves it as an MP3 file.
@@ -135,7 +127,8 @@ class YoutubeLoader:
         This method attempts to download the audio from the video URL using the 
         `pytube` library. If that fails, it falls back to using `youtube_dl` to 
         download the audio in `.webm` format. The resulting audio file is saved 
-        in a predefined output directory.
+        in a predefined output directory under the video ID, so concurrent 
+        downloads of different videos do not overwrite each other.
 
         Returns:
             str: The path to the downloaded audio file (MP3 or .webm).
@@ -143,38 +136,44 @@ class YoutubeLoader:
         Raises:
             Exception: If unable to download the audio.
         """
-        self.__create_or_empty_directory(OUTPUT_PATH)
-        try:
-            output_path = f'{OUTPUT_PATH}\output.webm'
-            options = {
-                'format': 'bestaudio/best',
-                'keepvideo': False,
-                'outtmpl': output_path,
-                'restrictfilenames': True,
-                'noplaylist': True,
-                'nocheckcertificate': True,
-                'ignoreerrors': False,
-                'logtostderr': False,
-                'quiet': True,
-                'no_warnings': True,
-                'default_search': 'auto',
-                'source_address': '0.0.0.0'
-            }
-
-            with youtube_dl.YoutubeDL(options) as ydl:
-                ydl.download([self.url])
-
-            print("Download complete... {}".format(output_path))
-            return output_path
-        except Exception as e:
-            return
+        import yt_dlp as youtube_dl
+
+        os.makedirs(OUTPUT_PATH, exist_ok=True)
+        with tracer.span("audio_download", video_id=self.video_id) as span:
+            try:
+                output_path = os.path.join(OUTPUT_PATH, f"{self.video_id}.webm")
+                options = {
+                    'format': 'bestaudio/best',
+                    'keepvideo': False,
+                    'outtmpl': output_path,
+                    'restrictfilenames': True,
+                    'noplaylist': True,
+                    'nocheckcertificate': True,
+                    'ignoreerrors': False,
+                    'logtostderr': False,
+                    'quiet': True,
+                    'no_warnings': True,
+                    'default_search': 'auto',
+                    'source_address': '0.0.0.0'
+                }
+
+                with youtube_dl.YoutubeDL(options) as ydl:
+                    ydl.download([self.url])
+
+                span.set(bytes=os.path.getsize(output_path))
+                return output_path
+            except Exception as e:
+                span.set(error=type(e).__name__)
+                return
 
     def __self_transcribe_audio(self, audio_path):
         """
         Transcribes the audio from a given file using the Whisper model.
 
-        This method loads the Whisper model and attempts to transcribe the audio 
-        from the specified file. If an error occurs during the transcription process, 
+        This method takes the Whisper model from the process-wide pool, so the 
+        weights are only loaded once per process, and attempts to transcribe the audio 
+        from the specified file. With `TRANSCRIPTION_MODE=segmented` the audio is split 
+        at silence and transcribed in parallel on worker processes. If an error occurs during the transcription process, 
         it prints a message and returns `None`.
 
         Args:
@@ -188,8 +187,15 @@ class YoutubeLoader:
             Exception: If the transcription process fails due to invalid audio file or model loading issue.
         """
         try:
-            model = whisper.load_model("base")
-            result = model.transcribe(audio_path)
+            if config.TRANSCRIPTION_MODE == "segmented":
+                result = transcribe_segmented(
+                    audio_path,
+                    size=config.WHISPER_MODEL,
+                    workers=config.TRANSCRIPTION_WORKERS,
+                    segment_seconds=config.TRANSCRIPTION_SEGMENT_SECONDS)
+            else:
+                result = whisper_pool.transcribe(
+                    audio_path, size=config.WHISPER_MODEL)
             if not result:
                 print("Audio Not Found in the provided file")
                 return None
@@ -198,56 +204,182 @@ class YoutubeLoader:
             print(f"An error occurred during transcription: {e}")
             return None
 
-    def load(self):
+    def fetch_captions(self) -> bool:
         """
-        Loads the YouTube transcript or transcribes the audio if no transcript is available.
+        Fetches the transcript of the video from the YouTube Transcript API.
 
-        This method first attempts to retrieve the transcript of the YouTube video using 
-        the YouTube Transcript API. If the transcript is not available or disabled, it 
-        falls back to downloading the audio from the video, transcribing it using Whisper, 
-        and storing the transcription text.
+        The transcript is stored in `sub_title` and its timed segments in `segments`.
 
-        The resulting transcript (either from the YouTube API or Whisper) is stored in 
-        the `sub_title` attribute of the class.
-
-        Raises:
-            Exception: If both transcript retrieval and audio transcription fail.
+        Returns:
+            bool: True if a transcript was found.
         """
-        if not self.local:
+        if self.local:
+            return False
+        from youtube_transcript_api import TranscriptsDisabled
+
+        with tracer.span("transcript_fetch", video_id=self.video_id) as span:
             try:
                 # Attempt to get the transcript from the YouTube Transcript API
-                sub = YouTubeTranscriptApi.get_transcript(self.video_id)
+                sub = self.transcript_provider(self.video_id)
+                self.segments = [
+                    {"text": x['text'], "start": x['start'], "duration": x['duration']}
+                    for x in sub
+                ]
                 self.sub_title = " ".join([x['text'] for x in sub])
+                span.set(segments=len(self.segments))
+                self.__store_transcript(self.language[0], CAPTIONS_SOURCE)
             except TranscriptsDisabled:
                 # If transcripts are disabled for this video, notify and try to transcribe audio
+                span.set(error="TranscriptsDisabled")
                 print(
                     "Transcripts are disabled for this video. Processing can take extra time.")
             except Exception as e:
                 # Catch any other errors related to transcript retrieval
+                span.set(error=type(e).__name__)
                 print(f"Error retrieving transcript: {e}")
-        if not self.sub_title:
-            try:
-                # If subtitle is not set, download audio and transcribe it
-                audio_path = self.url if self.local else self.__download_audio_from_video()
-                if not audio_path:
-                    return
-                result = self.__self_transcribe_audio(audio_path)
-                if result:
-                    self.sub_title = result.get("text", "")
-                    print(self.sub_title)
-            except Exception as e:
-                print(f"Error in audio extraction or transcription: {e}")
-                print("Audio could not be extracted or transcribed.")
-
-    def divide_into_chunks(self):
-        if not self.sub_title:
-            raise Exception("No Subtitle Found.")
-
-        text_splitter = CharacterTextSplitter(
-            separator="\n\n",
-            chunk_size=500,
-            length_function=len,
-            is_separator_regex=False,
-        )
-        splitted_text = text_splitter.create_documents([self.sub_title])
-        return splitted_text
+        return bool(self.sub_title)
+
+    def download_audio(self):
+        """
+        Returns the path of the audio to transcribe, downloading it for YouTube videos.
+
+        Returns:
+            str or None: The audio path, or None if the download failed.
+        """
+        return self.url if self.local else self.__download_audio_from_video()
+
+    def transcribe_audio(self, audio_path: str):
+        """
+        Transcribes the audio file with Whisper into `sub_title` and `segments`.
+
+        Downloaded audio is removed once transcribed, uploaded files are kept.
+
+        Args:
+            audio_path (str): The audio file to transcribe.
+        """
+        try:
+            result = self.__self_transcribe_audio(audio_path)
+            if result:
+                self.sub_title = result.get("text", "")
+                self.segments = [
+                    self.__to_segment(x) for x in result.get("segments", [])
+                ]
+                self.__store_transcript(
+                    result.get("language"), whisper_source(config.WHISPER_MODEL))
+        except Exception as e:
+            print(f"Error in audio extraction or transcription: {e}")
+            print("Audio could not be extracted or transcribed.")
+        finally:
+            if not self.local and os.path.exists(audio_path):
+                os.remove(audio_path)
+
+    def __store_transcript(self, language: str, source: str):
+        if transcript_store is not None and self.sub_title:
+            transcript_store.save(
+                self.video_id, language or self.language[0], source,
+                self.sub_title, self.segments, title=self.title)
+
+    def load_stored(self) -> bool:
+        """
+        Loads the transcript from the local transcript store, if the video was transcribed before.
+
+        Captions are preferred over Whisper transcripts, and among these the
+        configured Whisper model.
+
+        Returns:
+            bool: True if a stored transcript was found.
+        """
+        if transcript_store is None:
+            return False
+        with tracer.span("transcript_store", video_id=self.video_id) as span:
+            stored = transcript_store.find(
+                self.video_id, self.language[0], whisper_source(config.WHISPER_MODEL))
+            span.set(hit=stored is not None)
+        if stored is None:
+            return False
+        self.sub_title = stored["text"]
+        self.segments = stored["segments"]
+        return bool(self.sub_title)
+
+    @staticmethod
+    def __to_segment(whisper_segment: dict) -> dict:
+        return {
+            "text": whisper_segment["text"],
+            "start": whisper_segment["start"],
+            "duration": whisper_segment["end"] - whisper_segment["start"],
+        }
+
+    def stream_audio(self, on_segments=None):
+        """
+        Transcribes the audio with Whisper while it is being downloaded.
+
+        The audio stream is decoded by ffmpeg into fixed-length windows that are
+        transcribed as they arrive, so nothing is written to disk and memory
+        does not grow with the length of the video. `segments` is extended
+        after every window, and the text is stored in `sub_title` at the end.
+
+        Args:
+            on_segments (Callable): Called with the segments transcribed so far
+                after every window.
+        """
+        self.segments = []
+
+        def publish(whisper_segments):
+            self.segments.extend(
+                self.__to_segment(x) for x in whisper_segments[len(self.segments):])
+            if on_segments is not None:
+                on_segments(self.segments)
+
+        try:
+            source, headers = (self.url, None) if self.local else resolve_audio_stream(self.url)
+            result = transcribe_stream(
+                source,
+                size=config.WHISPER_MODEL,
+                window_seconds=config.TRANSCRIPTION_WINDOW_SECONDS,
+                max_pending=config.TRANSCRIPTION_MAX_PENDING_WINDOWS,
+                headers=headers,
+                on_segments=publish)
+            self.sub_title = result.get("text", "")
+            self.__store_transcript(
+                result.get("language"), whisper_source(config.WHISPER_MODEL))
+        except Exception as e:
+            print(f"Error in audio streaming or transcription: {e}")
+            print("Audio could not be extracted or transcribed.")
+
+    def load(self, on_segments=None):
+        """
+        Loads the YouTube transcript or transcribes the audio if no transcript is available.
+
+        This method first attempts to retrieve the transcript of the YouTube video using 
+        the YouTube Transcript API. If the transcript is not available or disabled, it 
+        falls back to downloading the audio from the video, transcribing it using Whisper, 
+        and storing the transcription text.
+
+        The resulting transcript (either from the YouTube API or Whisper) is stored in 
+        the `sub_title` attribute of the class, and its timed segments, each with 
+        `text`, `start` and `duration`, in the `segments` attribute.
+
+        With `TRANSCRIPTION_MODE=streaming` the audio is transcribed while it is
+        downloaded, and `on_segments` receives the partial transcript after
+        every transcribed window.
+
+        Transcripts stored by an earlier load are read from the local transcript
+        store first, without any network request or transcription.
+
+        Args:
+            on_segments (Callable): Called with the Whisper segments transcribed so far.
+
+        Raises:
+            Exception: If both transcript retrieval and audio transcription fail.
+        """
+        if self.load_stored():
+            return
+        self.fetch_captions()
+        if not self.sub_title and config.TRANSCRIPTION_MODE == "streaming":
+            self.stream_audio(on_segments)
+        elif not self.sub_title:
+            # If subtitle is not set, download audio and transcribe it
+            audio_path = self.download_audio()
+            if not audio_path:
+                return
+            self.transcribe_audio(audio_path)
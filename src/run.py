@@ -1,112 +1,212 @@
-from .llm.graph import app
+import time
+import asyncio
+from functools import partial
+from typing import Optional
+from .config import config
 from .loader.youtube import YoutubeLoader
-from .llm.invoke import get_response_message
-from .llm.splitter import split_by_character
-from .vectorDB.chroma import ChromaDBManager
+from .llm.chunker import chunk_transcript, segments_from_text
 from .utils.regex_utils import extract_youtube_url
+from .utils.tracing import tracer
+from .utils.resources import resources
+from .ingestion.jobs import IngestionJob, IngestionQueue, QueueFullError
 from .constants import (
     COLLECTION_NAME,
     CHUNK_TYPE,
-    SUMMARY_TYPE,
     NO_URL_RESPONSE,
     WRONG_URL_RESPONSE,
     EXTRACTION_FAILED_RESPONSE,
+    INGESTION_BUSY_RESPONSE,
     URL_KEY_TERM,
     INITIAL_MESSAGE,
 )
 
-loader = None
-db_manager = ChromaDBManager(collection_name=COLLECTION_NAME)
+ingestion_queue = IngestionQueue(
+    max_workers=config.INGESTION_WORKERS,
+    max_pending=config.INGESTION_MAX_PENDING)
+
+# The vector store, the models and the summary graph are imported and built on
+# first use and shared by every session of the process, so Streamlit reruns,
+# new sessions and chat turns that only retrieve do not pay for them. What
+# belongs to one session, its messages and current video, is kept in
+# `st.session_state`.
+
+
+@resources.shared("chroma_client")
+def get_chroma_client():
+    """Return the Chroma client of the app, opened on first use."""
+    import chromadb
+
+    return chromadb.Client(chromadb.config.Settings(
+        is_persistent=True, persist_directory=config.CHROMA_PERSIST_DIRECTORY))
+
+
+@resources.shared("db_manager")
+def get_db_manager():
+    """Return the vector store of the app, opened on first use."""
+    from .vectorDB.chroma import ChromaDBManager
+
+    return ChromaDBManager(
+        collection_name=COLLECTION_NAME,
+        persist_directory=config.CHROMA_PERSIST_DIRECTORY,
+        partitioned=config.VECTOR_STORE_PARTITIONED,
+        dense_dtype=config.DENSE_INDEX_DTYPE,
+        dense_max_loaded=config.DENSE_INDEX_MAX_LOADED,
+        client=get_chroma_client())
+
+
+@resources.shared("answer_cache")
+def get_answer_cache():
+    """Return the answer cache of the app, created on first use."""
+    from .llm.answer_cache import AnswerCache
+    from .llm.model import get_embedding_model
+
+    return AnswerCache(
+        get_embedding_model(),
+        similarity_threshold=config.ANSWER_CACHE_SIMILARITY,
+        ttl_seconds=config.ANSWER_CACHE_TTL_SECONDS,
+        max_entries=config.ANSWER_CACHE_MAX_ENTRIES)
 
 
 def get_context(query: str, video_id: str, title: str = "") -> str:
-    documents = db_manager.query(
-        query=query,
-        filter_query={
-            "$and": [
-                {
-                    "type": CHUNK_TYPE
-                },
-                {
-                    "$or": [
-                        {
-                            "id": video_id
-                        },
-                        {
-                            "title": title
-                        }
-                    ]
-                }
-            ]
-        })
-    document_list = [document.page_content for document in documents]
-    return " ".join(document_list)
-
-
-def get_existing_summary(user_query: str, video_id: str, title: str = "") -> str:
-    documents = db_manager.query(
-        query=user_query,
-        filter_query={
-            "$and": [
-                {
-                    "type": SUMMARY_TYPE
-                },
-                {
-                    "$or": [
-                        {
-                            "id": video_id
-                        },
-                        {
-                            "title": title
-                        }
-                    ]
-                }
-            ]
-        }, n_results=1)
-    if documents:
-        document = documents[0]
-        return document.page_content
-
-
-async def generate_summary(split_docs: list) -> str:
-    async for step in app.astream(
-        {"contents": [doc.page_content for doc in split_docs]},
-        {"recursion_limit": 10},
-    ):
-        print(list(step.keys()))
+    """
+    Retrieve the transcript context of a question, packed into the token budget.
+
+    The packing report, with the prompt tokens saved against the former
+    top-5 context, is recorded on the `context_packing` span and in
+    `context_reports`.
+    """
+    from .vectorDB.context import assemble_context
+
+    documents = get_db_manager().search_video(
+        query, video_id, title, n_results=config.CONTEXT_CANDIDATES,
+        fast_path_threshold=config.LEXICAL_FAST_PATH_THRESHOLD)
+    context, _ = assemble_context(
+        documents, token_budget=config.CONTEXT_TOKEN_BUDGET,
+        lambda_mult=config.CONTEXT_MMR_LAMBDA)
+    return context
+
+
+def get_existing_summary(video_id: str, title: str = "") -> str:
+    entry = get_db_manager().get_ingested(video_id, title)
+    if entry:
+        return entry["summary"]
+
+
+async def generate_summary(contents: list) -> str:
+    from .llm.graph import get_app
+
+    with tracer.span("summarize", chunks=len(contents)) as span:
+        steps = 0
+        async for step in get_app().astream(
+            {"contents": contents},
+            {"recursion_limit": 10},
+        ):
+            steps += 1
+        span.set(steps=steps)
     summary = step.get('generate_final_summary', {}).get('final_summary')
     return summary
 
 
-async def get_response(loader):
+async def get_response(loader, job: Optional[IngestionJob] = None,
+                       summary: Optional[str] = None):
+    """
+    Summarize and index the transcript of a loaded video.
+
+    Args:
+        loader (YoutubeLoader): The loader holding the transcript.
+        job (IngestionJob): Job whose progress is updated, if any.
+        summary (str): Summary to store instead of generating one.
+
+    Returns:
+        str: The summary, or an error message when there is no transcript.
+    """
     response = ""
     if not loader.sub_title:
         response = EXTRACTION_FAILED_RESPONSE
     else:
-        summary_text_list = split_by_character(
-            loader.sub_title, chunk_size=5000)
-        text_list = split_by_character(
-            loader.sub_title, chunk_size=500)
-        response = await generate_summary(summary_text_list)
+        if job:
+            job.update("summarizing", 0.4)
+        segments = loader.segments or segments_from_text(loader.sub_title)
+        summary_chunks, retrieval_chunks = chunk_transcript(
+            segments,
+            fine_tokens=config.RETRIEVAL_CHUNK_TOKENS,
+            coarse_tokens=config.SUMMARY_CHUNK_TOKENS)
+        response = summary or await generate_summary(summary_chunks.contents())
+        if job:
+            job.update("embedding", 0.8)
+        text_list = retrieval_chunks.to_documents()
         text_list.append(response)
+        get_answer_cache().invalidate(loader.video_id)
         metadata = {
             "id": loader.video_id,
             "title": loader.title,
             "type": CHUNK_TYPE
         }
-        await db_manager.add_documents(
+        await get_db_manager().add_documents(
             text_list, metadata, has_summary=True)
     return response
 
 
-async def execute(title: str):
-    global loader
+async def ingest(loader, job: IngestionJob) -> str:
+    from .llm.graph import MapCacheWarmer
+
+    with tracer.span("ingest", video_id=loader.video_id):
+        job.update("fetching transcript", 0.05)
+        warmer = MapCacheWarmer(
+            fine_tokens=config.RETRIEVAL_CHUNK_TOKENS,
+            coarse_tokens=config.SUMMARY_CHUNK_TOKENS)
+        loader.load(on_segments=warmer)
+        await asyncio.to_thread(warmer.close)
+        return await get_response(loader, job)
+
 
+async def ingest_in_background(loader) -> str:
+    """
+    Ingest the video on the background queue and show its progress until done.
+
+    Requests for a video that is already being ingested attach to the running
+    job, so a video is only processed once.
+    """
+    import streamlit as st
+    try:
+        job = ingestion_queue.submit(
+            loader.video_id, partial(ingest, loader), title=loader.title)
+    except QueueFullError:
+        return INGESTION_BUSY_RESPONSE
+
+    progress_bar = st.progress(job.progress, text=job.stage.capitalize())
+    while not job.done:
+        progress_bar.progress(job.progress, text=job.stage.capitalize())
+        await asyncio.sleep(0.5)
+    progress_bar.empty()
+
+    if job.error:
+        return EXTRACTION_FAILED_RESPONSE
+    return job.result
+
+
+async def stream_answer(prefix: str, context: str, question: str) -> str:
+    """Stream the answer into a new assistant message and return its text."""
+    import streamlit as st
+    from .llm.invoke import astream_response_message
+
+    placeholder = st.chat_message("assistant").empty()
+    answer = ""
+    async for token in astream_response_message(context, question):
+        answer += token
+        placeholder.markdown(f"{prefix}{answer}▌")
+    placeholder.markdown(f"{prefix}{answer}")
+    return answer
+
+
+async def execute(title: str):
     import streamlit as st
     st.title(f"💬 {title}")
     if "messages" not in st.session_state:
         st.session_state["messages"] = [
             {"role": "assistant", "content": INITIAL_MESSAGE}]
+    # The video of this session, so concurrent sessions never answer about each other's.
+    loader = st.session_state.get("loader")
 
     for msg in st.session_state.messages:
         st.chat_message(msg["role"]).write(msg["content"])
@@ -116,6 +216,7 @@ async def execute(title: str):
             {"role": "user", "content": user_input})
         st.chat_message("user").write(user_input)
         if user_input:
+            streamed = False
             if not loader and URL_KEY_TERM not in user_input:
                 response = NO_URL_RESPONSE
             elif URL_KEY_TERM in user_input:
@@ -123,41 +224,50 @@ async def execute(title: str):
                 if not url:
                     response = WRONG_URL_RESPONSE
 
-                loader = YoutubeLoader.from_youtube_url(url)
-                summary = get_existing_summary(user_input, loader.video_id)
+                loader = st.session_state["loader"] = YoutubeLoader.from_youtube_url(url)
+                summary = get_existing_summary(loader.video_id)
                 video_already_scraped = True if summary else False
                 if video_already_scraped:
                     response = summary
                 else:
-                    loader.load()
-                    response = await get_response(loader)
-                loader = YoutubeLoader.from_youtube_url(url)
+                    response = await ingest_in_background(loader)
 
             elif URL_KEY_TERM not in user_input:
-                context = get_context(
-                    user_input, loader.video_id, loader.title)
-                print(context)
-                response = get_response_message(context, user_input)
+                with tracer.span("chat", video_id=loader.video_id) as span:
+                    answer_cache = get_answer_cache()
+                    response, question_vector = answer_cache.lookup(loader.video_id, user_input)
+                    span.set(cached=response is not None)
+                    if response is None:
+                        started = time.perf_counter()
+                        context = get_context(
+                            user_input, loader.video_id, loader.title)
+                        response = await stream_answer(
+                            f"**{loader.title}**\n\n", context, user_input)
+                        streamed = True
+                        answer_cache.store(
+                            loader.video_id, user_input, response,
+                            seconds=time.perf_counter() - started, vector=question_vector)
             response = f"**{loader.title}**\n\n{response}" if loader else response
             st.session_state.messages.append(
                 {"role": "assistant", "content": response})
-            st.chat_message("assistant").write(response)
+            if not streamed:
+                st.chat_message("assistant").write(response)
 
     if uploaded_file := st.file_uploader("Upload MP3", type=["mp3"]):
         if not user_input:
             if uploaded_file:
                 st.chat_message("assistant").write(
                     f"🎧 MP3 file uploaded: {uploaded_file.name}.\n\nPlease wait while your file is being processed")
-                loader = YoutubeLoader.from_local_file_path(
+                loader = st.session_state["loader"] = YoutubeLoader.from_local_file_path(
                     uploaded_file=uploaded_file)
             uploaded_file = None
-            summary = get_existing_summary("", loader.video_id, loader.title)
+            # Uploads are identified by content, a title match may be another file.
+            summary = get_existing_summary(loader.video_id)
             video_already_scraped = True if summary else False
             if video_already_scraped:
                 response = summary
             else:
-                loader.load()
-                response = await get_response(loader)
+                response = await ingest_in_background(loader)
 
             response = f"**{loader.title}**\n\n{response}"
             st.session_state.messages.append(
@@ -0,0 +1,89 @@
+import asyncio
+import threading
+from typing import List, Tuple
+
+import httpx
+
+from ..config import config
+from .resources import resources
+
+
+def _client_options() -> dict:
+    return {
+        "limits": httpx.Limits(
+            max_connections=config.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=config.HTTP_MAX_KEEPALIVE_CONNECTIONS),
+        "timeout": httpx.Timeout(config.HTTP_TIMEOUT_SECONDS),
+    }
+
+
+class LoopLocalAsyncClient(httpx.AsyncClient):
+    def __init__(self, **kwargs):
+        """
+        Async HTTP client keeping one connection pool per event loop.
+
+        Streamlit runs every script rerun in a new event loop, and the summary
+        warm-up runs in loops of its own, while a pooled connection can only be
+        used from the loop that opened it. Requests are built by this client
+        and sent through the pool of the running loop, created on first use.
+        Pools of closed loops are closed on the next request, so their sockets
+        are not left to the garbage collector.
+
+        Args:
+            **kwargs: Options of every pool, as for `httpx.AsyncClient`.
+        """
+        # Requests are only built here, the parent needs no transport of its own.
+        super().__init__(transport=httpx.AsyncBaseTransport(), **kwargs)
+        self._options = kwargs
+        self._pools = {}
+        self._pools_lock = threading.Lock()
+
+    def _pool(self) -> Tuple[httpx.AsyncClient, List[httpx.AsyncClient]]:
+        """Return the pool of the running loop and the pools of closed loops, now dropped."""
+        loop = asyncio.get_running_loop()
+        with self._pools_lock:
+            dropped = [self._pools.pop(other) for other in list(self._pools) if other.is_closed()]
+            if loop not in self._pools:
+                self._pools[loop] = httpx.AsyncClient(**self._options)
+            return self._pools[loop], dropped
+
+    @staticmethod
+    async def _close_dropped(pools: List[httpx.AsyncClient]):
+        for pool in pools:
+            connection_pool = getattr(pool._transport, "_pool", None)
+            for connection in list(getattr(connection_pool, "connections", [])):
+                try:
+                    await connection.aclose()
+                except RuntimeError:
+                    # The socket is closed, only the callback scheduled on the
+                    # closed loop failed. Each connection is closed on its own,
+                    # as closing the pool stops at the first error.
+                    pass
+
+    async def send(self, request: httpx.Request, **kwargs) -> httpx.Response:
+        pool, dropped = self._pool()
+        if dropped:
+            await self._close_dropped(dropped)
+        return await pool.send(request, **kwargs)
+
+    async def aclose(self):
+        loop = asyncio.get_running_loop()
+        with self._pools_lock:
+            pool = self._pools.pop(loop, None)
+            dropped = [self._pools.pop(other) for other in list(self._pools) if other.is_closed()]
+        await self._close_dropped(dropped)
+        if pool is not None:
+            await pool.aclose()
+        await super().aclose()
+
+
+@resources.shared("http_client")
+def get_http_client() -> httpx.Client:
+    """Return the connection-pooled HTTP client shared by the sync model clients."""
+    return httpx.Client(**_client_options())
+
+
+@resources.shared("http_async_client")
+def get_async_http_client() -> LoopLocalAsyncClient:
+    """Return the connection-pooled HTTP client shared by the async model clients."""
+    return LoopLocalAsyncClient(**_client_options())
@@ -0,0 +1,68 @@
+import time
+import threading
+from functools import wraps
+from typing import Callable, Dict, Optional
+
+from .tracing import tracer
+
+
+class ResourcePool:
+    def __init__(self):
+        """
+        Process-wide registry of the clients and models shared by every session.
+
+        Streamlit runs each browser session in a thread of the same process.
+        A resource is built the first time any session asks for it, under a
+        lock of its own, so sessions arriving together wait for that build
+        instead of starting another one, and building one resource never
+        blocks getting another. Resources hold no per-session state.
+        """
+        self._factories: Dict[str, Callable] = {}
+        self._resources = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self.stats: Dict[str, dict] = {}
+
+    def shared(self, name: str):
+        """
+        Turn a factory without arguments into the getter of a shared resource.
+
+        Example:
+            @resources.shared("llm")
+            def get_llm():
+                return ChatOpenAI(...)
+        """
+        def decorator(factory: Callable):
+            self._factories[name] = factory
+            self._locks[name] = threading.Lock()
+            self.stats[name] = {"builds": 0, "build_seconds": 0.0}
+
+            @wraps(factory)
+            def getter():
+                return self.get(name)
+
+            return getter
+        return decorator
+
+    def get(self, name: str):
+        if name in self._resources:
+            return self._resources[name]
+        with self._locks[name]:
+            if name not in self._resources:
+                started = time.perf_counter()
+                with tracer.span("resource_build", resource=name):
+                    self._resources[name] = self._factories[name]()
+                self.stats[name]["builds"] += 1
+                self.stats[name]["build_seconds"] += time.perf_counter() - started
+            return self._resources[name]
+
+    def loaded(self) -> list:
+        return list(self._resources)
+
+    def reset(self, name: Optional[str] = None):
+        """Drop one resource, or all of them, so they are built again on next use."""
+        for key in [name] if name else list(self._resources):
+            with self._locks[key]:
+                self._resources.pop(key, None)
+
+
+resources = ResourcePool()
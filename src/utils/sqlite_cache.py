@@ -0,0 +1,120 @@
+import os
+import time
+import sqlite3
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+
+class SQLiteCache:
+    def __init__(self, path: str, table: str = "cache", max_entries: Optional[int] = None,
+                 ttl_seconds: Optional[float] = None):
+        """
+        Small persistent key/value store backed by a local SQLite file.
+
+        Entries are evicted least recently used first once the table holds more
+        than `max_entries` rows, and are ignored once older than `ttl_seconds`.
+
+        Args:
+            path (str): Path of the SQLite file. Parent directories are created.
+            table (str): Name of the table, so several caches can share a file.
+            max_entries (int): Maximum number of rows kept. Unbounded when None.
+            ttl_seconds (float): Time to live of an entry. Entries never expire when None.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.table = table
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                "key TEXT PRIMARY KEY, value BLOB, created_at REAL, accessed_at REAL)")
+            self._connection.execute(
+                f"CREATE INDEX IF NOT EXISTS {table}_accessed_at ON {table} (accessed_at)")
+
+    def _is_fresh(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds is None or now - created_at <= self.ttl_seconds
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, bytes]:
+        """Return the stored values for the keys that are present and fresh."""
+        return {key: value for key, (value, _) in self._get_entries(keys).items()}
+
+    def get_entry(self, key: str) -> Optional[Tuple[bytes, float]]:
+        """Return the stored value and its creation time, if present and fresh."""
+        return self._get_entries([key]).get(key)
+
+    def _get_entries(self, keys: Iterable[str]) -> Dict[str, Tuple[bytes, float]]:
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        now = time.time()
+        with self._lock, self._connection:
+            # Stay below SQLite's default limit of bound parameters.
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._connection.execute(
+                    f"SELECT key, value, created_at FROM {self.table} "
+                    f"WHERE key IN ({placeholders})", batch).fetchall()
+                for key, value, created_at in rows:
+                    if self._is_fresh(created_at, now):
+                        found[key] = (value, created_at)
+            self._connection.executemany(
+                f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?",
+                [(now, key) for key in found])
+        return found
+
+    def set(self, key: str, value: bytes):
+        self.set_many({key: value})
+
+    def set_many(self, items: Dict[str, bytes]):
+        """Insert or replace the given entries and evict rows above the cap."""
+        if not items:
+            return
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.executemany(
+                f"INSERT OR REPLACE INTO {self.table} "
+                "(key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                [(key, value, now, now) for key, value in items.items()])
+            self._evict()
+
+    def delete(self, key: str):
+        self.delete_many([key])
+
+    def delete_many(self, keys: Iterable[str]):
+        with self._lock, self._connection:
+            self._connection.executemany(
+                f"DELETE FROM {self.table} WHERE key = ?", [(key,) for key in keys])
+
+    def clear(self):
+        with self._lock, self._connection:
+            self._connection.execute(f"DELETE FROM {self.table}")
+
+    def _evict(self):
+        if self.ttl_seconds is not None:
+            self._connection.execute(
+                f"DELETE FROM {self.table} WHERE created_at < ?",
+                (time.time() - self.ttl_seconds,))
+        if self.max_entries is None:
+            return
+        (count,) = self._connection.execute(
+            f"SELECT COUNT(*) FROM {self.table}").fetchone()
+        if count > self.max_entries:
+            self._connection.execute(
+                f"DELETE FROM {self.table} WHERE key IN ("
+                f"SELECT key FROM {self.table} ORDER BY accessed_at LIMIT ?)",
+                (count - self.max_entries,))
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._connection.execute(
+                f"SELECT COUNT(*) FROM {self.table}").fetchone()
+        return count
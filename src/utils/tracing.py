@@ -0,0 +1,291 @@
+import os
+import sys
+import json
+import time
+import uuid
+import atexit
+import threading
+import contextvars
+from bisect import bisect_left
+from typing import Dict, Optional, Tuple
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from ..config import config
+
+METRIC_PREFIX = "youtube_chat"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                   10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+# Tags copied from a span to the spans started inside it.
+INHERITED_TAGS = ("video_id",)
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Span:
+    __slots__ = ("tracer", "name", "tags", "span_id", "parent_id", "trace_id",
+                 "started_at", "_started", "_token")
+
+    def __init__(self, tracer: "Tracer", name: str, tags: dict):
+        """
+        One timed stage of a request, used as a context manager.
+
+        Spans started inside another span, including in tasks created from it,
+        become its children and inherit its `video_id`.
+
+        Args:
+            tracer (Tracer): The tracer recording the span.
+            name (str): Stage name, used as the `stage` label of the metrics.
+            tags (dict): Fields added to the JSON log record.
+        """
+        self.tracer = tracer
+        self.name = name
+        self.tags = tags
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = None
+        self.trace_id = self.span_id
+
+    def set(self, **tags) -> "Span":
+        self.tags.update(tags)
+        return self
+
+    def add_tokens(self, input_tokens: int = 0, output_tokens: int = 0) -> "Span":
+        """Add LLM token counts to the span and to the token counters of its stage."""
+        self.tags["input_tokens"] = self.tags.get("input_tokens", 0) + input_tokens
+        self.tags["output_tokens"] = self.tags.get("output_tokens", 0) + output_tokens
+        self.tracer.increment("llm_tokens_total", input_tokens, stage=self.name, direction="input")
+        self.tracer.increment("llm_tokens_total", output_tokens, stage=self.name, direction="output")
+        return self
+
+    def __enter__(self) -> "Span":
+        parent = _current_span.get()
+        if parent is not None:
+            self.parent_id = parent.span_id
+            self.trace_id = parent.trace_id
+            for tag in INHERITED_TAGS:
+                if tag in parent.tags:
+                    self.tags.setdefault(tag, parent.tags[tag])
+        self._token = _current_span.set(self)
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        duration = time.perf_counter() - self._started
+        try:
+            _current_span.reset(self._token)
+        except ValueError:
+            # Exited from another context, e.g. an async generator closed by another task.
+            pass
+        if exc_type is not None:
+            self.tags["error"] = exc_type.__name__
+        self.tracer._finish(self, duration)
+        return False
+
+
+class _NoopSpan:
+    """Span returned while tracing is disabled, doing nothing."""
+
+    def set(self, **tags):
+        return self
+
+    def add_tokens(self, input_tokens: int = 0, output_tokens: int = 0):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    def __init__(self, enabled: bool = False, log_path: str = "", metrics_path: str = "",
+                 metrics_interval: float = 10.0, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        """
+        Spans, histograms and counters of the pipeline stages.
+
+        Every finished span is written as one JSON line and its duration is
+        observed in the `stage_duration_seconds` histogram of its stage. Metrics
+        are exported in the Prometheus text format, to a file rewritten at most
+        every `metrics_interval` seconds and at exit, or over HTTP with
+        `serve_metrics`. While disabled, `span` returns a shared no-op span and
+        nothing is recorded.
+
+        Args:
+            enabled (bool): Record spans and metrics.
+            log_path (str): File the JSON lines are appended to, standard output when empty.
+            metrics_path (str): Prometheus text file, not written when empty.
+            metrics_interval (float): Minimum seconds between two writes of the metrics file.
+            buckets (Tuple[float, ...]): Upper bounds of the duration histograms, in seconds.
+        """
+        self.enabled = enabled
+        self.metrics_path = metrics_path
+        self.metrics_interval = metrics_interval
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._histograms: Dict[tuple, Histogram] = {}
+        self._counters: Dict[tuple, float] = {}
+        self._metrics_written_at = 0.0
+        self._server = None
+        self._log = None
+        if enabled:
+            self._log = open(log_path, "a", buffering=1) if log_path else sys.stdout
+            if metrics_path:
+                atexit.register(self.write_metrics)
+
+    def span(self, name: str, **tags):
+        """Start a span, e.g. `with tracer.span("whisper", video_id=video_id) as span:`."""
+        if not self.enabled:
+            return NOOP_SPAN
+        return Span(self, name, tags)
+
+    def current(self):
+        """Return the innermost open span, or the no-op span."""
+        return _current_span.get() or NOOP_SPAN
+
+    def observe(self, name: str, value: float, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    def increment(self, name: str, value: float = 1, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def event(self, name: str, **fields):
+        """Write a JSON log line that is not tied to a timed stage."""
+        if not self.enabled:
+            return
+        span = _current_span.get()
+        record = {"timestamp": time.time(), "event": name}
+        if span is not None:
+            record.update(trace_id=span.trace_id, parent_id=span.span_id)
+            for tag in INHERITED_TAGS:
+                if tag in span.tags:
+                    record[tag] = span.tags[tag]
+        record.update(fields)
+        self._write_log(record)
+
+    def _write_log(self, record: dict):
+        line = json.dumps(record, default=str)
+        with self._lock:
+            self._log.write(line + "\n")
+
+    def _finish(self, span: Span, duration: float):
+        self.observe("stage_duration_seconds", duration, stage=span.name)
+        if "error" in span.tags:
+            self.increment("stage_errors_total", stage=span.name)
+        self._write_log({
+            "timestamp": span.started_at,
+            "span": span.name,
+            "duration_ms": round(duration * 1000, 3),
+            "trace_id": span.trace_id,
+            "span_id": span.span_id,
+            "parent_id": span.parent_id,
+            **span.tags,
+        })
+        if self.metrics_path and time.time() - self._metrics_written_at >= self.metrics_interval:
+            self.write_metrics()
+
+    @staticmethod
+    def _labels(labels: tuple, extra: str = "") -> str:
+        parts = [f'{key}="{str(value)}"' for key, value in labels]
+        if extra:
+            parts.append(extra)
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+    def render_prometheus(self) -> str:
+        """Return the metrics in the Prometheus text exposition format."""
+        with self._lock:
+            histograms = {key: (list(value.counts), value.sum, value.count)
+                          for key, value in self._histograms.items()}
+            counters = dict(self._counters)
+
+        lines = []
+        for name in sorted({name for name, _ in histograms}):
+            metric = f"{METRIC_PREFIX}_{name}"
+            lines.append(f"# TYPE {metric} histogram")
+            for (key_name, labels), (counts, total, count) in sorted(histograms.items()):
+                if key_name != name:
+                    continue
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    bucket_labels = self._labels(labels, 'le="%s"' % bound)
+                    lines.append(f"{metric}_bucket{bucket_labels} {cumulative}")
+                bucket_labels = self._labels(labels, 'le="+Inf"')
+                lines.append(f"{metric}_bucket{bucket_labels} {count}")
+                lines.append(f"{metric}_sum{self._labels(labels)} {total}")
+                lines.append(f"{metric}_count{self._labels(labels)} {count}")
+        for name in sorted({name for name, _ in counters}):
+            metric = f"{METRIC_PREFIX}_{name}"
+            lines.append(f"# TYPE {metric} counter")
+            for (key_name, labels), value in sorted(counters.items()):
+                if key_name == name:
+                    lines.append(f"{metric}{self._labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_metrics(self, path: Optional[str] = None):
+        """Atomically rewrite the Prometheus text file."""
+        path = path or self.metrics_path
+        if not path or not self.enabled:
+            return
+        self._metrics_written_at = time.time()
+        with open(f"{path}.tmp", "w") as f:
+            f.write(self.render_prometheus())
+        os.replace(f"{path}.tmp", path)
+
+    def serve_metrics(self, port: int, host: str = "0.0.0.0"):
+        """Serve the metrics at `/metrics` from a daemon thread, once per process."""
+        if self._server is not None:
+            return self._server
+        tracer = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = tracer.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self._server
+
+
+tracer = Tracer(
+    enabled=config.TRACING_ENABLED,
+    log_path=config.TRACE_LOG_PATH,
+    metrics_path=config.METRICS_PATH)
@@ -0,0 +1,156 @@
+import os
+import re
+import json
+import math
+import hashlib
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+TOKEN_PATTERN = re.compile(r"\w+")
+STOPWORDS = frozenset((
+    "a", "an", "and", "are", "as", "at", "be", "but", "by", "did", "do", "does",
+    "for", "from", "how", "i", "in", "is", "it", "of", "on", "or", "that", "the",
+    "this", "to", "was", "what", "when", "where", "which", "who", "why", "with",
+    "you", "about", "video", "tell", "me", "say", "said", "says", "they", "we",
+    "he", "she", "there", "their", "his", "her", "can", "could", "would",
+))
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in TOKEN_PATTERN.findall(text.lower())
+            if token not in STOPWORDS]
+
+
+def reciprocal_rank_fusion(rankings: Iterable[List[Hashable]], k: int = 60) -> List[Hashable]:
+    """
+    Merge several rankings with reciprocal rank fusion.
+
+    Args:
+        rankings (Iterable[List[Hashable]]): Result keys of each retriever, best first.
+        k (int): Damping constant, larger values flatten the contribution of top ranks.
+
+    Returns:
+        List[Hashable]: The keys ordered by fused score.
+    """
+    scores = {}
+    for ranking in rankings:
+        for rank, key in enumerate(ranking):
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(scores, key=scores.get, reverse=True)
+
+
+class BM25Index:
+    def __init__(self, documents: List[str], metadatas: Optional[List[dict]] = None,
+                 k1: float = 1.5, b: float = 0.75):
+        """
+        Okapi BM25 inverted index over the chunks of one video.
+
+        Args:
+            documents (List[str]): Chunk texts.
+            metadatas (List[dict]): Metadata of each chunk, returned with the hits.
+            k1 (float): Term frequency saturation.
+            b (float): Document length normalization.
+        """
+        self.documents = documents
+        self.metadatas = metadatas or [{} for _ in documents]
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        self.lengths = []
+        for index, document in enumerate(documents):
+            terms = tokenize(document)
+            self.lengths.append(len(terms))
+            for term, frequency in Counter(terms).items():
+                self.postings.setdefault(term, []).append((index, frequency))
+        self.average_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+
+    def idf(self, term: str) -> float:
+        frequency = len(self.postings.get(term, ()))
+        return math.log(1 + (len(self.documents) - frequency + 0.5) / (frequency + 0.5))
+
+    def search(self, query: str, k: int = 5) -> List[Tuple[int, float]]:
+        """Return the `(chunk index, score)` of the best `k` chunks for the query."""
+        scores = {}
+        for term in set(tokenize(query)):
+            idf = self.idf(term)
+            for index, frequency in self.postings.get(term, ()):
+                length_ratio = self.lengths[index] / (self.average_length or 1)
+                denominator = frequency + self.k1 * (1 - self.b + self.b * length_ratio)
+                scores[index] = scores.get(index, 0.0) + idf * frequency * (self.k1 + 1) / denominator
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+    def confidence(self, query: str, score: float) -> float:
+        """
+        Scale a score against the score of a typical full match of the query.
+
+        A chunk of average length containing every informative query term once
+        scores 1, and higher scores, from repeated terms or short chunks, are
+        capped at 1. Query terms missing from the video lower the confidence.
+        """
+        ceiling = sum(self.idf(term) for term in set(tokenize(query)))
+        return min(1.0, score / ceiling) if ceiling else 0.0
+
+    def to_dict(self) -> dict:
+        return {"documents": self.documents, "metadatas": self.metadatas,
+                "k1": self.k1, "b": self.b}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "BM25Index":
+        return cls(data["documents"], data["metadatas"], k1=data["k1"], b=data["b"])
+
+
+class BM25Store:
+    def __init__(self, directory: str, max_loaded: int = 32):
+        """
+        Per-video BM25 indexes persisted as JSON files next to the Chroma data.
+
+        Args:
+            directory (str): Directory of the index files.
+            max_loaded (int): Number of indexes kept in memory, least recently used are dropped.
+        """
+        self.directory = directory
+        self.max_loaded = max_loaded
+        self._loaded = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, video_id: str) -> str:
+        name = hashlib.sha256(video_id.encode("utf-8")).hexdigest()[:32]
+        return os.path.join(self.directory, f"{name}.json")
+
+    def _remember(self, video_id: str, index: BM25Index):
+        with self._lock:
+            self._loaded[video_id] = index
+            self._loaded.move_to_end(video_id)
+            while len(self._loaded) > self.max_loaded:
+                self._loaded.popitem(last=False)
+
+    def build(self, video_id: str, documents: List[str], metadatas: List[dict]) -> BM25Index:
+        index = BM25Index(documents, metadatas)
+        path = self._path(video_id)
+        with open(f"{path}.tmp", "w") as f:
+            json.dump(index.to_dict(), f)
+        os.replace(f"{path}.tmp", path)
+        self._remember(video_id, index)
+        return index
+
+    def get(self, video_id: str) -> Optional[BM25Index]:
+        with self._lock:
+            index = self._loaded.get(video_id)
+            if index is not None:
+                self._loaded.move_to_end(video_id)
+                return index
+        path = self._path(video_id)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            index = BM25Index.from_dict(json.load(f))
+        self._remember(video_id, index)
+        return index
+
+    def delete(self, video_id: str):
+        with self._lock:
+            self._loaded.pop(video_id, None)
+        if os.path.exists(self._path(video_id)):
+            os.remove(self._path(video_id))
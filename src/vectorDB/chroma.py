@@ -1,66 +1,617 @@
-from uuid import uuid4
-from typing import List, Dict, Any
+import os
+import hashlib
+import threading
+from typing import List, Dict, Any, Optional
+import chromadb
 from langchain_chroma import Chroma as ch
-from ..llm.model import embedding_model
+from ..llm.model import get_embedding_model, get_embedding_provider
+from ..utils.tracing import tracer
 from langchain_core.documents import Document
-from ..constants import SUMMARY_TYPE
+from langchain_core.embeddings import Embeddings
+from ..constants import CHUNK_TYPE, SUMMARY_TYPE, PIPELINE_VERSION
+from .bm25 import BM25Index, BM25Store, reciprocal_rank_fusion
+from .dense import DenseIndex, DenseStore
+from .manifest import IngestionManifest, INGESTING_STATUS, INGESTED_STATUS
+
+
+def partition_name(collection_name: str, video_id: str) -> str:
+    """Name of the collection holding the chunks of one video."""
+    digest = hashlib.sha256(video_id.encode("utf-8")).hexdigest()[:16]
+    return f"{collection_name[:40]}-{digest}"
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def document_id(video_id: str, position, text: str) -> str:
+    """
+    Deterministic ID of a stored document.
+
+    Args:
+        video_id (str): The video the document belongs to.
+        position (int or str): Chunk index, or `summary` for the summary.
+        text (str): Content of the document.
+    """
+    return f"{video_id}:{position}:{content_hash(text)}"
+
+
+def video_filter(video_id: str, title: str = "", document_type: str = CHUNK_TYPE) -> dict:
+    """Chroma filter selecting the documents of one type belonging to a video."""
+    return {
+        "$and": [
+            {
+                "type": document_type
+            },
+            {
+                "$or": [
+                    {
+                        "id": video_id
+                    },
+                    {
+                        "title": title
+                    }
+                ]
+            }
+        ]
+    }
 
 
 class ChromaDBManager:
-    def __init__(self, collection_name: str, persist_directory: str = "./chroma_db"):
+    def __init__(self, collection_name: str, persist_directory: str = "./chroma_db",
+                 embeddings: Optional[Embeddings] = None, partitioned: bool = False,
+                 dimensions: Optional[int] = None, dense_dtype: str = "",
+                 dense_max_loaded: int = 32, client=None):
         """
         Initialize the ChromaDB manager with the collection name and persist directory.
 
         Args:
             collection_name (str): The name of the collection.
             persist_directory (str): Directory where Chroma DB is persisted.
+            embeddings (Embeddings): Embedding model. When None, the model of the
+                configured provider is used and `collection_name` gets the suffix of
+                that model, so every embedding model has its own collections.
+            partitioned (bool): Store the chunks of every video in its own collection,
+                so searching a video never touches the vectors of other videos.
+            dimensions (int): Size of the vectors, checked before they are inserted.
+                Declared by the provider when `embeddings` is None.
+            dense_dtype (str): `float16` or `int8` to search each video in an in-process
+                copy of its vectors quantized to that type, empty to search Chroma.
+            dense_max_loaded (int): Number of dense indexes kept open.
+            client (chromadb.ClientAPI): Chroma client opened on `persist_directory`,
+                shared with other managers. One is opened for this manager when None.
+
+        The ingestion manifest and the per-video BM25 and dense indexes are kept
+        next to the Chroma files so they always describe the same data. In partitioned
+        mode the manifest also routes each video to its collection; videos
+        without a route are still read from the shared collection until they
+        are migrated with `migrate_to_partitions`.
         """
-        # Initialize OpenAI embeddings and Chroma vector store
-        self.embeddings = embedding_model
+        if embeddings is None:
+            provider = get_embedding_provider()
+            embeddings = get_embedding_model()
+            collection_name = provider.collection_name(collection_name)
+            dimensions = dimensions or provider.dimensions
+        self.embeddings = embeddings
+        self.dimensions = dimensions
+        self.collection_name = collection_name
+        self.persist_directory = persist_directory
+        self.partitioned = partitioned
+        if client is None:
+            # The settings Chroma uses for `persist_directory`, so other clients
+            # opened on the same directory in this process are compatible.
+            client = chromadb.Client(chromadb.config.Settings(
+                is_persistent=True, persist_directory=persist_directory))
+        self.client = client
         self.db = ch(collection_name=collection_name,
                      embedding_function=self.embeddings,
-                     persist_directory=persist_directory)
+                     client=client)
         self.retriever = self.db.as_retriever()
+        self._partitions = {}
+        self._partitions_lock = threading.Lock()
+        self.manifest = IngestionManifest(
+            os.path.join(persist_directory, "manifest.sqlite"), collection_name)
+        self.lexical = BM25Store(
+            os.path.join(persist_directory, "bm25", collection_name))
+        self.dense = DenseStore(
+            os.path.join(persist_directory, "dense", collection_name),
+            dtype=dense_dtype, max_loaded=dense_max_loaded) if dense_dtype else None
+
+    def _partition(self, name: str) -> ch:
+        with self._partitions_lock:
+            if name not in self._partitions:
+                self._partitions[name] = ch(collection_name=name,
+                                            embedding_function=self.embeddings,
+                                            client=self.client)
+            return self._partitions[name]
+
+    def _upsert(self, collection_name: str, ids: List[str], embeddings: list,
+                documents: List[str], metadatas: List[dict]):
+        """
+        Write records with precomputed embeddings to a collection of the client.
+
+        Records are sent in batches no larger than the client accepts at once.
+        """
+        collection = self.client.get_or_create_collection(collection_name, embedding_function=None)
+        batch_size = self.client.get_max_batch_size()
+        for start in range(0, len(ids), batch_size):
+            end = start + batch_size
+            collection.upsert(
+                ids=ids[start:end], embeddings=embeddings[start:end],
+                documents=documents[start:end], metadatas=metadatas[start:end])
+
+    def _video_ids(self, batch_size: int = 1000) -> set:
+        """IDs of the videos with records in the shared collection, read without embeddings."""
+        video_ids = set()
+        offset = 0
+        while True:
+            batch = self.db.get(include=["metadatas"], limit=batch_size, offset=offset)
+            if not batch["ids"]:
+                break
+            video_ids.update(metadata.get("id") for metadata in batch["metadatas"])
+            offset += len(batch["ids"])
+        video_ids.discard(None)
+        return video_ids
+
+    def _store_for(self, video_id: str, title: str = ""):
+        """
+        Return the vector store holding a video and whether it is a partition.
+
+        Args:
+            video_id (str): The video ID.
+            title (str): The video title, used to find the video when the ID is unknown.
+
+        Returns:
+            Tuple[Chroma, bool]: The store, and True if it only holds that video.
+        """
+        if self.partitioned:
+            entry = self.manifest.get(video_id, title)
+            if entry and entry.get("partition"):
+                return self._partition(entry["partition"]), True
+        return self.db, False
 
-    async def add_documents(self, documents: List[str], metadata: dict, has_summary: bool = False):
+    async def add_documents(self, documents: List[str], metadata: dict,
+                            has_summary: bool = False) -> Dict[str, int]:
         """
-        Add documents to Chroma DB with their corresponding metadata and embeddings.
+        Index the chunks and summary of a video, replacing what was stored for it.
+
+        Documents are stored under `document_id`, derived from the video, the
+        chunk position and the content, so ingesting the same video again
+        maps to the same records instead of adding a copy. The records already
+        stored for the video are read first: unchanged ones are left as they
+        are, texts already embedded reuse their stored vectors, and records
+        missing from the new set are deleted. Only new texts are embedded. In
+        partitioned mode, records still in the shared collection are moved into
+        the partition of the video with their stored vectors.
 
         Args:
-            documents (List[str]): List of document texts to be added to the collection.
-            metadata (List[Dict[str, Any]]): Metadata corresponding to each document.
-            ids (List[str]): List of unique document IDs.
+            documents (List[str]): Texts or documents to store, in chunk order. Metadata
+                of a document is merged over the shared metadata.
+            metadata (dict): Metadata shared by every document, with the video `id` and
+                `title`. It is copied, never modified.
+            has_summary (bool): The last document is the summary of the video.
+
+        Returns:
+            Dict[str, int]: Number of documents `embedded`, `reused` from stored
+                vectors, left `unchanged` and `deleted`.
         """
-        documents_to_insert = []
+        video_id, title = metadata.get("id"), metadata.get("title", "")
+        partition = None
+        if self.partitioned and video_id:
+            partition = partition_name(self.collection_name, video_id)
+        if video_id:
+            self.manifest.record(
+                video_id, title, INGESTING_STATUS, pipeline_version=PIPELINE_VERSION,
+                partition=partition)
+
+        documents_to_insert, ids = [], []
         documents_length = len(documents)
         for index, document in enumerate(documents):
-            if has_summary and index == documents_length - 1:
-                metadata.update({"type": SUMMARY_TYPE})
-            documents_to_insert.append(Document(
-                page_content=document if isinstance(
-                    document, str) else document.page_content,
-                metadata=metadata
-            ))
-        uuids = [str(uuid4()) for _ in range(len(documents))]
-        self.db.add_documents(documents=documents_to_insert, ids=uuids)
+            # Copy the shared metadata so per-chunk fields stay on their chunk.
+            document_metadata = dict(metadata)
+            if not isinstance(document, str):
+                document_metadata.update(document.metadata)
+            is_summary = has_summary and index == documents_length - 1
+            if is_summary:
+                document_metadata.update({"type": SUMMARY_TYPE})
+            text = document if isinstance(document, str) else document.page_content
+            documents_to_insert.append(Document(page_content=text, metadata=document_metadata))
+            position = "summary" if is_summary else document_metadata.get("chunk_index", index)
+            ids.append(document_id(video_id or "", position, text))
+
+        store = self._partition(partition) if partition else self.db
+        stored = self._stored_records(video_id, store) if video_id else {}
+        vectors = {content_hash(record["document"]): record["embedding"]
+                   for record in stored.values()}
+        texts = [document.page_content for document in documents_to_insert]
+        embeddings, changed, to_embed = [], [], []
+        for position, (record_id, document) in enumerate(zip(ids, documents_to_insert)):
+            record = stored.get(record_id)
+            if (record is not None and record["store"] is store
+                    and record["metadata"] == document.metadata):
+                embeddings.append(record["embedding"])
+                continue
+            changed.append(position)
+            embeddings.append(vectors.get(content_hash(document.page_content)))
+            if embeddings[-1] is None:
+                to_embed.append(position)
+        current = set(ids)
+        stale = [record_id for record_id in stored if record_id not in current]
+        counts = {"embedded": len(to_embed), "reused": len(changed) - len(to_embed),
+                  "unchanged": len(ids) - len(changed), "deleted": len(stale)}
+
+        # Embedded here rather than inside the store so both stages are timed apart.
+        with tracer.span("embedding", video_id=video_id, texts=len(to_embed)):
+            new_embeddings = await self.embeddings.aembed_documents(
+                [texts[position] for position in to_embed]) if to_embed else []
+        if self.dimensions and new_embeddings and len(new_embeddings[0]) != self.dimensions:
+            raise ValueError(
+                f"The embedding model returned {len(new_embeddings[0])} dimensions, "
+                f"{self.collection_name} holds {self.dimensions}.")
+        for position, embedding in zip(to_embed, new_embeddings):
+            embeddings[position] = embedding
+        with tracer.span("chroma_insert", video_id=video_id, **counts):
+            if changed:
+                self._upsert(
+                    partition or self.collection_name,
+                    ids=[ids[position] for position in changed],
+                    embeddings=[embeddings[position] for position in changed],
+                    documents=[texts[position] for position in changed],
+                    metadatas=[documents_to_insert[position].metadata for position in changed])
+            self._delete_records(stale, stored)
+            if any(record["store"] is not store for record in stored.values()):
+                # Copies left in the shared collection, now upserted into the partition.
+                self.db.delete(where={"id": video_id})
+
+        if video_id:
+            summary = None
+            if has_summary and documents_to_insert:
+                summary = documents_to_insert[-1].page_content
+            self._index_video(
+                video_id, title, documents_to_insert, embeddings, summary, partition,
+                pipeline_version=PIPELINE_VERSION)
+        return counts
+
+    def _stored_records(self, video_id: str, store: ch) -> Dict[str, dict]:
+        """
+        Records of a video by ID, with their embeddings.
+
+        In partitioned mode, copies of the video left in the shared collection
+        are included, so they are replaced along with the partition.
+        """
+        stores = [store] if store is self.db else [store, self.db]
+        records = {}
+        for source in stores:
+            results = source.get(
+                where={"id": video_id}, include=["embeddings", "documents", "metadatas"])
+            for record_id, embedding, document, metadata in zip(
+                    results["ids"], results["embeddings"], results["documents"],
+                    results["metadatas"]):
+                records.setdefault(record_id, {
+                    "store": source, "embedding": embedding,
+                    "document": document, "metadata": metadata})
+        return records
+
+    @staticmethod
+    def _delete_records(record_ids: List[str], stored: Dict[str, dict]):
+        """Delete records returned by `_stored_records` from the collections holding them."""
+        stores = {id(record["store"]): record["store"] for record in stored.values()}
+        for key, store in stores.items():
+            ids = [record_id for record_id in record_ids if id(stored[record_id]["store"]) == key]
+            if ids:
+                store.delete(ids=ids)
+
+    def _index_video(self, video_id: str, title: str, documents: List[Document], embeddings: list,
+                     summary: Optional[str], partition: Optional[str],
+                     pipeline_version: Optional[str] = None):
+        """Rebuild the BM25 and dense indexes of a video and mark it ingested."""
+        chunks = [(document, embedding) for document, embedding in zip(documents, embeddings)
+                  if document.metadata.get("type") == CHUNK_TYPE]
+        chunk_texts = [document.page_content for document, _ in chunks]
+        chunk_metadatas = [document.metadata for document, _ in chunks]
+        self.lexical.build(video_id, chunk_texts, chunk_metadatas)
+        if self.dense is not None:
+            self.dense.build(
+                video_id, [embedding for _, embedding in chunks], chunk_texts, chunk_metadatas)
+        self.manifest.record(
+            video_id, title, INGESTED_STATUS,
+            chunk_count=len(documents) - (1 if summary is not None else 0),
+            summary=summary, pipeline_version=pipeline_version, partition=partition)
+
+    def delete_video(self, video_id: str):
+        """Remove the chunks, summary, BM25 index and manifest entry of a video."""
+        store, is_partition = self._store_for(video_id)
+        store.delete(where={"id": video_id})
+        if is_partition:
+            # Copies left in the shared collection by a migration without --delete-source.
+            self.db.delete(where={"id": video_id})
+        self.lexical.delete(video_id)
+        if self.dense is not None:
+            self.dense.delete(video_id)
+        self.manifest.delete(video_id)
+
+    def get_ingested(self, video_id: str, title: str = "") -> Optional[dict]:
+        """
+        Look up whether a video has been ingested, without embedding anything.
+
+        The manifest is checked first. Videos ingested before the manifest
+        existed are found with a metadata-only Chroma lookup of their summary
+        and backfilled into the manifest.
+
+        Args:
+            video_id (str): The video ID.
+            title (str): The video title, used when the ID is not found.
 
-        print(f"Added {len(uuids)} documents to Chroma DB.")
+        Returns:
+            dict or None: The manifest entry if the video is fully ingested.
+        """
+        entry = self.manifest.get(video_id, title)
+        if entry:
+            return entry if entry["status"] == INGESTED_STATUS else None
+
+        owner = [{"id": video_id}, {"title": title}] if title else [{"id": video_id}]
+        results = self.db.get(
+            where={"$and": [{"type": SUMMARY_TYPE},
+                            {"$or": owner} if len(owner) > 1 else owner[0]]},
+            limit=1)
+        if not results["documents"]:
+            return None
+        found = results["metadatas"][0]
+        chunk_count = len(self.db.get(where={"id": found["id"]}, include=[])["ids"]) - 1
+        self.manifest.record(
+            found["id"], found.get("title", ""), INGESTED_STATUS,
+            chunk_count=chunk_count, summary=results["documents"][0])
+        return self.manifest.get(found["id"])
 
-    def query(self, query: str, filter_query: Any = None, n_results: int = 5):
+    def query(self, query: str, filter_query: Any = None, n_results: int = 5,
+              store: Optional[ch] = None):
         """
         Query the Chroma DB to retrieve documents similar to the input query.
 
         Args:
             query (str): The query string to search for in the Chroma DB.
             n_results (int): Number of results to return.
+            store (Chroma): Collection to search, the shared one when None.
 
         Returns:
             List[str]: List of most similar documents based on the query.
         """
-        results = self.db.similarity_search(
+        results = (store or self.db).similarity_search(
             query,
             k=n_results,
             filter=filter_query,
         )
 
         return results
+
+    def _lexical_index(self, video_id: str) -> Optional[BM25Index]:
+        index = self.lexical.get(video_id)
+        if index is None:
+            # Built on first use for videos ingested before BM25 indexes existed.
+            store, _ = self._store_for(video_id)
+            results = store.get(where={"$and": [{"id": video_id}, {"type": CHUNK_TYPE}]})
+            if results["documents"]:
+                index = self.lexical.build(
+                    video_id, results["documents"], results["metadatas"])
+        return index
+
+    def _dense_index(self, video_id: str) -> Optional[DenseIndex]:
+        index = self.dense.get(video_id)
+        if index is None:
+            # Built on first use for videos ingested before dense indexes existed.
+            store, _ = self._store_for(video_id)
+            results = store.get(
+                where={"$and": [{"id": video_id}, {"type": CHUNK_TYPE}]},
+                include=["embeddings", "documents", "metadatas"])
+            if results["documents"]:
+                index = self.dense.build(
+                    video_id, results["embeddings"], results["documents"], results["metadatas"])
+        return index
+
+    def search_video(self, query: str, video_id: str, title: str = "", n_results: int = 5,
+                     fast_path_threshold: Optional[float] = None, rrf_k: int = 60) -> List[Document]:
+        """
+        Hybrid BM25 and vector search over the chunks of one video.
+
+        The BM25 index of the video is searched first. When its best hit is
+        confident enough, the lexical results are returned without embedding
+        the query. Otherwise the lexical and vector rankings are merged with
+        reciprocal rank fusion. With dense indexes enabled, the vector ranking
+        comes from the in-process index of the video instead of Chroma.
+
+        Args:
+            query (str): The user question.
+            video_id (str): The video to search.
+            title (str): The video title, also matched by the vector filter.
+            n_results (int): Number of chunks to return.
+            fast_path_threshold (float): Minimum BM25 confidence, between 0 and 1, to
+                skip the vector search. The fast path is disabled when None or above 1.
+            rrf_k (int): Reciprocal rank fusion constant.
+
+        Returns:
+            List[Document]: The best chunks, best first.
+        """
+        with tracer.span("query", video_id=video_id) as span:
+            index = self._lexical_index(video_id)
+            lexical_hits = index.search(query, k=n_results * 4) if index else []
+            lexical_documents = [
+                Document(page_content=index.documents[position], metadata=index.metadatas[position])
+                for position, _ in lexical_hits
+            ]
+            fast_path = bool(
+                lexical_hits and fast_path_threshold is not None and fast_path_threshold <= 1 and
+                index.confidence(query, lexical_hits[0][1]) >= fast_path_threshold)
+            span.set(fast_path=fast_path)
+            if fast_path:
+                return lexical_documents[:n_results]
+
+            dense = self._dense_index(video_id) if self.dense is not None else None
+            span.set(dense=dense is not None)
+            if dense is not None:
+                vector_documents = [
+                    Document(page_content=dense.documents[position], metadata=dense.metadatas[position])
+                    for position, _ in dense.search(
+                        self.embeddings.embed_query(query), k=n_results * 2)
+                ]
+            else:
+                store, is_partition = self._store_for(video_id, title)
+                vector_documents = self.query(
+                    query,
+                    filter_query={"type": CHUNK_TYPE} if is_partition else video_filter(video_id, title),
+                    n_results=n_results * 2,
+                    store=store)
+        if not lexical_documents:
+            return vector_documents[:n_results]
+
+        by_content = {}
+        for document in vector_documents + lexical_documents:
+            by_content.setdefault(document.page_content, document)
+        fused = reciprocal_rank_fusion(
+            [[document.page_content for document in vector_documents],
+             [document.page_content for document in lexical_documents]],
+            k=rrf_k)
+        return [by_content[content] for content in fused[:n_results]]
+
+    def migrate_to_partitions(self, batch_size: int = 1000, delete_source: bool = False) -> int:
+        """
+        Copy the chunks of the shared collection into per-video collections.
+
+        Stored embeddings are copied as they are, so nothing is re-embedded.
+        Video IDs are listed in a pass that reads no embeddings, then videos are
+        copied one at a time, so only the records of one video are held in memory.
+        Videos are routed to their partition in the manifest once copied.
+
+        Args:
+            batch_size (int): Number of records read from the shared collection at a time
+                while listing its videos.
+            delete_source (bool): Remove the copied records from the shared collection.
+
+        Returns:
+            int: Number of videos migrated.
+        """
+        migrated = 0
+        for video_id in sorted(self._video_ids(batch_size)):
+            # One video at a time, so only its records are held in memory.
+            video = self.db.get(
+                where={"id": video_id}, include=["embeddings", "documents", "metadatas"])
+            if not video["ids"]:
+                continue
+            name = partition_name(self.collection_name, video_id)
+            self._upsert(name, video["ids"], video["embeddings"], video["documents"],
+                         video["metadatas"])
+            if not self.manifest.get(video_id) and not self.get_ingested(video_id):
+                self.manifest.record(
+                    video_id, video["metadatas"][0].get("title", ""), INGESTED_STATUS,
+                    chunk_count=len(video["ids"]))
+            self.manifest.set_partition(video_id, name)
+            if delete_source:
+                self.db.delete(ids=video["ids"])
+            migrated += 1
+            print(f"Migrated {len(video['ids'])} documents of {video_id} to {name}.")
+        return migrated
+
+    def compact_video(self, video_id: str) -> Dict[str, int]:
+        """
+        Remove the duplicate records of one video and store the rest under `document_id`.
+
+        Duplicates are records with the same position and content, left by
+        ingestions that used random IDs. When the BM25 index of the video holds
+        its latest chunks, chunks missing from it are removed too, and so are
+        summaries other than the one of the manifest. Stored vectors are kept,
+        nothing is embedded. The BM25 and dense indexes and the manifest are
+        rebuilt from what remains.
+
+        Args:
+            video_id (str): The video to compact.
+
+        Returns:
+            Dict[str, int]: Number of records `kept` and `deleted`.
+        """
+        entry = self.manifest.get(video_id)
+        if entry and entry["status"] != INGESTED_STATUS:
+            # Still being ingested, or failed: compacting now would race the ingestion.
+            return {"kept": 0, "deleted": 0}
+        store, is_partition = self._store_for(video_id)
+        stored = self._stored_records(video_id, store)
+        if not stored:
+            return {"kept": 0, "deleted": 0}
+        index = self.lexical.get(video_id)
+        latest = index.documents if index is not None else None
+        summary = entry["summary"] if entry else None
+
+        kept = {}
+        for record_id, record in stored.items():
+            text, metadata = record["document"], record["metadata"]
+            if metadata.get("type") == SUMMARY_TYPE:
+                if summary is not None and text != summary:
+                    continue
+                position = "summary"
+            else:
+                position = metadata.get("chunk_index")
+                if latest is not None:
+                    if position is None and text in latest:
+                        position = latest.index(text)
+                    if position is None or position >= len(latest) or latest[position] != text:
+                        continue
+            new_id = document_id(video_id, "" if position is None else position, text)
+            kept.setdefault(new_id, (record_id, position, record))
+
+        rekeyed = [(new_id, record) for new_id, (record_id, _, record) in kept.items()
+                   if record_id != new_id or is_partition]
+        if rekeyed:
+            self._upsert(
+                entry["partition"] if is_partition else self.collection_name,
+                ids=[new_id for new_id, _ in rekeyed],
+                embeddings=[record["embedding"] for _, record in rekeyed],
+                documents=[record["document"] for _, record in rekeyed],
+                metadatas=[record["metadata"] for _, record in rekeyed])
+        stale = [record_id for record_id in stored if record_id not in kept]
+        self._delete_records(stale, stored)
+        if is_partition:
+            # Copies left in the shared collection by a migration without --delete-source.
+            self.db.delete(where={"id": video_id})
+
+        ordered = sorted(
+            kept.values(),
+            key=lambda item: (item[1] == "summary", item[1] if isinstance(item[1], int) else 0))
+        documents = [Document(page_content=record["document"], metadata=record["metadata"])
+                     for _, _, record in ordered]
+        summary = next((record["document"] for _, position, record in ordered
+                        if position == "summary"), None)
+        title = entry["title"] if entry else documents[0].metadata.get("title", "")
+        self._index_video(
+            video_id, title, documents, [record["embedding"] for _, _, record in ordered],
+            summary, partition=entry.get("partition") if entry else None,
+            pipeline_version=entry.get("pipeline_version") if entry else None)
+        return {"kept": len(kept), "deleted": len(stored) - len(kept)}
+
+    def compact(self, video_ids: Optional[List[str]] = None,
+                batch_size: int = 1000) -> Dict[str, int]:
+        """
+        Remove duplicate records of videos, see `compact_video`.
+
+        Args:
+            video_ids (List[str]): Videos to compact, every video of the manifest and
+                the shared collection when None.
+            batch_size (int): Number of records read from the shared collection at a time.
+
+        Returns:
+            Dict[str, int]: Number of `videos` compacted and records `kept` and `deleted`.
+        """
+        if video_ids:
+            return self._compact_videos(video_ids)
+        video_ids = {entry["video_id"] for entry in self.manifest.list()}
+        video_ids |= self._video_ids(batch_size)
+        return self._compact_videos(sorted(video_id for video_id in video_ids if video_id))
+
+    def _compact_videos(self, video_ids: List[str]) -> Dict[str, int]:
+        totals = {"videos": 0, "kept": 0, "deleted": 0}
+        for video_id in video_ids:
+            counts = self.compact_video(video_id)
+            if counts["kept"]:
+                totals["videos"] += 1
+            totals["kept"] += counts["kept"]
+            totals["deleted"] += counts["deleted"]
+            if counts["deleted"]:
+                print(f"Removed {counts['deleted']} duplicate documents of {video_id}.")
+        return totals
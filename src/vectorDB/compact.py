@@ -0,0 +1,30 @@
+"""
+Remove duplicate chunks and summaries left by re-ingesting videos.
+
+Videos ingested before document IDs were derived from their content got a new
+copy of every chunk on each ingestion. Their records are deduplicated and
+stored under content-addressed IDs, and their BM25 and dense indexes and
+manifest entries are rebuilt. Nothing is embedded again.
+
+Usage:
+    python -m src.vectorDB.compact [VIDEO_ID ...]
+"""
+import argparse
+
+from ..run import get_db_manager
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("video_ids", nargs="*",
+                        help="Videos to compact, every video of the collection when empty.")
+    args = parser.parse_args()
+
+    totals = get_db_manager().compact(args.video_ids)
+    print(f"Compacted {totals['videos']} videos: kept {totals['kept']} documents, "
+          f"removed {totals['deleted']} duplicates.")
+
+
+if __name__ == "__main__":
+    main()
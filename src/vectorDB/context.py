@@ -0,0 +1,157 @@
+import math
+from collections import Counter, deque
+from typing import TYPE_CHECKING, List, Tuple
+
+from ..llm.chunker import count_tokens, truncate_tokens
+from ..utils.tracing import tracer
+from .bm25 import tokenize
+
+if TYPE_CHECKING:
+    from langchain_core.documents import Document
+
+# Hits the context used to be made of, the baseline of the reported token reduction.
+BASELINE_RESULTS = 5
+SPAN_SEPARATOR = "\n\n"
+CHUNK_SEPARATOR = " "
+
+# Packed and baseline prompt tokens of the most recent contexts.
+context_reports = deque(maxlen=1000)
+
+
+class _Candidate:
+    __slots__ = ("document", "text", "video_id", "chunk_index", "rank",
+                 "relevance", "terms", "norm", "tokens", "truncated")
+
+    def __init__(self, document: "Document", rank: int, total: int):
+        metadata = document.metadata or {}
+        self.document = document
+        self.text = document.page_content
+        self.video_id = str(metadata.get("id", ""))
+        self.chunk_index = metadata.get("chunk_index")
+        self.rank = rank
+        # Retrieval rank mapped to (0, 1], the best hit scoring 1.
+        self.relevance = 1.0 - rank / total
+        self.terms = Counter(tokenize(self.text))
+        self.norm = math.sqrt(sum(count * count for count in self.terms.values()))
+        self.tokens = count_tokens(self.text)
+        self.truncated = False
+
+    @property
+    def key(self):
+        if self.chunk_index is None:
+            return self.video_id, self.text
+        return self.video_id, int(self.chunk_index)
+
+    def similarity(self, other: "_Candidate") -> float:
+        """Cosine similarity of the term counts of two chunks."""
+        if not self.norm or not other.norm:
+            return 0.0
+        small, large = sorted((self.terms, other.terms), key=len)
+        dot = sum(count * large.get(term, 0) for term, count in small.items())
+        return dot / (self.norm * other.norm)
+
+
+def _render(chunks: List[_Candidate]) -> Tuple[str, int]:
+    """
+    Join chunks in transcript order, merging consecutive chunks of a video into one span.
+
+    Chunks without a position, stored before chunks had one, follow in rank order.
+
+    Returns:
+        Tuple[str, int]: The text and its number of spans.
+    """
+    positioned = sorted((chunk for chunk in chunks if chunk.chunk_index is not None),
+                        key=lambda chunk: (chunk.video_id, int(chunk.chunk_index)))
+    unpositioned = sorted((chunk for chunk in chunks if chunk.chunk_index is None),
+                          key=lambda chunk: chunk.rank)
+    spans = []
+    previous = None
+    for chunk in positioned:
+        follows = (previous is not None and not previous.truncated
+                   and chunk.video_id == previous.video_id
+                   and int(chunk.chunk_index) == int(previous.chunk_index) + 1)
+        if follows:
+            spans[-1].append(chunk.text)
+        else:
+            spans.append([chunk.text])
+        previous = chunk
+    spans.extend([chunk.text] for chunk in unpositioned)
+    return SPAN_SEPARATOR.join(CHUNK_SEPARATOR.join(span) for span in spans), len(spans)
+
+
+def assemble_context(documents: List["Document"], token_budget: int,
+                     lambda_mult: float = 0.7) -> Tuple[str, dict]:
+    """
+    Pack retrieved chunks into a context of at most `token_budget` tokens.
+
+    Chunks are picked by maximal marginal relevance, weighing their retrieval
+    rank against their term overlap with the chunks already picked, so
+    near-duplicates give way to new material. Picked chunks are put back in
+    transcript order and consecutive chunks of a video are merged into one
+    span. Whole chunks are packed while they fit, then the best remaining pick
+    is truncated to the tokens left, so the budget is filled.
+
+    Args:
+        documents (List[Document]): Retrieved chunks, best first.
+        token_budget (int): Maximum number of tokens of the context.
+        lambda_mult (float): Weight of relevance against novelty, between 0 and 1.
+
+    Returns:
+        Tuple[str, dict]: The context and its report: candidate, chunk and span
+            counts, the context tokens and the tokens of the top-5 join it replaces.
+    """
+    with tracer.span("context_packing", candidates=len(documents)) as span:
+        candidates, seen = [], set()
+        for rank, document in enumerate(documents):
+            candidate = _Candidate(document, rank, len(documents))
+            if candidate.key not in seen:
+                seen.add(candidate.key)
+                candidates.append(candidate)
+
+        separator_tokens = count_tokens(SPAN_SEPARATOR)
+        redundancy = [0.0] * len(candidates)
+        remaining = list(range(len(candidates)))
+        selected, partial, used = [], None, 0
+        while remaining:
+            best = max(remaining, key=lambda i: (
+                lambda_mult * candidates[i].relevance - (1 - lambda_mult) * redundancy[i]))
+            remaining.remove(best)
+            cost = candidates[best].tokens + (separator_tokens if selected else 0)
+            if used + cost > token_budget:
+                # Smaller chunks further down may still fit whole.
+                if partial is None:
+                    partial = candidates[best]
+                continue
+            selected.append(candidates[best])
+            used += cost
+            for i in remaining:
+                redundancy[i] = max(redundancy[i], candidates[i].similarity(candidates[best]))
+
+        context, spans = _render(selected)
+        left = token_budget - count_tokens(context) - (separator_tokens if selected else 0)
+        if partial is not None and left > 0:
+            partial.text = truncate_tokens(partial.text, left)
+            partial.truncated = True
+            selected.append(partial)
+            context, spans = _render(selected)
+        context_tokens = count_tokens(context)
+        if context_tokens > token_budget:
+            # Merged chunks can tokenize slightly differently at their joins.
+            context = truncate_tokens(context, token_budget)
+            context_tokens = count_tokens(context)
+
+        baseline_tokens = count_tokens(CHUNK_SEPARATOR.join(
+            document.page_content for document in documents[:BASELINE_RESULTS]))
+        report = {
+            "candidates": len(candidates),
+            "chunks": len(selected),
+            "spans": spans,
+            "context_tokens": context_tokens,
+            "baseline_tokens": baseline_tokens,
+            "token_reduction": 1 - context_tokens / baseline_tokens if baseline_tokens else 0.0,
+        }
+        span.set(**report)
+    context_reports.append(report)
+    tracer.increment("context_tokens_total", context_tokens, kind="packed")
+    tracer.increment("context_tokens_total", baseline_tokens, kind="baseline")
+    return context, report
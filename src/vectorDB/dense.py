@@ -0,0 +1,148 @@
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+DTYPES = ("float16", "int8")
+
+
+class DenseIndex:
+    def __init__(self, matrix: np.ndarray, scales: Optional[np.ndarray],
+                 documents: List[str], metadatas: List[dict]):
+        """
+        Exact vector index over the chunks of one video.
+
+        Rows of `matrix` are the unit-normalized chunk embeddings, stored as
+        float16, or as int8 with one scale per row. A search is a single
+        matrix-vector product followed by a partial sort.
+
+        Args:
+            matrix (np.ndarray): Quantized embeddings, one row per chunk. May be memory-mapped.
+            scales (np.ndarray): float32 scale of each int8 row, None for float16.
+            documents (List[str]): Chunk texts.
+            metadatas (List[dict]): Metadata of each chunk, returned with the hits.
+        """
+        self.matrix = matrix
+        self.scales = scales
+        self.documents = documents
+        self.metadatas = metadatas
+
+    @classmethod
+    def quantize(cls, embeddings: List[List[float]], documents: List[str],
+                 metadatas: List[dict], dtype: str = "float16") -> "DenseIndex":
+        vectors = np.asarray(embeddings, dtype=np.float32).reshape(len(documents), -1)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors /= np.where(norms == 0, 1, norms)
+        if dtype == "int8":
+            scales = np.abs(vectors).max(axis=1) / 127
+            scales[scales == 0] = 1
+            matrix = np.round(vectors / scales[:, None]).astype(np.int8)
+            return cls(matrix, scales.astype(np.float32), documents, metadatas)
+        return cls(vectors.astype(np.float16), None, documents, metadatas)
+
+    @property
+    def dimensions(self) -> int:
+        return self.matrix.shape[1]
+
+    def search(self, vector: List[float], k: int = 5) -> List[Tuple[int, float]]:
+        """Return the `(chunk index, cosine similarity)` of the best `k` chunks."""
+        if not len(self.documents):
+            return []
+        query = np.asarray(vector, dtype=np.float32)
+        query /= np.linalg.norm(query) or 1
+        scores = self.matrix @ query
+        if self.scales is not None:
+            scores *= self.scales
+        k = min(k, len(scores))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        return [(int(position), float(scores[position])) for position in best]
+
+    @property
+    def nbytes(self) -> int:
+        return self.matrix.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+
+
+class DenseStore:
+    def __init__(self, directory: str, dtype: str = "float16", max_loaded: int = 32):
+        """
+        Per-video dense indexes persisted next to the Chroma data.
+
+        The matrix of each video is a `.npy` file opened memory-mapped on first
+        use, so only the pages touched by a search are read. Scales, texts and
+        metadata are kept in a JSON file beside it. Chroma stays the system of
+        record; an index can always be rebuilt from it.
+
+        Args:
+            directory (str): Directory of the index files.
+            dtype (str): `float16` or `int8`.
+            max_loaded (int): Number of indexes kept open, least recently used are dropped.
+        """
+        if dtype not in DTYPES:
+            raise ValueError(f"Unknown dense index dtype {dtype!r}, expected one of {DTYPES}.")
+        self.directory = directory
+        self.dtype = dtype
+        self.max_loaded = max_loaded
+        self._loaded = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, video_id: str) -> str:
+        name = hashlib.sha256(video_id.encode("utf-8")).hexdigest()[:32]
+        return os.path.join(self.directory, f"{name}.{self.dtype}")
+
+    def _remember(self, video_id: str, index: DenseIndex):
+        with self._lock:
+            self._loaded[video_id] = index
+            self._loaded.move_to_end(video_id)
+            while len(self._loaded) > self.max_loaded:
+                self._loaded.popitem(last=False)
+
+    def build(self, video_id: str, embeddings: List[List[float]], documents: List[str],
+              metadatas: List[dict]) -> DenseIndex:
+        index = DenseIndex.quantize(embeddings, documents, metadatas, self.dtype)
+        path = self._path(video_id)
+        with open(f"{path}.npy.tmp", "wb") as f:
+            np.save(f, index.matrix)
+        os.replace(f"{path}.npy.tmp", f"{path}.npy")
+        # Written last: an index is only read once its JSON file exists.
+        with open(f"{path}.json.tmp", "w") as f:
+            json.dump({
+                "documents": documents,
+                "metadatas": metadatas,
+                "scales": index.scales.tolist() if index.scales is not None else None,
+            }, f)
+        os.replace(f"{path}.json.tmp", f"{path}.json")
+        self._remember(video_id, index)
+        return index
+
+    def get(self, video_id: str) -> Optional[DenseIndex]:
+        with self._lock:
+            index = self._loaded.get(video_id)
+            if index is not None:
+                self._loaded.move_to_end(video_id)
+                return index
+        path = self._path(video_id)
+        if not os.path.exists(f"{path}.json"):
+            return None
+        with open(f"{path}.json") as f:
+            data = json.load(f)
+        scales = data["scales"]
+        index = DenseIndex(
+            np.load(f"{path}.npy", mmap_mode="r"),
+            np.asarray(scales, dtype=np.float32) if scales is not None else None,
+            data["documents"], data["metadatas"])
+        self._remember(video_id, index)
+        return index
+
+    def delete(self, video_id: str):
+        with self._lock:
+            self._loaded.pop(video_id, None)
+        path = self._path(video_id)
+        for suffix in (".json", ".npy"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
@@ -0,0 +1,101 @@
+import os
+import time
+import sqlite3
+import threading
+from typing import Optional
+
+INGESTING_STATUS = "ingesting"
+INGESTED_STATUS = "ingested"
+
+
+class IngestionManifest:
+    def __init__(self, path: str, collection_name: str):
+        """
+        Local index of the videos ingested into a collection.
+
+        Answers "have we seen this video?" with a primary key lookup instead of
+        an embedding call and a vector search. Rows are written by
+        `ChromaDBManager.add_documents` around the Chroma insert, so a video is
+        only marked as ingested once its chunks are stored.
+
+        Args:
+            path (str): Path of the SQLite file.
+            collection_name (str): Chroma collection the entries belong to.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.collection_name = collection_name
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS videos ("
+                "collection TEXT, video_id TEXT, title TEXT, status TEXT, "
+                "chunk_count INTEGER, summary TEXT, pipeline_version TEXT, "
+                "updated_at REAL, PRIMARY KEY (collection, video_id))")
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS videos_title ON videos (collection, title)")
+            columns = [row["name"] for row in self._connection.execute(
+                "PRAGMA table_info(videos)")]
+            if "partition" not in columns:
+                # Routing of a video to its own collection, added after the first release.
+                self._connection.execute("ALTER TABLE videos ADD COLUMN partition TEXT")
+
+    def get(self, video_id: str, title: str = "") -> Optional[dict]:
+        """
+        Return the manifest entry of a video, looked up by ID and then by title.
+
+        Args:
+            video_id (str): The video ID.
+            title (str): The video title, used when the ID is not found.
+
+        Returns:
+            dict or None: The entry, or None if the video was never ingested.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT * FROM videos WHERE collection = ? AND video_id = ?",
+                (self.collection_name, video_id)).fetchone()
+            if row is None and title:
+                row = self._connection.execute(
+                    "SELECT * FROM videos WHERE collection = ? AND title = ? "
+                    "ORDER BY updated_at DESC LIMIT 1",
+                    (self.collection_name, title)).fetchone()
+        return dict(row) if row else None
+
+    def record(self, video_id: str, title: str, status: str, chunk_count: int = 0,
+               summary: Optional[str] = None, pipeline_version: Optional[str] = None,
+               partition: Optional[str] = None):
+        """Insert or replace the entry of a video."""
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO videos (collection, video_id, title, status, "
+                "chunk_count, summary, pipeline_version, updated_at, partition) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (self.collection_name, video_id, title, status, chunk_count,
+                 summary, pipeline_version, time.time(), partition))
+
+    def set_partition(self, video_id: str, partition: Optional[str]):
+        """Route a video to the collection holding its chunks."""
+        with self._lock, self._connection:
+            self._connection.execute(
+                "UPDATE videos SET partition = ? WHERE collection = ? AND video_id = ?",
+                (partition, self.collection_name, video_id))
+
+    def delete(self, video_id: str):
+        with self._lock, self._connection:
+            self._connection.execute(
+                "DELETE FROM videos WHERE collection = ? AND video_id = ?",
+                (self.collection_name, video_id))
+
+    def list(self, status: Optional[str] = None) -> list:
+        query = "SELECT * FROM videos WHERE collection = ?"
+        params = [self.collection_name]
+        if status:
+            query += " AND status = ?"
+            params.append(status)
+        with self._lock:
+            rows = self._connection.execute(query, params).fetchall()
+        return [dict(row) for row in rows]
@@ -0,0 +1,29 @@
+"""
+Move the chunks of the shared collection into one collection per video.
+
+Usage:
+    python -m src.vectorDB.migrate [--delete-source]
+"""
+import argparse
+
+from ..config import config
+from ..constants import COLLECTION_NAME
+from .chroma import ChromaDBManager
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--collection", default=COLLECTION_NAME)
+    parser.add_argument("--persist-directory", default=config.CHROMA_PERSIST_DIRECTORY)
+    parser.add_argument("--delete-source", action="store_true",
+                        help="Remove the migrated records from the shared collection.")
+    args = parser.parse_args()
+
+    manager = ChromaDBManager(
+        args.collection, persist_directory=args.persist_directory, partitioned=True)
+    migrated = manager.migrate_to_partitions(delete_source=args.delete_source)
+    print(f"Migrated {migrated} videos.")
+
+
+if __name__ == "__main__":
+    main()